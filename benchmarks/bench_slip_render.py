@@ -0,0 +1,69 @@
+"""
+Slip rendering throughput: legacy per-module SVG concatenation vs the run-merged renderer.
+
+Usage:
+    python benchmarks/bench_slip_render.py [--count 300]
+"""
+from __future__ import annotations
+
+import argparse
+import secrets
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cockpit.printing.escpos import render_bet_slip_escpos  # noqa: E402
+from cockpit.printing.render import qr_to_svg, render_bet_slip_html  # noqa: E402
+from cockpit.utils.qrcodegen import QrCode  # noqa: E402
+
+
+def _legacy_svg(qr: QrCode, border: int = 2) -> str:
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {qr.get_size()+border*2} {qr.get_size()+border*2}" stroke="none">'
+        f'<rect width="100%" height="100%" fill="#FFFFFF"/>'
+        f'<path d="'
+    )
+    for y in range(qr.get_size()):
+        for x in range(qr.get_size()):
+            if qr.get_module(x, y):
+                svg += f"M{x+border},{y+border}h1v1h-1z "
+    svg += '" fill="#000000"/></svg>'
+    return svg
+
+
+def _rate(label: str, count: int, fn) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{label:<38} {rate:>10.1f} /s   ({elapsed * 1000 / count:.3f} ms each)")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=300)
+    args = parser.parse_args()
+
+    payloads = [secrets.token_urlsafe(16) for _ in range(args.count)]
+    codes = [QrCode.encode_text(p, QrCode.Ecc.MEDIUM) for p in payloads]
+
+    legacy_bytes = len(_legacy_svg(codes[0]))
+    merged_bytes = len(qr_to_svg(codes[0]))
+    print(f"SVG size for one slip: legacy {legacy_bytes} B, merged {merged_bytes} B")
+
+    _rate("SVG only, legacy", args.count, lambda i: _legacy_svg(codes[i]))
+    _rate("SVG only, run-merged", args.count, lambda i: qr_to_svg(codes[i]))
+    def slip(i: int) -> dict:
+        return {"slip_number": f"S-{i}", "qr_payload": payloads[i], "match_number": "M1", "side": "WALA", "amount": 100}
+
+    _rate("full slip HTML (encode + render)", args.count, lambda i: render_bet_slip_html(slip(i)))
+    _rate("full slip ESC/POS raster", args.count, lambda i: render_bet_slip_escpos(slip(i)))
+    _rate("full slip ESC/POS native QR", args.count, lambda i: render_bet_slip_escpos(slip(i), native_qr=True))
+
+
+if __name__ == "__main__":
+    main()
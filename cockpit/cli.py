@@ -0,0 +1,275 @@
+"""
+Headless maintenance commands.
+
+Usage:
+    python -m cockpit.cli calibrate-password [--target-ms 250] [--save]
+    python -m cockpit.cli import-users users.csv|users.json
+    python -m cockpit.cli rebuild-rollups [--recompute-days]
+    python -m cockpit.cli export-report REPORT --out FILE [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--format csv|jsonl]
+    python -m cockpit.cli display-server [--host 0.0.0.0] [--port 8765]
+    python -m cockpit.cli liabilities [--expire] [--days N]
+    python -m cockpit.cli bet-limits [--match ID] [--side WALA|MERON|DRAW] [--max-bet N] [--max-total N] [--max-payout N] [--max-cashier-total N] [--remove ID]
+    python -m cockpit.cli pits [--add CODE NAME]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+
+from pathlib import Path
+
+from cockpit.config import get_config, save_overrides
+from cockpit.db.connection import connect, database_path, transaction
+from cockpit.db.migrate import initialize_database
+from cockpit.db.rollups import rebuild_rollups, recompute_business_days
+from cockpit.display.server import DisplayServer
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.services.liabilities import LiabilityService
+from cockpit.services.limits import LimitService
+from cockpit.services.pits import PitService
+from cockpit.services.rbac import RBACService
+from cockpit.services.reports import EXPORT_FORMATS, export_report, get_report, report_definitions
+from cockpit.services.user_import import UserImportService, parse_users_file
+from cockpit.utils.clock import configure_business_day
+from cockpit.utils.device import get_device_id
+from cockpit.utils.security import calibrate_iterations
+
+
+def _calibrate_password(args: argparse.Namespace) -> int:
+    config = get_config()
+    iterations = calibrate_iterations(args.target_ms)
+    print(f"Recommended password_iterations for ~{args.target_ms:.0f} ms on this machine: {iterations}")
+    print(f"Currently configured: {config.password_iterations}")
+    if args.save:
+        path = save_overrides({"password_iterations": iterations}, config.data_dir)
+        print(f"Saved to {path}. Existing passwords are rehashed on each user's next login.")
+    return 0
+
+
+def _import_users(args: argparse.Namespace) -> int:
+    config = get_config()
+    rows = parse_users_file(Path(args.path))
+    conn = connect(config.db_path)
+    try:
+        initialize_database(conn)
+        with transaction(conn):
+            RBACService(conn).seed_defaults()
+        service = UserImportService(conn, AuditService(conn))
+        user_ids = service.import_users(
+            actor=Actor(user_id=None, device_id=get_device_id()), rows=rows, iterations=config.password_iterations
+        )
+    finally:
+        conn.close()
+    print(f"Imported {len(user_ids)} users.")
+    return 0
+
+
+def _rebuild_rollups(args: argparse.Namespace) -> int:
+    conn = connect(get_config().db_path)
+    try:
+        initialize_database(conn)
+        with transaction(conn):
+            if args.recompute_days:
+                print(f"Recomputed business days on {recompute_business_days(conn, only_missing=False)} rows.")
+            counts = rebuild_rollups(conn)
+    finally:
+        conn.close()
+    print("Rebuilt " + ", ".join(f"{table} ({n} rows)" for table, n in counts.items()) + ".")
+    return 0
+
+
+def _export_report(args: argparse.Namespace) -> int:
+    definition = get_report(args.report)
+    conn = connect(get_config().db_path)
+    try:
+        initialize_database(conn)
+        db_path = database_path(conn)
+    finally:
+        conn.close()
+    assert db_path is not None
+    params = {k: v for k, v in (("day_from", args.day_from), ("day_to", args.day_to)) if v is not None}
+    out = Path(args.out)
+    try:
+        rows = export_report(
+            definition,
+            db_path=db_path,
+            path=out,
+            params=params,
+            fmt=args.format,
+            progress=lambda n: print(f"\r{n} rows", end="", file=sys.stderr, flush=True),
+        )
+    except ValidationError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(f"Exported {rows} rows to {out}.")
+    return 0
+
+
+def _display_server(args: argparse.Namespace) -> int:
+    config = get_config()
+    conn = connect(config.db_path)
+    try:
+        initialize_database(conn)
+        db_path = database_path(conn)
+    finally:
+        conn.close()
+    assert db_path is not None
+    server = DisplayServer(
+        db_path,
+        host=args.host,
+        port=args.port,
+        odds_sample_seconds=config.odds_sample_seconds,
+        odds_bucket_seconds=config.odds_bucket_seconds,
+    ).start()
+    print(f"Display server on http://{args.host}:{server.port}/ (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def _bet_limits(args: argparse.Namespace) -> int:
+    conn = connect(get_config().db_path)
+    try:
+        initialize_database(conn)
+        limits = LimitService(conn, AuditService(conn))
+        actor = Actor(user_id=None, device_id=get_device_id())
+        caps = {"max_bet": args.max_bet, "max_total": args.max_total, "max_payout": args.max_payout, "max_cashier_total": args.max_cashier_total}
+        try:
+            if args.remove is not None:
+                limits.remove_limit(actor=actor, limit_id=args.remove)
+                print(f"Removed limit {args.remove}.")
+            elif any(v is not None for v in caps.values()):
+                limit_id = limits.set_limit(actor=actor, match_id=args.match, side=args.side, **caps)
+                print(f"Saved limit {limit_id}.")
+        except ValidationError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        for limit in limits.list_limits(match_id=args.match):
+            set_caps = ", ".join(f"{rule}=₱{getattr(limit, rule)}" for rule in caps if getattr(limit, rule) is not None)
+            print(f"{limit.id}: {limit.scope}: {set_caps}")
+    finally:
+        conn.close()
+    return 0
+
+
+def _liabilities(args: argparse.Namespace) -> int:
+    config = get_config()
+    conn = connect(config.db_path)
+    try:
+        initialize_database(conn)
+        ledger = LiabilityService(conn, AuditService(conn))
+        if args.expire:
+            days = args.days if args.days is not None else config.unclaimed_expiry_days
+            try:
+                expired = ledger.expire_unclaimed(actor=Actor(user_id=None, device_id=get_device_id()), older_than_days=days)
+            except ValidationError as exc:
+                print(exc, file=sys.stderr)
+                return 1
+            print(f"Archived {expired.slips} unclaimed slips (₱{expired.amount}) settled more than {days} days ago.")
+        for title, rows in (
+            ("match", ledger.outstanding_by_match()),
+            ("drawer", ledger.outstanding_by_drawer()),
+            ("age", ledger.outstanding_by_age()),
+        ):
+            print(f"Outstanding by {title}:")
+            for row in rows:
+                print(f"  {row.key if row.key is not None else '-'}: {row.slips} slips, ₱{row.amount}")
+    finally:
+        conn.close()
+    return 0
+
+
+def _pits(args: argparse.Namespace) -> int:
+    conn = connect(get_config().db_path)
+    try:
+        initialize_database(conn)
+        pits = PitService(conn, AuditService(conn))
+        if args.add is not None:
+            code, name = args.add
+            try:
+                pits.create_pit(actor=Actor(user_id=None, device_id=get_device_id()), code=code, name=name)
+            except ValidationError as exc:
+                print(exc, file=sys.stderr)
+                return 1
+        current = {
+            int(r["pit_id"]): r["match_number"]
+            for r in conn.execute(
+                "SELECT s.pit_id, fm.match_number FROM pit_state s LEFT JOIN fight_matches fm ON fm.id = s.current_match_id"
+            ).fetchall()
+        }
+        for pit in pits.list_pits():
+            print(f"{pit.id}: {pit.code}  {pit.name}  current match: {current.get(pit.id) or '-'}")
+    finally:
+        conn.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cockpit.cli", description="Cockpit maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = sub.add_parser("calibrate-password", help="Pick a PBKDF2 iteration count for a target login latency")
+    calibrate.add_argument("--target-ms", type=float, default=250.0)
+    calibrate.add_argument("--save", action="store_true", help="Write the result to config.json")
+    calibrate.set_defaults(func=_calibrate_password)
+
+    import_users = sub.add_parser("import-users", help="Create many users from a CSV or JSON file")
+    import_users.add_argument("path", help="CSV (username,password,full_name,roles) or JSON list")
+    import_users.set_defaults(func=_import_users)
+
+    rollups = sub.add_parser("rebuild-rollups", help="Recompute the daily report rollups from slips and sales")
+    rollups.add_argument(
+        "--recompute-days", action="store_true", help="Re-derive business days first (after changing venue_timezone or the cutoff hour)"
+    )
+    rollups.set_defaults(func=_rebuild_rollups)
+
+    export = sub.add_parser("export-report", help="Stream a report to CSV or JSONL without loading it into memory")
+    export.add_argument("report", choices=[d.key for d in report_definitions()])
+    export.add_argument("--out", required=True, help="Output file (.csv or .jsonl)")
+    export.add_argument("--from", dest="day_from", help="First business day (YYYY-MM-DD); default is the report's")
+    export.add_argument("--to", dest="day_to", help="Last business day (YYYY-MM-DD)")
+    export.add_argument("--format", choices=EXPORT_FORMATS, help="Defaults to the --out extension")
+    export.set_defaults(func=_export_report)
+
+    display = sub.add_parser("display-server", help="Serve the public display to browsers on the arena network")
+    display.add_argument("--host", default="0.0.0.0")
+    display.add_argument("--port", type=int, default=8765)
+    display.set_defaults(func=_display_server)
+
+    liabilities = sub.add_parser("liabilities", help="Show unpaid winnings by match, drawer and age; optionally expire old ones")
+    liabilities.add_argument("--expire", action="store_true", help="Archive unclaimed slips older than the expiry window first")
+    liabilities.add_argument("--days", type=int, help="Expiry window in days (default: unclaimed_expiry_days from config)")
+    liabilities.set_defaults(func=_liabilities)
+
+    limits = sub.add_parser("bet-limits", help="List, set or remove betting caps (no caps given: list)")
+    limits.add_argument("--match", type=int, help="Match id; default applies to every match")
+    limits.add_argument("--side", choices=("WALA", "MERON", "DRAW"), help="Default applies to the whole match")
+    limits.add_argument("--max-bet", type=int, help="Largest single slip")
+    limits.add_argument("--max-total", type=int, help="Largest pool on the side (or the whole match)")
+    limits.add_argument("--max-payout", type=int, help="Largest payout the side's result (or the worst result) may need")
+    limits.add_argument("--max-cashier-total", type=int, help="Most one cashier may take on the match")
+    limits.add_argument("--remove", type=int, metavar="ID", help="Delete the limit with this id")
+    limits.set_defaults(func=_bet_limits)
+
+    pits = sub.add_parser("pits", help="List pits with their current match; optionally add one")
+    pits.add_argument("--add", nargs=2, metavar=("CODE", "NAME"), help="Create a pit, e.g. --add B \"Pit B\"")
+    pits.set_defaults(func=_pits)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = get_config()
+    configure_business_day(tz_name=config.venue_timezone, cutoff_hour=config.business_day_cutoff_hour)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
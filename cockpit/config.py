@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
+from typing import Any
+
+from cockpit.utils.security import PBKDF2_ITERATIONS
 
 
 @dataclass(frozen=True)
@@ -9,10 +14,65 @@ class AppConfig:
     app_name: str = "Cockfight Management System"
     data_dir: Path = Path.home() / ".cockpit"
     db_path: Path = data_dir / "cockpit.sqlite3"
+    # Printing: "os" (Windows print verb), "file" (write into print_dir) or "raw" (write to printer_device).
+    print_backend: str = "os" if os.name == "nt" else "file"
+    print_dir: Path = data_dir / "prints"
+    printer_device: str | None = None
+    # Document format for file/raw backends: "html", "text" or "escpos" (None = backend default).
+    print_format: str | None = None
+    escpos_paper_mm: int = 58
+    escpos_native_qr: bool = False
+    # PBKDF2 cost for new/rehashed passwords; set per terminal with `python -m cockpit.cli calibrate-password`.
+    password_iterations: int = PBKDF2_ITERATIONS
+    # Reports bucket activity by venue-local business day; times before the cutoff hour count
+    # toward the previous day. Accepts "+08:00"-style offsets or IANA names (needs tzdata on Windows).
+    venue_timezone: str = "+08:00"
+    business_day_cutoff_hour: int = 6
+    # Public displays sample the current pool this often; the stored history keeps one point per bucket.
+    odds_sample_seconds: float = 5.0
+    odds_bucket_seconds: int = 30
+    # The pit (ring) this terminal registers matches for and takes bets on; see `cli pits`.
+    pit_code: str = "MAIN"
+    # Winning slips left unclaimed this many days after the result are archived by `cli liabilities --expire`.
+    unclaimed_expiry_days: int = 30
+
+    def __post_init__(self) -> None:
+        # Expiry writes slips off for good; a zero or negative window would expire every unpaid winner.
+        if self.unclaimed_expiry_days < 1:
+            raise ValueError(f"config.json: unclaimed_expiry_days must be at least 1 (got {self.unclaimed_expiry_days})")
+
+
+def _load_overrides(path: Path) -> dict[str, Any]:
+    """
+    Per-terminal overrides from `<data_dir>/config.json` (only known fields are applied).
+    """
+    if not path.exists():
+        return {}
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    defaults = AppConfig()
+    known = {f.name for f in fields(AppConfig)}
+    overrides: dict[str, Any] = {}
+    for key, value in raw.items():
+        if key not in known:
+            continue
+        overrides[key] = Path(value) if isinstance(getattr(defaults, key), Path) and value is not None else value
+    return overrides
+
+
+def save_overrides(updates: dict[str, Any], data_dir: Path | None = None) -> Path:
+    """Merges `updates` into `<data_dir>/config.json` and returns its path."""
+    path = (data_dir or AppConfig().data_dir) / "config.json"
+    raw = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    raw.update(updates)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(raw, indent=2), encoding="utf-8")
+    return path
 
 
 def get_config() -> AppConfig:
     config = AppConfig()
     config.data_dir.mkdir(parents=True, exist_ok=True)
+    overrides = _load_overrides(config.data_dir / "config.json")
+    if overrides:
+        config = replace(config, **overrides)
     return config
-
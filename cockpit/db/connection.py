@@ -1,25 +1,138 @@
+"""
+SQLite storage split into durability tiers, one file per tier, attached to a single connection.
+
+- main (`cockpit.sqlite3`, synchronous=FULL): bets, cash, users, sessions, audit log. Money rows
+  and their audit rows must commit atomically, and with WAL a transaction spanning attached files
+  is only atomic per file, so the audit log deliberately stays in this file.
+- telemetry (`cockpit.telemetry.sqlite3`, synchronous=OFF): session leases and other
+  high-frequency, non-financial state that can be rebuilt or tolerate losing the last writes.
+
+Tables in an attached tier are always addressed with their schema name (`telemetry.x`).
+"""
 from __future__ import annotations
 
 import sqlite3
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Sequence
+
+from cockpit.utils.clock import transaction_clock
+
+
+@dataclass(frozen=True)
+class DatabaseTier:
+    schema: str
+    suffix: str
+    synchronous: str
+    schema_file: str
+
+
+MAIN_TIER = DatabaseTier(schema="main", suffix="", synchronous="FULL", schema_file="schema.sql")
+TELEMETRY_TIER = DatabaseTier(schema="telemetry", suffix=".telemetry", synchronous="OFF", schema_file="schema_telemetry.sql")
+DEFAULT_TIERS: tuple[DatabaseTier, ...] = (MAIN_TIER, TELEMETRY_TIER)
+
+
+def tier_path(db_path: Path, tier: DatabaseTier) -> Path:
+    return db_path.with_name(f"{db_path.stem}{tier.suffix}{db_path.suffix}")
 
 
-def connect(db_path: Path) -> sqlite3.Connection:
+def attach_tiers(conn: sqlite3.Connection, tiers: Sequence[DatabaseTier] = DEFAULT_TIERS) -> None:
+    """
+    Attaches every non-main tier next to the main file (in-memory for in-memory DBs) with its own PRAGMAs.
+    Safe to call repeatedly; must run outside a transaction.
+    """
+    attached = {r[1]: r[2] for r in conn.execute("PRAGMA database_list").fetchall()}
+    main_file = attached.get("main") or ""
+    for tier in tiers:
+        if tier.schema == "main" or tier.schema in attached:
+            continue
+        target = str(tier_path(Path(main_file), tier)) if main_file else ":memory:"
+        conn.execute(f"ATTACH DATABASE ? AS {tier.schema}", (target,))
+        if main_file:
+            conn.execute(f"PRAGMA {tier.schema}.journal_mode = WAL;")
+        conn.execute(f"PRAGMA {tier.schema}.synchronous = {tier.synchronous};")
+
+
+def connect(db_path: Path, tiers: Sequence[DatabaseTier] = DEFAULT_TIERS) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, isolation_level=None)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA journal_mode = WAL;")
-    conn.execute("PRAGMA synchronous = FULL;")
+    conn.execute(f"PRAGMA synchronous = {MAIN_TIER.synchronous};")
     conn.execute("PRAGMA busy_timeout = 5000;")
+    attach_tiers(conn, tiers)
+    return conn
+
+
+def connect_reader(db_path: Path, tiers: Sequence[DatabaseTier] = DEFAULT_TIERS) -> sqlite3.Connection:
+    """Read-only connection for background work; WAL lets it read while the UI connection writes."""
+    conn = connect(db_path, tiers)
+    conn.execute("PRAGMA query_only = ON;")
     return conn
 
 
+def database_path(conn: sqlite3.Connection) -> Path | None:
+    """File behind the main schema, or None for an in-memory database."""
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return Path(row[2]) if row[2] else None
+    return None
+
+
+class ChangeFeed:
+    """
+    Cheap "has anything been committed?" check for polling views.
+
+    `PRAGMA data_version` changes when another connection commits to the main file, and
+    `total_changes` covers writes made on this connection, which data_version does not report.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+        self._seen: tuple[int, int] | None = None
+
+    def _version(self) -> tuple[int, int]:
+        return int(self._conn.execute("PRAGMA data_version").fetchone()[0]), self._conn.total_changes
+
+    def poll(self) -> bool:
+        """True on the first call and whenever something was committed since the previous call."""
+        version = self._version()
+        changed = version != self._seen
+        self._seen = version
+        return changed
+
+
 @contextmanager
 def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    if conn.in_transaction:
+        # Nested use (e.g. a view wrapping an OperationsService call) joins the outer transaction.
+        yield conn
+        return
     try:
         conn.execute("BEGIN IMMEDIATE;")
+        # Taken after the write lock is granted, so the shared timestamp orders like the commits do.
+        with transaction_clock():
+            yield conn
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+
+
+@contextmanager
+def telemetry_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Deferred transaction for batches that write only attached low-durability tiers.
+
+    BEGIN IMMEDIATE would take the write lock on every attached file, including the money DB;
+    a deferred BEGIN only locks the files that are actually written.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    try:
+        conn.execute("BEGIN;")
         yield conn
         conn.execute("COMMIT;")
     except Exception:
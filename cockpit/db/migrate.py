@@ -1,16 +1,171 @@
 from __future__ import annotations
 
 import sqlite3
+from datetime import datetime
 from pathlib import Path
 
+from cockpit.db.connection import DEFAULT_TIERS, DatabaseTier, attach_tiers, transaction
+from cockpit.db.rollups import BUSINESS_DAY_COLUMNS, rebuild_rollups, recompute_business_days, refresh_pit_state, rollups_need_backfill
+from cockpit.services.liabilities import LiabilityService
+from cockpit.utils.clock import epoch_us
 
-def _read_schema_sql() -> str:
-    schema_path = Path(__file__).with_name("schema.sql")
+
+def _read_schema_sql(name: str = "schema.sql") -> str:
+    schema_path = Path(__file__).with_name(name)
     return schema_path.read_text(encoding="utf-8")
 
 
-def initialize_database(conn: sqlite3.Connection) -> None:
+_ROLLUP_TRIGGERS = (
+    "trg_rollup_bets_insert",
+    "trg_rollup_bets_update_stake",
+    "trg_rollup_bets_update_payout",
+    "trg_rollup_bets_delete",
+    "trg_rollup_canteen_insert",
+    "trg_rollup_canteen_update",
+    "trg_rollup_canteen_delete",
+)
+
+
+def _rekey_text_rollups(conn: sqlite3.Connection) -> bool:
+    """Drops rollups keyed by the old 'YYYY-MM-DD' text day so schema.sql recreates them on business_day."""
+    day_type = next((r["type"] for r in conn.execute("PRAGMA table_info(rollup_bets)").fetchall() if r["name"] == "business_day"), None)
+    if day_type is None or day_type.upper() != "TEXT":
+        return False
+    for name in _ROLLUP_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute("DROP TABLE IF EXISTS rollup_bets")
+    conn.execute("DROP TABLE IF EXISTS rollup_canteen")
+    conn.executescript(_read_schema_sql())
+    return True
+
+
+# (table, epoch-microsecond column, ISO text column it is derived from) on the hot tables.
+_EPOCH_US_COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ("bet_slips", "encoded_at_us", "encoded_at"),
+    ("bet_slips", "payout_at_us", "payout_at"),
+    ("cash_movements", "created_at_us", "created_at"),
+    ("audit_log", "created_at_us", "created_at"),
+    ("canteen_sales", "sold_at_us", "sold_at"),
+    ("canteen_stock_movements", "created_at_us", "created_at"),
+)
+
+
+_SNAPSHOT_TOTALS = ("total_wala", "total_meron", "total_draw", "total_all")
+
+
+def _epoch_us_sql(text: str | None) -> int | None:
+    return epoch_us(datetime.fromisoformat(text)) if text else None
+
+
+def _backfill_epoch_us(conn: sqlite3.Connection) -> None:
+    """Derives *_us from the ISO text on rows written before the columns existed. Call inside a transaction."""
+    conn.create_function("cockpit_epoch_us", 1, _epoch_us_sql, deterministic=True)
+    # audit_log is append-only; lift the guard for this one derived column and restore it in the same transaction.
+    guard = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'audit_log_no_update'").fetchone()
+    if guard is not None:
+        conn.execute("DROP TRIGGER audit_log_no_update")
+    for table, us_col, iso_col in _EPOCH_US_COLUMNS:
+        conn.execute(f"UPDATE {table} SET {us_col} = cockpit_epoch_us({iso_col}) WHERE {us_col} IS NULL AND {iso_col} IS NOT NULL")
+    if guard is not None:
+        conn.execute(guard[0])
+
+
+def _match_number_globally_unique(conn: sqlite3.Connection) -> bool:
+    for index in conn.execute("PRAGMA index_list(fight_matches)").fetchall():
+        if index["unique"] and index["origin"] == "u":
+            columns = [r["name"] for r in conn.execute(f"PRAGMA index_info({index['name']})").fetchall()]
+            if columns == ["match_number"]:
+                return True
+    return False
+
+
+def _rebuild_fight_matches_per_pit_numbers(conn: sqlite3.Connection) -> None:
+    """
+    Rebuilds fight_matches so match_number is unique per pit rather than venue-wide.
+
+    SQLite cannot drop a column's UNIQUE in place, so this is the copy-and-rename rebuild from the
+    SQLite ALTER TABLE docs: same columns and rowids, its own indexes and triggers recreated, and
+    foreign keys (which point at fight_matches by name) checked before committing.
+    """
+    table_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fight_matches'").fetchone()[0]
+    new_sql = table_sql.replace("match_number TEXT NOT NULL UNIQUE", "match_number TEXT NOT NULL", 1)
+    new_sql = new_sql[: new_sql.rindex(")")].rstrip() + ",\n  UNIQUE (pit_id, match_number)\n)"
+    new_sql = new_sql.replace("fight_matches", "fight_matches_rebuild", 1)
+    columns = ", ".join(r["name"] for r in conn.execute("PRAGMA table_info(fight_matches)").fetchall())
+    dependents = [
+        r["sql"]
+        for r in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = 'fight_matches' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+        ).fetchall()
+    ]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    # Triggers on other tables name fight_matches; the legacy rename leaves them alone while it is gone.
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        with transaction(conn):
+            conn.execute(new_sql)
+            conn.execute(f"INSERT INTO fight_matches_rebuild({columns}) SELECT {columns} FROM fight_matches")
+            conn.execute("DROP TABLE fight_matches")
+            conn.execute("ALTER TABLE fight_matches_rebuild RENAME TO fight_matches")
+            for sql in dependents:
+                conn.execute(sql)
+            if conn.execute("PRAGMA foreign_key_check").fetchone() is not None:
+                raise sqlite3.IntegrityError("fight_matches rebuild left dangling foreign keys")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _convert_odds_snapshot_json(conn: sqlite3.Connection) -> None:
+    """
+    Moves slips off the per-slip odds_snapshot_json onto shared odds_snapshots rows, then drops the
+    column. Call inside a transaction.
+
+    The JSON never recorded a pool_version, so each distinct set of totals per match gets a negative
+    one (-1, -2, ... in order of first sale); live snapshots start at 0 and never clash. A blob that
+    is not valid JSON converts as an all-zero snapshot rather than aborting start-up.
+
+    Builds from before odds_snapshots still write odds_snapshot_json, so once a file is converted
+    every terminal sharing it must run this build (see README, "Updating the app").
+    """
+    columns = ", ".join(_SNAPSHOT_TOTALS)
+    extracted = [
+        f"CASE WHEN json_valid(odds_snapshot_json) THEN COALESCE(json_extract(odds_snapshot_json, '$.{k}'), 0) ELSE 0 END"
+        for k in _SNAPSHOT_TOTALS
+    ]
+    conn.execute(
+        f"""
+        INSERT INTO odds_snapshots(match_id, pool_version, {columns})
+        SELECT match_id, -ROW_NUMBER() OVER (PARTITION BY match_id ORDER BY first_id), {columns}
+        FROM (
+          SELECT match_id, MIN(id) AS first_id, {", ".join(f"{e} AS {k}" for e, k in zip(extracted, _SNAPSHOT_TOTALS))}
+          FROM bet_slips
+          WHERE odds_snapshot_id IS NULL
+          GROUP BY match_id, {columns}
+        )
+        """
+    )
+    match = " AND ".join(f"s.{k} = {e.replace('odds_snapshot_json', 'bet_slips.odds_snapshot_json')}" for k, e in zip(_SNAPSHOT_TOTALS, extracted))
+    conn.execute(
+        f"""
+        UPDATE bet_slips
+        SET odds_snapshot_id = (
+          SELECT s.id FROM odds_snapshots s
+          WHERE s.match_id = bet_slips.match_id AND s.pool_version < 0 AND {match}
+        )
+        WHERE odds_snapshot_id IS NULL
+        """
+    )
+    conn.execute("ALTER TABLE bet_slips DROP COLUMN odds_snapshot_json")
+
+
+def initialize_database(conn: sqlite3.Connection, tiers: tuple[DatabaseTier, ...] = DEFAULT_TIERS) -> None:
     conn.executescript(_read_schema_sql())
+    attach_tiers(conn, tiers)
+    for tier in tiers:
+        if tier.schema == "main":
+            continue
+        conn.executescript(_read_schema_sql(tier.schema_file))
 
     session_cols = {r["name"] for r in conn.execute("PRAGMA table_info(sessions)").fetchall()}
     if "last_seen_at" not in session_cols:
@@ -20,6 +175,28 @@ def initialize_database(conn: sqlite3.Connection) -> None:
     cols = {r["name"] for r in conn.execute("PRAGMA table_info(fight_matches)").fetchall()}
     if "fight_number" not in cols:
         conn.execute("ALTER TABLE fight_matches ADD COLUMN fight_number INTEGER UNIQUE;")
+    if "pit_id" not in cols:
+        # ALTER cannot add a REFERENCES column with a non-NULL default; new files get the foreign key.
+        conn.execute("ALTER TABLE fight_matches ADD COLUMN pit_id INTEGER NOT NULL DEFAULT 1;")
+    if _match_number_globally_unique(conn):
+        _rebuild_fight_matches_per_pit_numbers(conn)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fight_matches_pit_state ON fight_matches(pit_id, state)")
+    result_cols = {r["name"] for r in conn.execute("PRAGMA table_info(fight_results)").fetchall()}
+    if "pit_id" not in result_cols:
+        conn.execute("ALTER TABLE fight_results ADD COLUMN pit_id INTEGER;")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fight_results_pit_decided ON fight_results(pit_id, decided_at, result_type)")
+    # Results written before the column (or its trigger) existed; an index probe once they are all set.
+    if conn.execute("SELECT 1 FROM fight_results WHERE pit_id IS NULL LIMIT 1").fetchone() is not None:
+        with transaction(conn):
+            conn.execute(
+                "UPDATE fight_results SET pit_id = (SELECT pit_id FROM fight_matches WHERE id = fight_results.match_id) WHERE pit_id IS NULL"
+            )
+    # The single-venue pointer is superseded by pit_state.
+    for trigger in ("trg_venue_state_match_insert", "trg_venue_state_match_state", "trg_venue_state_pool_insert", "trg_venue_state_pool_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS venue_state")
+    # Early builds seeded the MAIN pit with datetime('now'); created_at is ISO-8601 UTC everywhere else.
+    conn.execute("UPDATE pits SET created_at = strftime('%Y-%m-%dT%H:%M:%S+00:00', created_at) WHERE id = 1 AND created_at NOT LIKE '%T%'")
 
     conn.execute(
         """
@@ -39,3 +216,84 @@ def initialize_database(conn: sqlite3.Connection) -> None:
           ('DERBY_5', '5-Cock Derby', 5, 1, 1, datetime('now'))
         """
     )
+
+    rekeyed = _rekey_text_rollups(conn)
+    added_day_columns = False
+    for table, day_col, _ts_col in BUSINESS_DAY_COLUMNS:
+        table_cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        if day_col not in table_cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {day_col} INTEGER;")
+            added_day_columns = True
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bet_slips_day_cashier ON bet_slips(business_day, encoded_by)")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_bet_slips_payout_day_cashier
+        ON bet_slips(payout_business_day, payout_by)
+        WHERE payout_business_day IS NOT NULL
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cash_movements_day_drawer ON cash_movements(business_day, drawer_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_canteen_sales_day_seller ON canteen_sales(business_day, sold_by)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fight_matches_day ON fight_matches(business_day)")
+
+    # Rows written before business days existed get them once; the rollups follow.
+    if added_day_columns or rekeyed or rollups_need_backfill(conn):
+        with transaction(conn):
+            recompute_business_days(conn)
+            rebuild_rollups(conn)
+    # Databases from before pit_state start with no current match; no-op once it is right.
+    with transaction(conn):
+        refresh_pit_state(conn)
+
+    # Rows lacking *_us (written before the columns existed, by an older build on another terminal,
+    # or left by a backfill that did not commit) are found through small partial indexes that hold
+    # only such rows, so the check stays cheap at every start-up.
+    pending_epoch_us = False
+    for table, us_col, iso_col in _EPOCH_US_COLUMNS:
+        table_cols = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        if us_col not in table_cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {us_col} INTEGER;")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{us_col}_pending ON {table}({iso_col}) WHERE {us_col} IS NULL AND {iso_col} IS NOT NULL"
+        )
+        if conn.execute(f"SELECT 1 FROM {table} WHERE {us_col} IS NULL AND {iso_col} IS NOT NULL LIMIT 1").fetchone() is not None:
+            pending_epoch_us = True
+    if pending_epoch_us:
+        with transaction(conn):
+            _backfill_epoch_us(conn)
+
+    # Time-ordered access goes through the integer columns; the TEXT-keyed indexes are retired.
+    for old_index in ("idx_cash_movements_drawer_created", "idx_canteen_stock_item_created", "idx_canteen_sales_sold_at"):
+        conn.execute(f"DROP INDEX IF EXISTS {old_index}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bet_slips_encoded_us ON bet_slips(encoded_at_us)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cash_movements_drawer_created_us ON cash_movements(drawer_id, created_at_us)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_canteen_stock_item_created_us ON canteen_stock_movements(item_id, created_at_us)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_canteen_sales_sold_us ON canteen_sales(sold_at_us)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_created_us ON audit_log(created_at_us)")
+
+    slip_cols = {r["name"] for r in conn.execute("PRAGMA table_info(bet_slips)").fetchall()}
+    if "odds_snapshot_id" not in slip_cols:
+        conn.execute("ALTER TABLE bet_slips ADD COLUMN odds_snapshot_id INTEGER REFERENCES odds_snapshots(id);")
+    if "odds_snapshot_json" in slip_cols:
+        with transaction(conn):
+            _convert_odds_snapshot_json(conn)
+
+    # Settlement looks up each slip's drawer by its BET_IN movement.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cash_movements_reference ON cash_movements(reference_type, reference_id)")
+    # Results set before the ledger existed (or whose settlement never committed): settle them,
+    # dated at their decision time. Matches with open slips but no ledger rows at all are the gap;
+    # one whose slips all lost is settled again to no rows, which is harmless.
+    unsettled = conn.execute(
+        """
+        SELECT fr.match_id, fr.decided_at
+        FROM fight_results fr
+        WHERE NOT EXISTS (SELECT 1 FROM liabilities l WHERE l.match_id = fr.match_id)
+          AND EXISTS (SELECT 1 FROM bet_slips b WHERE b.match_id = fr.match_id AND b.status IN ('ENCODED','PRINTED'))
+        """
+    ).fetchall()
+    if unsettled:
+        ledger = LiabilityService(conn, audit=None)
+        with transaction(conn):
+            for row in unsettled:
+                ledger.settle_match(int(row["match_id"]), settled_at_us=epoch_us(datetime.fromisoformat(row["decided_at"])))
@@ -0,0 +1,153 @@
+"""
+Rebuilds the trigger-maintained derived tables (rollup_bets, rollup_canteen, match_pools,
+pit_state) from source rows.
+
+Normal operation never needs this: the triggers in schema.sql keep the rollups current inside
+the same transaction as the slip/sale write. Rebuilding backfills a database created before the
+rollups existed, or repairs a rollup suspected of drifting.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+from cockpit.utils.clock import business_day
+
+
+# (table, day column, timestamp column) for every precomputed business-day column.
+BUSINESS_DAY_COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ("bet_slips", "business_day", "encoded_at"),
+    ("bet_slips", "payout_business_day", "payout_at"),
+    ("cash_movements", "business_day", "created_at"),
+    ("canteen_sales", "business_day", "sold_at"),
+    ("fight_matches", "business_day", "created_at"),
+)
+
+
+def _business_day_sql(ts: str | None) -> int | None:
+    # A malformed timestamp leaves the day NULL (the row drops out of day-filtered reports)
+    # rather than failing the whole backfill.
+    try:
+        return business_day(ts) if ts else None
+    except ValueError:
+        return None
+
+
+def recompute_business_days(conn: sqlite3.Connection, *, only_missing: bool = True) -> int:
+    """
+    Fills business-day columns from their timestamps with the configured venue timezone/cutoff.
+    `only_missing=False` recomputes every row (after changing those settings). Call inside a
+    transaction and rebuild the rollups afterwards; returns the number of rows changed.
+    """
+    conn.create_function("cockpit_business_day", 1, _business_day_sql, deterministic=True)
+    changed = 0
+    for table, day_col, ts_col in BUSINESS_DAY_COLUMNS:
+        where = f"{day_col} IS NULL AND {ts_col} IS NOT NULL" if only_missing else f"{day_col} IS NOT cockpit_business_day({ts_col})"
+        changed += conn.execute(f"UPDATE {table} SET {day_col} = cockpit_business_day({ts_col}) WHERE {where}").rowcount
+    return changed
+
+
+def rollups_need_backfill(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        """
+        SELECT
+          (EXISTS (SELECT 1 FROM bet_slips WHERE status NOT IN ('VOIDED','REFUNDED'))
+            AND NOT EXISTS (SELECT 1 FROM rollup_bets))
+          OR (EXISTS (SELECT 1 FROM canteen_sales WHERE status = 'PAID')
+            AND NOT EXISTS (SELECT 1 FROM rollup_canteen))
+          OR (EXISTS (SELECT 1 FROM bet_slips WHERE status NOT IN ('VOIDED','REFUNDED'))
+            AND NOT EXISTS (SELECT 1 FROM match_pools))
+        """
+    ).fetchone()
+    return bool(row[0])
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> dict[str, int]:
+    """Recomputes every rollup row. Call inside a transaction; returns row counts per table."""
+    conn.execute("DELETE FROM rollup_bets")
+    conn.execute(
+        """
+        INSERT INTO rollup_bets(business_day, user_id, match_id, bets_count, bet_in, payouts_count, payouts)
+        SELECT business_day, user_id, match_id, SUM(bets_count), SUM(bet_in), SUM(payouts_count), SUM(payouts)
+        FROM (
+          SELECT business_day, encoded_by AS user_id, match_id,
+                 1 AS bets_count, amount AS bet_in, 0 AS payouts_count, 0 AS payouts
+          FROM bet_slips
+          WHERE status NOT IN ('VOIDED','REFUNDED') AND business_day IS NOT NULL
+          UNION ALL
+          SELECT payout_business_day, payout_by, match_id, 0, 0, 1, COALESCE(payout_amount, 0)
+          FROM bet_slips
+          WHERE status NOT IN ('VOIDED','REFUNDED') AND payout_business_day IS NOT NULL AND payout_by IS NOT NULL
+        )
+        GROUP BY business_day, user_id, match_id
+        """
+    )
+    conn.execute("DELETE FROM rollup_canteen")
+    conn.execute(
+        """
+        INSERT INTO rollup_canteen(business_day, user_id, sales_count, sales_total)
+        SELECT business_day, sold_by, COUNT(*), SUM(total_amount)
+        FROM canteen_sales
+        WHERE status = 'PAID' AND business_day IS NOT NULL
+        GROUP BY business_day, sold_by
+        """
+    )
+    rebuild_match_pools(conn)
+    refresh_pit_state(conn)
+    return {
+        "rollup_bets": int(conn.execute("SELECT COUNT(*) FROM rollup_bets").fetchone()[0]),
+        "rollup_canteen": int(conn.execute("SELECT COUNT(*) FROM rollup_canteen").fetchone()[0]),
+        "match_pools": int(conn.execute("SELECT COUNT(*) FROM match_pools").fetchone()[0]),
+    }
+
+
+def rebuild_match_pools(conn: sqlite3.Connection) -> None:
+    """
+    Recomputes match_pools in place. pool_version only moves forward, and only for pools whose
+    totals actually changed, so versions already handed out stay unique per match.
+    """
+    conn.execute(
+        """
+        INSERT INTO match_pools(match_id, total_wala, total_meron, total_draw, total_all, bets_count, pool_version)
+        SELECT
+          match_id,
+          SUM(CASE WHEN side = 'WALA' THEN amount ELSE 0 END),
+          SUM(CASE WHEN side = 'MERON' THEN amount ELSE 0 END),
+          SUM(CASE WHEN side = 'DRAW' THEN amount ELSE 0 END),
+          SUM(amount),
+          COUNT(*),
+          1
+        FROM bet_slips
+        WHERE status NOT IN ('VOIDED','REFUNDED')
+        GROUP BY match_id
+        ON CONFLICT(match_id) DO UPDATE SET
+          total_wala = excluded.total_wala,
+          total_meron = excluded.total_meron,
+          total_draw = excluded.total_draw,
+          total_all = excluded.total_all,
+          bets_count = excluded.bets_count,
+          pool_version = pool_version + 1
+        WHERE (total_wala, total_meron, total_draw, total_all, bets_count)
+          IS NOT (excluded.total_wala, excluded.total_meron, excluded.total_draw, excluded.total_all, excluded.bets_count)
+        """
+    )
+    conn.execute(
+        """
+        UPDATE match_pools
+        SET total_wala = 0, total_meron = 0, total_draw = 0, total_all = 0, bets_count = 0, pool_version = pool_version + 1
+        WHERE bets_count <> 0
+          AND match_id NOT IN (SELECT match_id FROM bet_slips WHERE status NOT IN ('VOIDED','REFUNDED'))
+        """
+    )
+
+
+def refresh_pit_state(conn: sqlite3.Connection) -> None:
+    """Points each pit's pit_state row at its newest open match; a no-op for pits already right."""
+    conn.execute("INSERT OR IGNORE INTO pit_state(pit_id, current_match_id, odds_version) SELECT id, NULL, 0 FROM pits")
+    conn.execute(
+        """
+        UPDATE pit_state
+        SET current_match_id = (SELECT MAX(id) FROM fight_matches WHERE pit_id = pit_state.pit_id AND state IN ('DRAFT','LOCKED','ACTIVE')),
+            odds_version = odds_version + 1
+        WHERE current_match_id IS NOT (SELECT MAX(id) FROM fight_matches WHERE pit_id = pit_state.pit_id AND state IN ('DRAFT','LOCKED','ACTIVE'))
+        """
+    )
@@ -35,6 +35,44 @@ CREATE TABLE IF NOT EXISTS user_roles (
   PRIMARY KEY (user_id, role_id)
 );
 
+-- Bumped on every role/permission assignment change; terminals compare it to drop cached permissions.
+CREATE TABLE IF NOT EXISTS rbac_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO rbac_version(id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_rp_insert AFTER INSERT ON role_permissions
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_rp_update AFTER UPDATE ON role_permissions
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_rp_delete AFTER DELETE ON role_permissions
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_ur_insert AFTER INSERT ON user_roles
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_ur_update AFTER UPDATE ON user_roles
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rbac_version_ur_delete AFTER DELETE ON user_roles
+BEGIN
+  UPDATE rbac_version SET version = version + 1 WHERE id = 1;
+END;
+
 CREATE TABLE IF NOT EXISTS sessions (
   id INTEGER PRIMARY KEY,
   user_id INTEGER NOT NULL REFERENCES users(id),
@@ -58,7 +96,8 @@ CREATE TABLE IF NOT EXISTS audit_log (
   previous_state_json TEXT,
   new_state_json TEXT,
   metadata_json TEXT,
-  created_at TEXT NOT NULL
+  created_at TEXT NOT NULL,
+  created_at_us INTEGER
 );
 
 CREATE TRIGGER IF NOT EXISTS audit_log_no_update
@@ -73,9 +112,20 @@ BEGIN
   SELECT RAISE(ABORT, 'audit_log is append-only');
 END;
 
+-- Rings that run matches in parallel; each has its own current match (pit_state). Pit 1 always exists.
+CREATE TABLE IF NOT EXISTS pits (
+  id INTEGER PRIMARY KEY,
+  code TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL,
+  is_active INTEGER NOT NULL DEFAULT 1,
+  created_at TEXT NOT NULL
+);
+
+INSERT OR IGNORE INTO pits(id, code, name, is_active, created_at) VALUES (1, 'MAIN', 'Main Pit', 1, strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now'));
+
 CREATE TABLE IF NOT EXISTS fight_matches (
   id INTEGER PRIMARY KEY,
-  match_number TEXT NOT NULL UNIQUE,
+  match_number TEXT NOT NULL,
   fight_number INTEGER UNIQUE,
   structure_code TEXT NOT NULL,
   rounds INTEGER NOT NULL,
@@ -84,7 +134,11 @@ CREATE TABLE IF NOT EXISTS fight_matches (
   started_at TEXT,
   stopped_at TEXT,
   created_by INTEGER NOT NULL REFERENCES users(id),
-  created_at TEXT NOT NULL
+  created_at TEXT NOT NULL,
+  pit_id INTEGER NOT NULL DEFAULT 1 REFERENCES pits(id),
+  business_day INTEGER,
+  -- Each pit numbers its own matches, so two pits can both run "1".
+  UNIQUE (pit_id, match_number)
 );
 
 CREATE TABLE IF NOT EXISTS fight_structures (
@@ -119,7 +173,23 @@ CREATE TABLE IF NOT EXISTS fight_results (
   result_type TEXT NOT NULL CHECK (result_type IN ('WALA','MERON','DRAW','CANCELLED','NO_CONTEST')),
   decided_by INTEGER NOT NULL REFERENCES users(id),
   decided_at TEXT NOT NULL,
-  notes TEXT
+  notes TEXT,
+  -- Copied from the match by trg_fight_results_pit so a pit's recent results are one index range.
+  pit_id INTEGER
+);
+
+-- One row per (match, pool_version) a slip was sold at; slips sharing a pool state share the row.
+-- Multipliers are derived from the totals (BettingService.odds_snapshot). Slips converted from the
+-- old per-slip JSON carry negative pool_versions so they never collide with live ones.
+CREATE TABLE IF NOT EXISTS odds_snapshots (
+  id INTEGER PRIMARY KEY,
+  match_id INTEGER NOT NULL REFERENCES fight_matches(id),
+  pool_version INTEGER NOT NULL,
+  total_wala INTEGER NOT NULL,
+  total_meron INTEGER NOT NULL,
+  total_draw INTEGER NOT NULL,
+  total_all INTEGER NOT NULL,
+  UNIQUE (match_id, pool_version)
 );
 
 CREATE TABLE IF NOT EXISTS bet_slips (
@@ -128,14 +198,18 @@ CREATE TABLE IF NOT EXISTS bet_slips (
   match_id INTEGER NOT NULL REFERENCES fight_matches(id),
   side TEXT NOT NULL CHECK (side IN ('WALA','MERON','DRAW')),
   amount INTEGER NOT NULL CHECK (amount >= 10),
-  odds_snapshot_json TEXT NOT NULL,
+  odds_snapshot_id INTEGER REFERENCES odds_snapshots(id),
   status TEXT NOT NULL CHECK (status IN ('ENCODED','PRINTED','PAID','ARCHIVED','VOIDED','REFUNDED')),
   encoded_by INTEGER NOT NULL REFERENCES users(id),
   encoded_at TEXT NOT NULL,
+  encoded_at_us INTEGER,
+  business_day INTEGER,
   printed_at TEXT,
   payout_by INTEGER REFERENCES users(id),
   payout_at TEXT,
+  payout_at_us INTEGER,
   payout_amount INTEGER,
+  payout_business_day INTEGER,
   qr_payload TEXT NOT NULL UNIQUE,
   device_id TEXT NOT NULL,
   archived_at TEXT
@@ -176,11 +250,11 @@ CREATE TABLE IF NOT EXISTS cash_movements (
   amount INTEGER NOT NULL CHECK (amount > 0),
   notes TEXT,
   created_by INTEGER NOT NULL REFERENCES users(id),
-  created_at TEXT NOT NULL
+  created_at TEXT NOT NULL,
+  created_at_us INTEGER,
+  business_day INTEGER
 );
 
-CREATE INDEX IF NOT EXISTS idx_cash_movements_drawer_created ON cash_movements(drawer_id, created_at);
-
 CREATE TABLE IF NOT EXISTS canteen_items (
   id INTEGER PRIMARY KEY,
   sku TEXT NOT NULL UNIQUE,
@@ -199,22 +273,22 @@ CREATE TABLE IF NOT EXISTS canteen_stock_movements (
   reference_type TEXT,
   reference_id TEXT,
   created_by INTEGER NOT NULL REFERENCES users(id),
-  created_at TEXT NOT NULL
+  created_at TEXT NOT NULL,
+  created_at_us INTEGER
 );
 
-CREATE INDEX IF NOT EXISTS idx_canteen_stock_item_created ON canteen_stock_movements(item_id, created_at);
-
 CREATE TABLE IF NOT EXISTS canteen_sales (
   id INTEGER PRIMARY KEY,
   receipt_number TEXT NOT NULL UNIQUE,
   drawer_id INTEGER NOT NULL REFERENCES cash_drawers(id),
   sold_by INTEGER NOT NULL REFERENCES users(id),
   sold_at TEXT NOT NULL,
+  sold_at_us INTEGER,
+  business_day INTEGER,
   total_amount INTEGER NOT NULL CHECK (total_amount >= 0),
   status TEXT NOT NULL CHECK (status IN ('PAID','VOIDED'))
 );
 
-CREATE INDEX IF NOT EXISTS idx_canteen_sales_sold_at ON canteen_sales(sold_at);
 
 CREATE TABLE IF NOT EXISTS canteen_sale_lines (
   id INTEGER PRIMARY KEY,
@@ -225,6 +299,25 @@ CREATE TABLE IF NOT EXISTS canteen_sale_lines (
   line_total INTEGER NOT NULL CHECK (line_total >= 0)
 );
 
+CREATE TABLE IF NOT EXISTS print_jobs (
+  id INTEGER PRIMARY KEY,
+  job_type TEXT NOT NULL CHECK (job_type IN ('BET_SLIP','CANTEEN_RECEIPT')),
+  reference_id TEXT,
+  payload_json TEXT NOT NULL,
+  device_id TEXT NOT NULL,
+  status TEXT NOT NULL CHECK (status IN ('QUEUED','PRINTING','DONE','FAILED')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TEXT,
+  last_error TEXT,
+  is_reprint INTEGER NOT NULL DEFAULT 0,
+  created_by INTEGER REFERENCES users(id),
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  printed_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_print_jobs_device_status ON print_jobs(device_id, status, id);
+
 CREATE VIEW IF NOT EXISTS vw_bet_totals AS
 SELECT
   match_id,
@@ -258,3 +351,295 @@ WHEN (SELECT locked_at IS NOT NULL FROM fight_matches WHERE id = OLD.match_id)
 BEGIN
   SELECT RAISE(ABORT, 'Fight is locked; entries cannot be deleted');
 END;
+
+-- Daily rollups maintained by the triggers below; reports read these instead of scanning slips/sales.
+-- Keyed by integer business_day (YYYYMMDD, venue-local with cutoff; see cockpit.utils.clock).
+-- Bets count on the day/cashier that encoded them, payouts on the day/cashier that paid them out.
+-- VOIDED/REFUNDED slips contribute nothing. Rebuild with `python -m cockpit.cli rebuild-rollups`.
+-- Indexes on the business_day source columns live in migrate.py, after older files gain the columns.
+CREATE TABLE IF NOT EXISTS rollup_bets (
+  business_day INTEGER NOT NULL,
+  user_id INTEGER NOT NULL,
+  match_id INTEGER NOT NULL,
+  bets_count INTEGER NOT NULL DEFAULT 0,
+  bet_in INTEGER NOT NULL DEFAULT 0,
+  payouts_count INTEGER NOT NULL DEFAULT 0,
+  payouts INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (business_day, user_id, match_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_rollup_bets_user ON rollup_bets(user_id, business_day);
+CREATE INDEX IF NOT EXISTS idx_rollup_bets_match ON rollup_bets(match_id);
+
+CREATE TABLE IF NOT EXISTS rollup_canteen (
+  business_day INTEGER NOT NULL,
+  user_id INTEGER NOT NULL,
+  sales_count INTEGER NOT NULL DEFAULT 0,
+  sales_total INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (business_day, user_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_rollup_canteen_user ON rollup_canteen(user_id, business_day);
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_bets_insert
+AFTER INSERT ON bet_slips
+WHEN NEW.status NOT IN ('VOIDED','REFUNDED')
+BEGIN
+  INSERT INTO rollup_bets(business_day, user_id, match_id, bets_count, bet_in)
+  SELECT NEW.business_day, NEW.encoded_by, NEW.match_id, 1, NEW.amount
+  WHERE NEW.business_day IS NOT NULL
+  ON CONFLICT(business_day, user_id, match_id) DO UPDATE SET bets_count = bets_count + 1, bet_in = bet_in + excluded.bet_in;
+  INSERT INTO rollup_bets(business_day, user_id, match_id, payouts_count, payouts)
+  SELECT NEW.payout_business_day, NEW.payout_by, NEW.match_id, 1, COALESCE(NEW.payout_amount, 0)
+  WHERE NEW.payout_business_day IS NOT NULL AND NEW.payout_by IS NOT NULL
+  ON CONFLICT(business_day, user_id, match_id) DO UPDATE SET payouts_count = payouts_count + 1, payouts = payouts + excluded.payouts;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_bets_update_stake
+AFTER UPDATE OF status, amount, business_day, encoded_by, match_id ON bet_slips
+WHEN (OLD.status IN ('VOIDED','REFUNDED')) <> (NEW.status IN ('VOIDED','REFUNDED'))
+  OR OLD.amount <> NEW.amount OR OLD.business_day IS NOT NEW.business_day
+  OR OLD.encoded_by <> NEW.encoded_by OR OLD.match_id <> NEW.match_id
+BEGIN
+  UPDATE rollup_bets SET bets_count = bets_count - 1, bet_in = bet_in - OLD.amount
+  WHERE OLD.status NOT IN ('VOIDED','REFUNDED')
+    AND business_day = OLD.business_day AND user_id = OLD.encoded_by AND match_id = OLD.match_id;
+  INSERT INTO rollup_bets(business_day, user_id, match_id, bets_count, bet_in)
+  SELECT NEW.business_day, NEW.encoded_by, NEW.match_id, 1, NEW.amount
+  WHERE NEW.status NOT IN ('VOIDED','REFUNDED') AND NEW.business_day IS NOT NULL
+  ON CONFLICT(business_day, user_id, match_id) DO UPDATE SET bets_count = bets_count + 1, bet_in = bet_in + excluded.bet_in;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_bets_update_payout
+AFTER UPDATE OF status, payout_business_day, payout_by, payout_amount, match_id ON bet_slips
+WHEN (OLD.status IN ('VOIDED','REFUNDED')) <> (NEW.status IN ('VOIDED','REFUNDED'))
+  OR OLD.payout_business_day IS NOT NEW.payout_business_day OR OLD.payout_by IS NOT NEW.payout_by
+  OR OLD.payout_amount IS NOT NEW.payout_amount OR OLD.match_id <> NEW.match_id
+BEGIN
+  UPDATE rollup_bets SET payouts_count = payouts_count - 1, payouts = payouts - COALESCE(OLD.payout_amount, 0)
+  WHERE OLD.status NOT IN ('VOIDED','REFUNDED') AND OLD.payout_business_day IS NOT NULL AND OLD.payout_by IS NOT NULL
+    AND business_day = OLD.payout_business_day AND user_id = OLD.payout_by AND match_id = OLD.match_id;
+  INSERT INTO rollup_bets(business_day, user_id, match_id, payouts_count, payouts)
+  SELECT NEW.payout_business_day, NEW.payout_by, NEW.match_id, 1, COALESCE(NEW.payout_amount, 0)
+  WHERE NEW.status NOT IN ('VOIDED','REFUNDED') AND NEW.payout_business_day IS NOT NULL AND NEW.payout_by IS NOT NULL
+  ON CONFLICT(business_day, user_id, match_id) DO UPDATE SET payouts_count = payouts_count + 1, payouts = payouts + excluded.payouts;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_bets_delete
+AFTER DELETE ON bet_slips
+WHEN OLD.status NOT IN ('VOIDED','REFUNDED')
+BEGIN
+  UPDATE rollup_bets SET bets_count = bets_count - 1, bet_in = bet_in - OLD.amount
+  WHERE business_day = OLD.business_day AND user_id = OLD.encoded_by AND match_id = OLD.match_id;
+  UPDATE rollup_bets SET payouts_count = payouts_count - 1, payouts = payouts - COALESCE(OLD.payout_amount, 0)
+  WHERE OLD.payout_business_day IS NOT NULL AND OLD.payout_by IS NOT NULL
+    AND business_day = OLD.payout_business_day AND user_id = OLD.payout_by AND match_id = OLD.match_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_canteen_insert
+AFTER INSERT ON canteen_sales
+WHEN NEW.status = 'PAID' AND NEW.business_day IS NOT NULL
+BEGIN
+  INSERT INTO rollup_canteen(business_day, user_id, sales_count, sales_total)
+  VALUES (NEW.business_day, NEW.sold_by, 1, NEW.total_amount)
+  ON CONFLICT(business_day, user_id) DO UPDATE SET sales_count = sales_count + 1, sales_total = sales_total + excluded.sales_total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_canteen_update
+AFTER UPDATE OF status, total_amount, business_day, sold_by ON canteen_sales
+WHEN OLD.status <> NEW.status OR OLD.total_amount <> NEW.total_amount
+  OR OLD.business_day IS NOT NEW.business_day OR OLD.sold_by <> NEW.sold_by
+BEGIN
+  UPDATE rollup_canteen SET sales_count = sales_count - 1, sales_total = sales_total - OLD.total_amount
+  WHERE OLD.status = 'PAID' AND business_day = OLD.business_day AND user_id = OLD.sold_by;
+  INSERT INTO rollup_canteen(business_day, user_id, sales_count, sales_total)
+  SELECT NEW.business_day, NEW.sold_by, 1, NEW.total_amount
+  WHERE NEW.status = 'PAID' AND NEW.business_day IS NOT NULL
+  ON CONFLICT(business_day, user_id) DO UPDATE SET sales_count = sales_count + 1, sales_total = sales_total + excluded.sales_total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_canteen_delete
+AFTER DELETE ON canteen_sales
+WHEN OLD.status = 'PAID'
+BEGIN
+  UPDATE rollup_canteen SET sales_count = sales_count - 1, sales_total = sales_total - OLD.total_amount
+  WHERE business_day = OLD.business_day AND user_id = OLD.sold_by;
+END;
+
+-- Live pool per match, kept by triggers in the same transaction as the slip write.
+-- pool_version increases on every change to the match's totals.
+CREATE TABLE IF NOT EXISTS match_pools (
+  match_id INTEGER PRIMARY KEY REFERENCES fight_matches(id),
+  total_wala INTEGER NOT NULL DEFAULT 0,
+  total_meron INTEGER NOT NULL DEFAULT 0,
+  total_draw INTEGER NOT NULL DEFAULT 0,
+  total_all INTEGER NOT NULL DEFAULT 0,
+  bets_count INTEGER NOT NULL DEFAULT 0,
+  pool_version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_match_pools_insert
+AFTER INSERT ON bet_slips
+WHEN NEW.status NOT IN ('VOIDED','REFUNDED')
+BEGIN
+  INSERT INTO match_pools(match_id, total_wala, total_meron, total_draw, total_all, bets_count, pool_version)
+  VALUES (
+    NEW.match_id,
+    CASE WHEN NEW.side = 'WALA' THEN NEW.amount ELSE 0 END,
+    CASE WHEN NEW.side = 'MERON' THEN NEW.amount ELSE 0 END,
+    CASE WHEN NEW.side = 'DRAW' THEN NEW.amount ELSE 0 END,
+    NEW.amount, 1, 1
+  )
+  ON CONFLICT(match_id) DO UPDATE SET
+    total_wala = total_wala + excluded.total_wala,
+    total_meron = total_meron + excluded.total_meron,
+    total_draw = total_draw + excluded.total_draw,
+    total_all = total_all + excluded.total_all,
+    bets_count = bets_count + 1,
+    pool_version = pool_version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_match_pools_update
+AFTER UPDATE OF status, amount, side, match_id ON bet_slips
+WHEN (OLD.status IN ('VOIDED','REFUNDED')) <> (NEW.status IN ('VOIDED','REFUNDED'))
+  OR OLD.amount <> NEW.amount OR OLD.side <> NEW.side OR OLD.match_id <> NEW.match_id
+BEGIN
+  UPDATE match_pools SET
+    total_wala = total_wala - CASE WHEN OLD.side = 'WALA' THEN OLD.amount ELSE 0 END,
+    total_meron = total_meron - CASE WHEN OLD.side = 'MERON' THEN OLD.amount ELSE 0 END,
+    total_draw = total_draw - CASE WHEN OLD.side = 'DRAW' THEN OLD.amount ELSE 0 END,
+    total_all = total_all - OLD.amount,
+    bets_count = bets_count - 1,
+    pool_version = pool_version + 1
+  WHERE match_id = OLD.match_id AND OLD.status NOT IN ('VOIDED','REFUNDED');
+  INSERT INTO match_pools(match_id, total_wala, total_meron, total_draw, total_all, bets_count, pool_version)
+  SELECT
+    NEW.match_id,
+    CASE WHEN NEW.side = 'WALA' THEN NEW.amount ELSE 0 END,
+    CASE WHEN NEW.side = 'MERON' THEN NEW.amount ELSE 0 END,
+    CASE WHEN NEW.side = 'DRAW' THEN NEW.amount ELSE 0 END,
+    NEW.amount, 1, 1
+  WHERE NEW.status NOT IN ('VOIDED','REFUNDED')
+  ON CONFLICT(match_id) DO UPDATE SET
+    total_wala = total_wala + excluded.total_wala,
+    total_meron = total_meron + excluded.total_meron,
+    total_draw = total_draw + excluded.total_draw,
+    total_all = total_all + excluded.total_all,
+    bets_count = bets_count + 1,
+    pool_version = pool_version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_match_pools_delete
+AFTER DELETE ON bet_slips
+WHEN OLD.status NOT IN ('VOIDED','REFUNDED')
+BEGIN
+  UPDATE match_pools SET
+    total_wala = total_wala - CASE WHEN OLD.side = 'WALA' THEN OLD.amount ELSE 0 END,
+    total_meron = total_meron - CASE WHEN OLD.side = 'MERON' THEN OLD.amount ELSE 0 END,
+    total_draw = total_draw - CASE WHEN OLD.side = 'DRAW' THEN OLD.amount ELSE 0 END,
+    total_all = total_all - OLD.amount,
+    bets_count = bets_count - 1,
+    pool_version = pool_version + 1
+  WHERE match_id = OLD.match_id;
+END;
+
+-- One row per pit that its displays read first: which match is current there, and a version that
+-- moves whenever that match's state or pool changes. current_match_id is the pit's newest
+-- DRAFT/LOCKED/ACTIVE match. Each trigger touches only the pit(s) of the changed match.
+CREATE TABLE IF NOT EXISTS pit_state (
+  pit_id INTEGER PRIMARY KEY REFERENCES pits(id),
+  current_match_id INTEGER,
+  odds_version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO pit_state(pit_id, current_match_id, odds_version) VALUES (1, NULL, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_pit_state_pit_insert
+AFTER INSERT ON pits
+BEGIN
+  INSERT OR IGNORE INTO pit_state(pit_id, current_match_id, odds_version) VALUES (NEW.id, NULL, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pit_state_match_insert
+AFTER INSERT ON fight_matches
+WHEN NEW.state IN ('DRAFT','LOCKED','ACTIVE')
+BEGIN
+  UPDATE pit_state SET
+    current_match_id = (SELECT MAX(id) FROM fight_matches WHERE pit_id = NEW.pit_id AND state IN ('DRAFT','LOCKED','ACTIVE')),
+    odds_version = odds_version + 1
+  WHERE pit_id = NEW.pit_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pit_state_match_state
+AFTER UPDATE OF state, pit_id ON fight_matches
+WHEN OLD.state <> NEW.state OR OLD.pit_id <> NEW.pit_id
+BEGIN
+  UPDATE pit_state SET
+    current_match_id = (SELECT MAX(id) FROM fight_matches WHERE pit_id = pit_state.pit_id AND state IN ('DRAFT','LOCKED','ACTIVE')),
+    odds_version = odds_version + 1
+  WHERE pit_id IN (OLD.pit_id, NEW.pit_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pit_state_pool_insert
+AFTER INSERT ON match_pools
+BEGIN
+  UPDATE pit_state SET odds_version = odds_version + 1 WHERE current_match_id = NEW.match_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_pit_state_pool_update
+AFTER UPDATE ON match_pools
+BEGIN
+  UPDATE pit_state SET odds_version = odds_version + 1 WHERE current_match_id = NEW.match_id;
+END;
+
+-- Recent results read newest-first straight off this index (match_id is the rowid, so it is covered).
+-- Per pit the display reads idx_fight_results_pit_decided (pit_id, decided_at), created in migrate.py.
+CREATE INDEX IF NOT EXISTS idx_fight_results_decided ON fight_results(decided_at, result_type);
+
+CREATE TRIGGER IF NOT EXISTS trg_fight_results_pit
+AFTER INSERT ON fight_results
+BEGIN
+  UPDATE fight_results SET pit_id = (SELECT pit_id FROM fight_matches WHERE id = NEW.match_id) WHERE match_id = NEW.match_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fight_results_match_pit
+AFTER UPDATE OF pit_id ON fight_matches
+WHEN OLD.pit_id <> NEW.pit_id
+BEGIN
+  UPDATE fight_results SET pit_id = NEW.pit_id WHERE match_id = NEW.id;
+END;
+
+-- Betting caps, checked by encode_bet against match_pools and rollup_bets in the bet's own transaction.
+-- match_id NULL applies to every match and side NULL to the whole match; every applicable row is enforced.
+-- max_payout caps what the side's result would pay (for side NULL: the worst result).
+-- max_cashier_total counts one cashier's stakes on the match across sides, so it is match-wide only.
+CREATE TABLE IF NOT EXISTS bet_limits (
+  id INTEGER PRIMARY KEY,
+  match_id INTEGER REFERENCES fight_matches(id),
+  side TEXT CHECK (side IN ('WALA','MERON','DRAW')),
+  max_bet INTEGER CHECK (max_bet > 0),
+  max_total INTEGER CHECK (max_total > 0),
+  max_payout INTEGER CHECK (max_payout > 0),
+  max_cashier_total INTEGER CHECK (max_cashier_total IS NULL OR (max_cashier_total > 0 AND side IS NULL)),
+  created_by INTEGER REFERENCES users(id),
+  created_at TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_bet_limits_scope ON bet_limits(COALESCE(match_id, 0), COALESCE(side, ''));
+
+-- Money owed on settled slips, one row per slip with a non-zero payout (LiabilityService).
+-- Written when a result is set, closed as PAID at payout or EXPIRED by the unclaimed-slip job.
+-- drawer_id is the drawer that took the bet (its BET_IN movement).
+CREATE TABLE IF NOT EXISTS liabilities (
+  bet_id INTEGER PRIMARY KEY REFERENCES bet_slips(id),
+  match_id INTEGER NOT NULL REFERENCES fight_matches(id),
+  drawer_id INTEGER REFERENCES cash_drawers(id),
+  amount INTEGER NOT NULL CHECK (amount > 0),
+  settled_at_us INTEGER NOT NULL,
+  status TEXT NOT NULL CHECK (status IN ('UNPAID','PAID','EXPIRED')),
+  closed_at_us INTEGER
+);
+
+-- Only unpaid winnings are indexed, so outstanding totals and the expiry job never touch settled history.
+CREATE INDEX IF NOT EXISTS idx_liabilities_unpaid ON liabilities(settled_at_us, match_id, drawer_id, amount) WHERE status = 'UNPAID';
+CREATE INDEX IF NOT EXISTS idx_liabilities_match ON liabilities(match_id, status);
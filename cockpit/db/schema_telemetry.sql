@@ -0,0 +1,23 @@
+-- Low-durability tier, attached as `telemetry` (synchronous = OFF).
+-- Nothing here is financial; losing the last few writes on power loss is acceptable.
+
+CREATE TABLE IF NOT EXISTS telemetry.session_leases (
+  session_id INTEGER PRIMARY KEY,
+  user_id INTEGER NOT NULL,
+  device_id TEXT NOT NULL,
+  last_seen_at TEXT NOT NULL
+);
+
+-- Downsampled pool history per match: one row per bucket, the last sample in the bucket wins.
+-- Written by OddsRecorder; odds_snapshots in the main file remains the record of what each slip was sold at.
+CREATE TABLE IF NOT EXISTS telemetry.odds_series (
+  match_id INTEGER NOT NULL,
+  bucket_us INTEGER NOT NULL,
+  sampled_at_us INTEGER NOT NULL,
+  pool_version INTEGER NOT NULL,
+  total_wala INTEGER NOT NULL,
+  total_meron INTEGER NOT NULL,
+  total_draw INTEGER NOT NULL,
+  total_all INTEGER NOT NULL,
+  PRIMARY KEY (match_id, bucket_us)
+) WITHOUT ROWID;
@@ -0,0 +1,67 @@
+"""
+Minimal SSE client for checking a display server from a terminal.
+
+Usage:
+    python -m cockpit.display.client http://localhost:8765 [--pit CODE]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+
+@dataclass(frozen=True)
+class DisplayEvent:
+    id: int
+    payload: dict[str, Any]
+
+
+def iter_events(base_url: str, *, pit: str | None = None, timeout: float = 30.0) -> Iterator[DisplayEvent]:
+    """Yields each `display` event from `<base_url>/events` (for one pit) until the server closes the stream."""
+    url = base_url.rstrip("/") + "/events"
+    if pit:
+        url += "?" + urllib.parse.urlencode({"pit": pit})
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        event_id, name, data = 0, "", []
+        for raw in resp:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if not line:
+                if name == "display" and data:
+                    yield DisplayEvent(id=event_id, payload=json.loads("\n".join(data)))
+                name, data = "", []
+            elif line.startswith(":"):
+                continue
+            else:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = int(value)
+                elif field == "event":
+                    name = value
+                elif field == "data":
+                    data.append(value)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m cockpit.display.client", description="Print display server updates")
+    parser.add_argument("url", nargs="?", default="http://localhost:8765")
+    parser.add_argument("--pit", help="Pit code (default: the main pit)")
+    args = parser.parse_args(argv)
+    try:
+        for event in iter_events(args.url, pit=args.pit, timeout=60.0):
+            match = event.payload.get("match")
+            odds = event.payload.get("odds") or {}
+            label = f"Match {match['match_number']} {match['state']}" if match else "No active matches"
+            print(f"#{event.id}  {label}  total ₱{odds.get('total_all', 0)}  history={len(event.payload.get('history', []))}")
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+from cockpit.services.betting import BettingService
+from cockpit.services.payouts import DRAW_PAYOUT_MULTIPLE
+from cockpit.services.pits import DEFAULT_PIT_ID
+
+
+# DRAW pays a fixed multiple (see payout_for); shown alongside the pari-mutuel multipliers.
+DRAW_MULTIPLIER = float(DRAW_PAYOUT_MULTIPLE)
+
+
+def build_display_payload(conn: sqlite3.Connection, *, pit_id: int = DEFAULT_PIT_ID, history_limit: int = 10) -> dict[str, Any]:
+    """
+    Everything a pit's public screen shows: its current match, that pool/odds and recent results.
+
+    Reads pit_state, the match, its entries and its match_pools row by key, plus the pit's newest
+    results off idx_fight_results_pit_decided, so the cost does not grow with the season.
+    """
+    venue = conn.execute(
+        """
+        SELECT s.current_match_id, s.odds_version, p.code, p.name
+        FROM pit_state s
+        JOIN pits p ON p.id = s.pit_id
+        WHERE s.pit_id = ?
+        """,
+        (pit_id,),
+    ).fetchone()
+    match = None
+    if venue is not None and venue["current_match_id"] is not None:
+        match = conn.execute(
+            "SELECT id, match_number, COALESCE(fight_number, id) AS fight_number, state FROM fight_matches WHERE id = ?",
+            (int(venue["current_match_id"]),),
+        ).fetchone()
+
+    current: dict[str, Any] | None = None
+    odds_payload: dict[str, Any] | None = None
+    if match is not None:
+        entries = conn.execute(
+            """
+            SELECT side, entry_name
+            FROM fight_entries
+            WHERE match_id = ? AND deleted_at IS NULL
+            ORDER BY side, id
+            """,
+            (int(match["id"]),),
+        ).fetchall()
+        current = {
+            "id": int(match["id"]),
+            "match_number": match["match_number"],
+            "fight_number": match["fight_number"],
+            "state": match["state"],
+            "wala": ", ".join(e["entry_name"] for e in entries if e["side"] == "WALA") or "-",
+            "meron": ", ".join(e["entry_name"] for e in entries if e["side"] == "MERON") or "-",
+        }
+        odds = BettingService(conn, audit=None).get_odds(int(match["id"]))
+        odds_payload = {
+            "total_wala": odds.total_wala,
+            "total_meron": odds.total_meron,
+            "total_draw": odds.total_draw,
+            "total_all": odds.total_all,
+            "wala_multiplier": round(odds.wala_multiplier or 0, 2),
+            "meron_multiplier": round(odds.meron_multiplier or 0, 2),
+            "draw_multiplier": DRAW_MULTIPLIER,
+        }
+
+    history = conn.execute(
+        """
+        SELECT fm.match_number, fr.result_type, fr.decided_at
+        FROM fight_results fr
+        JOIN fight_matches fm ON fm.id = fr.match_id
+        WHERE fr.pit_id = ?
+        ORDER BY fr.decided_at DESC
+        LIMIT ?
+        """,
+        (pit_id, history_limit),
+    ).fetchall()
+    return {
+        "version": int(venue["odds_version"]) if venue is not None else 0,
+        "pit": {"id": pit_id, "code": venue["code"], "name": venue["name"]} if venue is not None else None,
+        "match": current,
+        "odds": odds_payload,
+        "history": [
+            {"match_number": r["match_number"], "result_type": r["result_type"], "decided_at": r["decided_at"]} for r in history
+        ],
+    }
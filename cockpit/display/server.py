@@ -0,0 +1,245 @@
+"""
+Read-only display server for arena screens.
+
+Each pit gets one publisher thread that watches the database with a ChangeFeed and rebuilds that
+pit's display payload once per commit; every browser showing the pit receives that same encoded
+payload over Server-Sent Events. Adding a TV adds an idle HTTP connection, not another process
+polling the database, and a busy pit never makes another pit's screens rebuild.
+
+    GET /         display page (cockpit/display/static/display.html)
+    GET /state    current payload as JSON
+    GET /events   SSE stream: a `display` event per change, a comment ping every 15 s
+
+All three take `?pit=CODE` (default: the main pit); a pit's feed starts on its first request.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from cockpit.db.connection import ChangeFeed, connect, connect_reader
+from cockpit.display.payload import build_display_payload
+from cockpit.services.errors import ValidationError
+from cockpit.services.odds_history import OddsRecorder
+from cockpit.services.pits import DEFAULT_PIT_ID, PitService
+
+
+_PAGE = Path(__file__).with_name("static") / "display.html"
+_PING_SECONDS = 15.0
+
+
+class DisplayFeed:
+    """
+    Builds one pit's payload on change and hands the encoded bytes to any number of waiting streams.
+    With `odds_sample_seconds` it also records the pit's odds history (on its own writable connection).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        pit_id: int = DEFAULT_PIT_ID,
+        poll_interval: float = 0.25,
+        odds_sample_seconds: float | None = None,
+        odds_bucket_seconds: int = 30,
+    ) -> None:
+        self._db_path = db_path
+        self._pit_id = pit_id
+        self._poll_interval = poll_interval
+        self._odds_sample_seconds = odds_sample_seconds
+        self._odds_bucket_seconds = odds_bucket_seconds
+        self._cond = threading.Condition()
+        self._version = 0
+        self._data = b"{}"
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"display-feed-{pit_id}", daemon=True)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def start(self) -> "DisplayFeed":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(5)
+
+    def snapshot(self) -> tuple[int, bytes]:
+        with self._cond:
+            return self._version, self._data
+
+    def wait_for_change(self, seen: int, timeout: float) -> tuple[int, bytes]:
+        """Blocks until the version moves past `seen` (or timeout/stop) and returns the latest."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != seen or self._stopped.is_set(), timeout)
+            return self._version, self._data
+
+    def _publish(self, data: bytes) -> None:
+        with self._cond:
+            if data == self._data:
+                return
+            self._version += 1
+            self._data = data
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        conn = connect_reader(self._db_path)
+        recorder_conn = connect(self._db_path) if self._odds_sample_seconds else None
+        try:
+            feed = ChangeFeed(conn)
+            recorder = OddsRecorder(recorder_conn, pit_id=self._pit_id, bucket_seconds=self._odds_bucket_seconds) if recorder_conn is not None else None
+            next_sample = 0.0
+            dirty = True
+            while not self._stopped.is_set():
+                try:
+                    if recorder is not None and time.monotonic() >= next_sample:
+                        next_sample = time.monotonic() + float(self._odds_sample_seconds or 0)
+                        recorder.sample()
+                    if feed.poll() or dirty:
+                        payload = build_display_payload(conn, pit_id=self._pit_id)
+                        self._publish(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                        dirty = False
+                except sqlite3.Error:
+                    # Busy or mid-checkpoint; try again on the next tick.
+                    dirty = True
+                self._stopped.wait(self._poll_interval)
+        finally:
+            conn.close()
+            if recorder_conn is not None:
+                recorder_conn.close()
+
+
+class _DisplayHandler(BaseHTTPRequestHandler):
+    server: "_DisplayHTTPServer"
+
+    def do_GET(self) -> None:
+        path, _, query = self.path.partition("?")
+        if path in ("/", "/index.html"):
+            self._send(200, "text/html; charset=utf-8", _PAGE.read_bytes())
+            return
+        if path not in ("/state", "/events"):
+            self._send(404, "text/plain; charset=utf-8", b"Not found")
+            return
+        pit = parse_qs(query).get("pit", [None])[0]
+        feed = self.server.feeds.feed_for(pit)
+        if feed is None:
+            self._send(404, "text/plain; charset=utf-8", b"Unknown pit")
+        elif path == "/state":
+            self._send(200, "application/json; charset=utf-8", feed.wait_for_change(0, 5.0)[1])
+        else:
+            self._stream(feed)
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, feed: DisplayFeed) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        seen = 0  # version 0 is the placeholder before the first payload is built
+        try:
+            self.wfile.write(b"retry: 2000\n\n")
+            while not feed.stopped:
+                version, data = feed.wait_for_change(seen, _PING_SECONDS)
+                if version == seen:
+                    self.wfile.write(b": ping\n\n")
+                else:
+                    self.wfile.write(b"id: %d\nevent: display\ndata: %s\n\n" % (version, data))
+                    seen = version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class _PitFeeds:
+    """One DisplayFeed per pit, started on the first request for that pit."""
+
+    def __init__(self, db_path: Path, **feed_options: object) -> None:
+        self._db_path = db_path
+        self._feed_options = feed_options
+        self._lock = threading.Lock()
+        self._feeds: dict[int, DisplayFeed] = {}
+        self._stopped = False
+
+    def feed_for(self, pit_code: str | None) -> DisplayFeed | None:
+        pit_id = DEFAULT_PIT_ID
+        if pit_code:
+            conn = connect_reader(self._db_path)
+            try:
+                pit_id = PitService(conn, audit=None).get_by_code(pit_code).id
+            except ValidationError:
+                return None
+            finally:
+                conn.close()
+        with self._lock:
+            if self._stopped:
+                return None
+            feed = self._feeds.get(pit_id)
+            if feed is None:
+                feed = self._feeds[pit_id] = DisplayFeed(self._db_path, pit_id=pit_id, **self._feed_options).start()  # type: ignore[arg-type]
+            return feed
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            feeds = list(self._feeds.values())
+        for feed in feeds:
+            feed.stop()
+
+
+class _DisplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], feeds: _PitFeeds) -> None:
+        super().__init__(address, _DisplayHandler)
+        self.feeds = feeds
+
+
+class DisplayServer:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        host: str = "0.0.0.0",
+        port: int = 8765,
+        poll_interval: float = 0.25,
+        odds_sample_seconds: float | None = None,
+        odds_bucket_seconds: int = 30,
+    ) -> None:
+        self._feeds = _PitFeeds(
+            db_path, poll_interval=poll_interval, odds_sample_seconds=odds_sample_seconds, odds_bucket_seconds=odds_bucket_seconds
+        )
+        self._httpd = _DisplayHTTPServer((host, port), self._feeds)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="display-http", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return int(self._httpd.server_address[1])
+
+    def start(self) -> "DisplayServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        # Stopping the feeds first releases every open /events stream.
+        self._feeds.stop()
+        self._httpd.shutdown()
+        self._httpd.server_close()
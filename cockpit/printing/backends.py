@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from cockpit.config import AppConfig
+
+
+_EXTENSIONS: dict[str, str] = {"html": ".html", "text": ".txt", "escpos": ".bin"}
+
+
+class PrintBackend:
+    """
+    Destination for rendered print documents.
+
+    `content_type` tells the spooler which renderer output this backend consumes.
+    `send` must raise on failure so the job is retried.
+    """
+
+    content_type: str = "html"
+    render_options: dict[str, Any] = {}
+
+    def send(self, *, name: str, document: bytes) -> None:
+        raise NotImplementedError
+
+
+class FileSinkBackend(PrintBackend):
+    """Writes every document into a directory (testing, or a watched hot-folder)."""
+
+    def __init__(self, directory: Path, *, content_type: str = "html", render_options: dict[str, Any] | None = None) -> None:
+        self.directory = directory
+        self.content_type = content_type
+        self.render_options = dict(render_options or {})
+
+    def send(self, *, name: str, document: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{name}{_EXTENSIONS.get(self.content_type, '.bin')}"
+        tmp = path.with_suffix(path.suffix + ".part")
+        tmp.write_bytes(document)
+        os.replace(tmp, path)
+
+
+class OsPrintBackend(PrintBackend):
+    """Hands an HTML file to the Windows shell "print" verb (opens it if printing is unavailable)."""
+
+    content_type = "html"
+
+    def send(self, *, name: str, document: bytes) -> None:
+        fd, path = tempfile.mkstemp(prefix=f"{name}_", suffix=".html")
+        with os.fdopen(fd, "wb") as f:
+            f.write(document)
+        try:
+            os.startfile(path, "print")  # type: ignore[attr-defined]
+        except OSError:
+            os.startfile(path)  # type: ignore[attr-defined]
+
+
+class RawPrinterBackend(PrintBackend):
+    """
+    Writes the document bytes straight to a printer device path (e.g. /dev/usb/lp0, COM3, \\\\host\\printer).
+
+    Defaults to ESC/POS so thermal slip printers get a ready-to-print byte stream without a driver.
+    """
+
+    def __init__(self, device_path: str, *, content_type: str = "escpos", render_options: dict[str, Any] | None = None) -> None:
+        self.device_path = device_path
+        self.content_type = content_type
+        self.render_options = dict(render_options or {})
+
+    def send(self, *, name: str, document: bytes) -> None:
+        with open(self.device_path, "wb") as dev:
+            dev.write(document)
+            dev.flush()
+
+
+def make_backend(config: AppConfig) -> PrintBackend:
+    escpos_options = {"paper_mm": config.escpos_paper_mm, "native_qr": config.escpos_native_qr}
+    if config.print_backend == "os":
+        return OsPrintBackend()
+    if config.print_backend == "file":
+        content_type = config.print_format or "html"
+        return FileSinkBackend(config.print_dir, content_type=content_type, render_options=escpos_options if content_type == "escpos" else None)
+    if config.print_backend == "raw":
+        if not config.printer_device:
+            raise ValueError("printer_device must be set for the raw print backend")
+        content_type = config.print_format or "escpos"
+        return RawPrinterBackend(config.printer_device, content_type=content_type, render_options=escpos_options if content_type == "escpos" else None)
+    raise ValueError(f"Unknown print backend: {config.print_backend}")
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any
+
+from cockpit.printing.qrcache import qr_for_payload
+from cockpit.utils.qrcodegen import QrCode
+
+
+# Printable width in dots at 203 dpi for the usual thermal roll sizes.
+PAPER_WIDTH_DOTS: dict[int, int] = {58: 384, 80: 576}
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+INIT = ESC + b"@"
+LF = b"\n"
+ALIGN_LEFT = ESC + b"a\x00"
+ALIGN_CENTER = ESC + b"a\x01"
+BOLD_ON = ESC + b"E\x01"
+BOLD_OFF = ESC + b"E\x00"
+DOUBLE_SIZE = GS + b"!\x11"
+NORMAL_SIZE = GS + b"!\x00"
+FEED_AND_CUT = GS + b"V\x42\x03"  # feed 3 lines, then partial cut
+
+_QR_ECC_LEVEL = {QrCode.Ecc.LOW: 48, QrCode.Ecc.MEDIUM: 49, QrCode.Ecc.QUARTILE: 50, QrCode.Ecc.HIGH: 51}
+
+
+def _text(value: str) -> bytes:
+    # Thermal printers default to a single-byte code page; keep slips plain ASCII.
+    return value.replace("₱", "P").encode("ascii", errors="replace")
+
+
+def raster_image(rows: list[bytes], width_dots: int) -> bytes:
+    """`GS v 0` raster bit image from pre-packed rows (MSB = leftmost dot)."""
+    width_bytes = (width_dots + 7) // 8
+    height = len(rows)
+    header = GS + b"v0\x00" + bytes((width_bytes & 0xFF, width_bytes >> 8, height & 0xFF, height >> 8))
+    return header + b"".join(rows)
+
+
+def qr_raster(qr: QrCode, *, scale: int, border: int = 2) -> bytes:
+    """Packs a QrCode into a 1-bit raster image, `scale` dots per module, with a light quiet zone."""
+    size = qr.get_size()
+    width_dots = (size + border * 2) * scale
+    width_bytes = (width_dots + 7) // 8
+    pad_bits = width_bytes * 8 - width_dots
+    on, off = "1" * scale, "0" * scale
+    quiet = off * border
+    blank = bytes(width_bytes)
+    rows: list[bytes] = [blank] * (border * scale)
+    for y in range(size):
+        bits = quiet + "".join(on if dark else off for dark in qr.get_row(y)) + quiet
+        packed = (int(bits, 2) << pad_bits).to_bytes(width_bytes, "big")
+        rows.extend([packed] * scale)
+    rows.extend([blank] * (border * scale))
+    return raster_image(rows, width_dots)
+
+
+def qr_native(data: str, *, module_size: int = 6, ecl: QrCode.Ecc = QrCode.Ecc.MEDIUM) -> bytes:
+    """`GS ( k` commands that let the printer firmware build and print the QR symbol itself."""
+    payload = data.encode("utf-8")
+    store_len = len(payload) + 3
+
+    def fn(cn: int, fn_code: int, params: bytes) -> bytes:
+        n = len(params) + 2
+        return GS + b"(k" + bytes((n & 0xFF, n >> 8, cn, fn_code)) + params
+
+    return (
+        fn(49, 65, b"\x32\x00")  # model 2
+        + fn(49, 67, bytes((module_size,)))
+        + fn(49, 69, bytes((_QR_ECC_LEVEL[ecl],)))
+        + GS + b"(k" + bytes((store_len & 0xFF, store_len >> 8, 49, 80, 48)) + payload
+        + fn(49, 81, b"\x30")  # print stored symbol
+    )
+
+
+def _qr_block(qr_payload: str, *, paper_mm: int, native_qr: bool) -> bytes:
+    if native_qr:
+        return qr_native(qr_payload)
+    qr = qr_for_payload(qr_payload)
+    # Largest whole-dot module that fits roughly 60% of the roll width keeps the slip short.
+    scale = max(1, int(PAPER_WIDTH_DOTS.get(paper_mm, 384) * 0.6) // (qr.get_size() + 4))
+    return qr_raster(qr, scale=scale)
+
+
+def render_bet_slip_escpos(payload: dict[str, Any], *, paper_mm: int = 58, native_qr: bool = False) -> bytes:
+    out = bytearray(INIT)
+    out += ALIGN_CENTER + BOLD_ON + DOUBLE_SIZE + _text("BET SLIP") + LF + NORMAL_SIZE + BOLD_OFF
+    if payload.get("is_reprint"):
+        out += _text("** REPRINT **") + LF
+    out += ALIGN_LEFT
+    out += _text(f"Slip #: {payload['slip_number']}") + LF
+    out += _text(f"Match #: {payload['match_number']}") + LF
+    out += BOLD_ON + _text(f"Side: {payload['side']}   Amount: P{payload['amount']}") + BOLD_OFF + LF
+    out += ALIGN_CENTER + _qr_block(payload["qr_payload"], paper_mm=paper_mm, native_qr=native_qr) + LF
+    out += _text(payload["qr_payload"]) + LF
+    out += ALIGN_LEFT + FEED_AND_CUT
+    return bytes(out)
+
+
+def render_canteen_receipt_escpos(payload: dict[str, Any], *, paper_mm: int = 58) -> bytes:
+    out = bytearray(INIT)
+    out += ALIGN_CENTER + BOLD_ON + _text("CANTEEN RECEIPT") + BOLD_OFF + LF + ALIGN_LEFT
+    out += _text(f"Receipt #: {payload['receipt_number']}") + LF
+    out += _text(f"Date: {payload['sold_at']}") + LF
+    for line in payload["lines"]:
+        out += _text(f"{line['qty']} x {line['name']} @ P{line['unit_price']} = P{line['line_total']}") + LF
+    out += BOLD_ON + _text(f"TOTAL: P{payload['total_amount']}") + BOLD_OFF + LF
+    out += FEED_AND_CUT
+    return bytes(out)
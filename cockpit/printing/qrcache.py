@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from cockpit.utils import qrfast
+from cockpit.utils.qrcodegen import QrCode
+
+
+_MAX_ENTRIES = 256
+_lock = threading.Lock()
+_codes: OrderedDict[str, QrCode] = OrderedDict()
+
+
+def qr_for_payload(qr_payload: str) -> QrCode:
+    """
+    Slip QR symbol for a payload, from a small shared LRU.
+
+    The slip identity pool calls this ahead of time so the print worker finds the
+    symbol already encoded; reprints hit the same cache.
+    """
+    with _lock:
+        qr = _codes.get(qr_payload)
+        if qr is not None:
+            _codes.move_to_end(qr_payload)
+            return qr
+    qr = qrfast.encode_text(qr_payload, QrCode.Ecc.MEDIUM)
+    with _lock:
+        _codes[qr_payload] = qr
+        while len(_codes) > _MAX_ENTRIES:
+            _codes.popitem(last=False)
+    return qr
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Mapping
+
+from cockpit.printing.escpos import render_bet_slip_escpos, render_canteen_receipt_escpos
+from cockpit.printing.qrcache import qr_for_payload
+from cockpit.utils.qrcodegen import QrCode
+
+
+_SLIP_BORDER = 2
+_DARK_RUN = re.compile(b"\x01+")
+
+# Static slip markup is built once; only the per-slip fields are substituted.
+_BET_SLIP_TEMPLATE = """<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Bet Slip {slip_number}</title>
+  <style>
+    body {{ font-family: Segoe UI, Arial, sans-serif; }}
+    .slip {{ width: 320px; }}
+    .title {{ font-size: 18px; font-weight: 700; margin-bottom: 8px; }}
+    .row {{ font-size: 14px; margin: 2px 0; }}
+    .qr {{ margin-top: 10px; }}
+    .qr svg {{ width: 220px; height: 220px; }}
+    .payload {{ font-family: Consolas, monospace; font-size: 12px; word-break: break-all; }}
+  </style>
+</head>
+<body>
+  <div class="slip">
+    <div class="title">COCKFIGHT BET SLIP</div>
+    {reprint}
+    <div class="row">Slip #: {slip_number}</div>
+    <div class="row">Match #: {match_number}</div>
+    <div class="row">Side: {side}</div>
+    <div class="row">Amount: ₱{amount}</div>
+    <div class="qr">{svg}</div>
+    <div class="row">QR Payload:</div>
+    <div class="payload">{qr_payload}</div>
+  </div>
+</body>
+</html>
+""".format
+
+
+def qr_to_svg(qr: QrCode, border: int = _SLIP_BORDER) -> str:
+    """
+    SVG for a QR symbol with each horizontal run of dark modules merged into one
+    subpath (`M x,y h n v1 h -n z`), so the path has one command per run, not per module.
+    """
+    size = qr.get_size()
+    parts: list[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {size + border * 2} {size + border * 2}" stroke="none">'
+        '<rect width="100%" height="100%" fill="#FFFFFF"/><path d="'
+    ]
+    append = parts.append
+    for y in range(size):
+        for m in _DARK_RUN.finditer(bytes(qr.get_row(y))):
+            run = m.end() - m.start()
+            append(f"M{m.start() + border},{y + border}h{run}v1h-{run}z")
+    append('" fill="#000000"/></svg>')
+    return "".join(parts)
+
+
+@lru_cache(maxsize=64)
+def _qr_svg_for_payload(qr_payload: str) -> str:
+    # Reprints of the same slip hit this cache.
+    return qr_to_svg(qr_for_payload(qr_payload))
+
+
+def render_bet_slip_html(payload: dict[str, Any]) -> bytes:
+    return _BET_SLIP_TEMPLATE(
+        slip_number=payload["slip_number"],
+        reprint='<div class="row">** REPRINT **</div>' if payload.get("is_reprint") else "",
+        match_number=payload["match_number"],
+        side=payload["side"],
+        amount=payload["amount"],
+        svg=_qr_svg_for_payload(payload["qr_payload"]),
+        qr_payload=payload["qr_payload"],
+    ).encode("utf-8")
+
+
+def render_bet_slip_text(payload: dict[str, Any]) -> bytes:
+    lines = ["COCKFIGHT BET SLIP"]
+    if payload.get("is_reprint"):
+        lines.append("** REPRINT **")
+    lines += [
+        f"Slip #: {payload['slip_number']}",
+        f"Match #: {payload['match_number']}",
+        f"Side: {payload['side']}",
+        f"Amount: P{payload['amount']}",
+        "QR Payload:",
+        payload["qr_payload"],
+        "",
+        "",
+    ]
+    return "\n".join(lines).encode("utf-8")
+
+
+def render_canteen_receipt_html(payload: dict[str, Any]) -> bytes:
+    rows = "".join(
+        f'<div class="row">{line["qty"]} x {line["name"]} @ ₱{line["unit_price"]} = ₱{line["line_total"]}</div>'
+        for line in payload["lines"]
+    )
+    html = f"""<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Receipt {payload["receipt_number"]}</title>
+  <style>
+    body {{ font-family: Segoe UI, Arial, sans-serif; }}
+    .slip {{ width: 320px; }}
+    .title {{ font-size: 18px; font-weight: 700; margin-bottom: 8px; }}
+    .row {{ font-size: 14px; margin: 2px 0; }}
+    .total {{ font-size: 16px; font-weight: 700; margin-top: 8px; }}
+  </style>
+</head>
+<body>
+  <div class="slip">
+    <div class="title">CANTEEN RECEIPT</div>
+    <div class="row">Receipt #: {payload["receipt_number"]}</div>
+    <div class="row">Date: {payload["sold_at"]}</div>
+    {rows}
+    <div class="total">TOTAL: ₱{payload["total_amount"]}</div>
+  </div>
+</body>
+</html>
+"""
+    return html.encode("utf-8")
+
+
+def render_canteen_receipt_text(payload: dict[str, Any]) -> bytes:
+    lines = [
+        "CANTEEN RECEIPT",
+        f"Receipt #: {payload['receipt_number']}",
+        f"Date: {payload['sold_at']}",
+    ]
+    for line in payload["lines"]:
+        lines.append(f"{line['qty']} x {line['name']} @ P{line['unit_price']} = P{line['line_total']}")
+    lines += [f"TOTAL: P{payload['total_amount']}", "", ""]
+    return "\n".join(lines).encode("utf-8")
+
+
+_NO_OPTIONS: frozenset[str] = frozenset()
+
+# (job type, content type) -> renderer and the backend render options it takes.
+_RENDERERS: dict[tuple[str, str], tuple[Callable[..., bytes], frozenset[str]]] = {
+    ("BET_SLIP", "html"): (render_bet_slip_html, _NO_OPTIONS),
+    ("BET_SLIP", "text"): (render_bet_slip_text, _NO_OPTIONS),
+    ("BET_SLIP", "escpos"): (render_bet_slip_escpos, frozenset({"paper_mm", "native_qr"})),
+    ("CANTEEN_RECEIPT", "html"): (render_canteen_receipt_html, _NO_OPTIONS),
+    ("CANTEEN_RECEIPT", "text"): (render_canteen_receipt_text, _NO_OPTIONS),
+    ("CANTEEN_RECEIPT", "escpos"): (render_canteen_receipt_escpos, frozenset({"paper_mm"})),
+}
+
+# A backend passes one option set for every job type, so any option of its content type is valid.
+_CONTENT_OPTIONS: dict[str, frozenset[str]] = {
+    content_type: _NO_OPTIONS.union(*(options for (_, ct), (_, options) in _RENDERERS.items() if ct == content_type))
+    for _, content_type in _RENDERERS
+}
+
+
+def render_job(job_type: str, payload: dict[str, Any], content_type: str, options: Mapping[str, Any] | None = None) -> bytes:
+    """
+    Renders a job for a backend; `options` are renderer keyword arguments (e.g. ESC/POS paper width).
+
+    Options unknown for the content type raise ValueError; known ones a renderer does not take
+    (e.g. `native_qr` for canteen receipts, which carry no QR) are dropped.
+    """
+    entry = _RENDERERS.get((job_type, content_type))
+    if entry is None:
+        raise ValueError(f"No renderer for {job_type} as {content_type}")
+    renderer, accepted = entry
+    options = options or {}
+    unknown = sorted(set(options) - _CONTENT_OPTIONS[content_type])
+    if unknown:
+        raise ValueError(f"Unknown {content_type} render options: {', '.join(unknown)}")
+    return renderer(payload, **{k: v for k, v in options.items() if k in accepted})
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from cockpit.db.connection import connect, transaction
+from cockpit.printing.backends import PrintBackend
+from cockpit.printing.render import render_job
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.utils.clock import format_timestamp, utc_now
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PrintJobStatus:
+    id: int
+    job_type: str
+    reference_id: str | None
+    status: str
+    attempts: int
+    last_error: str | None
+
+
+class PrintSpooler:
+    """
+    Persistent print queue (table `print_jobs`).
+
+    Jobs are enqueued inside the caller's transaction, so a slip and its print job
+    commit together. A PrintWorker on the same terminal (device_id) renders and
+    dispatches them in the background; the encode path never waits on the printer.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None) -> None:
+        self._conn = conn
+        self._audit = audit
+
+    def _enqueue(self, *, job_type: str, reference_id: str, payload: dict[str, Any], device_id: str, created_by: int | None, is_reprint: bool) -> int:
+        now = utc_now().isoformat()
+        cur = self._conn.execute(
+            """
+            INSERT INTO print_jobs(job_type, reference_id, payload_json, device_id, status, attempts, next_attempt_at, last_error, is_reprint, created_by, created_at, updated_at, printed_at)
+            VALUES (?, ?, ?, ?, 'QUEUED', 0, NULL, NULL, ?, ?, ?, ?, NULL)
+            """,
+            (job_type, reference_id, json.dumps(payload, ensure_ascii=False), device_id, 1 if is_reprint else 0, created_by, now, now),
+        )
+        return int(cur.lastrowid)
+
+    def _bet_slip_payload(self, bet_id: int) -> tuple[dict[str, Any], str]:
+        row = self._conn.execute(
+            """
+            SELECT b.slip_number, b.qr_payload, b.side, b.amount, b.status, b.encoded_at_us, fm.match_number
+            FROM bet_slips b
+            JOIN fight_matches fm ON fm.id = b.match_id
+            WHERE b.id = ?
+            """,
+            (bet_id,),
+        ).fetchone()
+        if row is None:
+            raise ValidationError("Bet slip not found")
+        payload = {
+            "slip_number": row["slip_number"],
+            "qr_payload": row["qr_payload"],
+            "match_number": row["match_number"],
+            "side": row["side"],
+            "amount": int(row["amount"]),
+            "encoded_at": format_timestamp(row["encoded_at_us"]),
+        }
+        return payload, row["status"]
+
+    def enqueue_bet_slip(self, *, bet_id: int, device_id: str, created_by: int | None) -> int:
+        payload, _status = self._bet_slip_payload(bet_id)
+        return self._enqueue(job_type="BET_SLIP", reference_id=str(bet_id), payload=payload, device_id=device_id, created_by=created_by, is_reprint=False)
+
+    def reprint_bet_slip(self, *, actor: Actor, slip_number: str, device_id: str, created_by: int | None) -> int:
+        row = self._conn.execute("SELECT id FROM bet_slips WHERE slip_number = ?", (slip_number,)).fetchone()
+        if row is None:
+            raise ValidationError("Bet slip not found")
+        bet_id = int(row["id"])
+        payload, status = self._bet_slip_payload(bet_id)
+        if status not in ("ENCODED", "PRINTED"):
+            raise ValidationError("Only unpaid slips can be reprinted")
+        payload["is_reprint"] = True
+        job_id = self._enqueue(job_type="BET_SLIP", reference_id=str(bet_id), payload=payload, device_id=device_id, created_by=created_by, is_reprint=True)
+        if self._audit is not None:
+            self._audit.log(
+                actor=actor,
+                action="BET_REPRINT",
+                entity_type="bet_slip",
+                entity_id=str(bet_id),
+                new_state={"slip_number": slip_number, "print_job_id": job_id},
+            )
+        return job_id
+
+    def enqueue_canteen_receipt(self, *, sale_id: int, device_id: str, created_by: int | None) -> int:
+        sale = self._conn.execute(
+            "SELECT id, receipt_number, sold_at_us, total_amount FROM canteen_sales WHERE id = ?",
+            (sale_id,),
+        ).fetchone()
+        if sale is None:
+            raise ValidationError("Sale not found")
+        lines = self._conn.execute(
+            """
+            SELECT i.name, l.qty, l.unit_price, l.line_total
+            FROM canteen_sale_lines l
+            JOIN canteen_items i ON i.id = l.item_id
+            WHERE l.sale_id = ?
+            ORDER BY l.id
+            """,
+            (sale_id,),
+        ).fetchall()
+        payload = {
+            "receipt_number": sale["receipt_number"],
+            "sold_at": format_timestamp(sale["sold_at_us"], "%Y-%m-%d %H:%M"),
+            "total_amount": int(sale["total_amount"]),
+            "lines": [dict(r) for r in lines],
+        }
+        return self._enqueue(job_type="CANTEEN_RECEIPT", reference_id=str(sale_id), payload=payload, device_id=device_id, created_by=created_by, is_reprint=False)
+
+    def retry_failed(self, *, device_id: str) -> int:
+        now = utc_now().isoformat()
+        cur = self._conn.execute(
+            """
+            UPDATE print_jobs
+            SET status = 'QUEUED', attempts = 0, next_attempt_at = NULL, updated_at = ?
+            WHERE device_id = ? AND status = 'FAILED'
+            """,
+            (now, device_id),
+        )
+        return int(cur.rowcount)
+
+    def job_statuses(self, job_ids: list[int]) -> list[PrintJobStatus]:
+        if not job_ids:
+            return []
+        rows = self._conn.execute(
+            "SELECT id, job_type, reference_id, status, attempts, last_error FROM print_jobs WHERE id IN (%s) ORDER BY id" % ",".join("?" for _ in job_ids),
+            tuple(job_ids),
+        ).fetchall()
+        return [
+            PrintJobStatus(
+                id=int(r["id"]),
+                job_type=r["job_type"],
+                reference_id=r["reference_id"],
+                status=r["status"],
+                attempts=int(r["attempts"]),
+                last_error=r["last_error"],
+            )
+            for r in rows
+        ]
+
+
+class PrintWorker:
+    """
+    Background renderer/dispatcher for one terminal's print jobs.
+
+    Uses its own connection (SQLite connections are per-thread). A job is claimed
+    (QUEUED -> PRINTING) in a short write transaction, rendered and sent outside of
+    any transaction, then marked DONE, re-queued with backoff, or FAILED once
+    `max_attempts` is exhausted. If that status write fails (e.g. the database is
+    locked), the outcome is kept and written before the next job is claimed.
+    """
+
+    def __init__(
+        self,
+        *,
+        db_path: Path,
+        device_id: str,
+        backend: PrintBackend,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 5.0,
+        poll_interval_seconds: float = 0.5,
+    ) -> None:
+        self._db_path = db_path
+        self._device_id = device_id
+        self._backend = backend
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay_seconds
+        self._poll_interval = poll_interval_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # Job id -> (claimed row, send error or None) for outcomes not yet written back.
+        self._unrecorded: dict[int, tuple[sqlite3.Row, Exception | None]] = {}
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cockpit-print-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        """Processes every due job synchronously; returns the number of jobs attempted."""
+        conn = connect(self._db_path)
+        try:
+            self._recover(conn)
+            return self._drain(conn)
+        finally:
+            conn.close()
+
+    def _run(self) -> None:
+        conn = connect(self._db_path)
+        try:
+            self._recover(conn)
+            while not self._stop.is_set():
+                try:
+                    self._drain(conn)
+                except sqlite3.Error as exc:
+                    logger.warning("print worker: %s; retrying in %.1fs", exc, self._poll_interval)
+                self._wake.wait(self._poll_interval)
+                self._wake.clear()
+        finally:
+            conn.close()
+
+    def _recover(self, conn: sqlite3.Connection) -> None:
+        # Jobs left PRINTING by a crash on this terminal are re-queued (they may print twice; reprints are marked on paper).
+        with transaction(conn):
+            conn.execute(
+                "UPDATE print_jobs SET status = 'QUEUED', updated_at = ? WHERE device_id = ? AND status = 'PRINTING'",
+                (utc_now().isoformat(), self._device_id),
+            )
+
+    def _drain(self, conn: sqlite3.Connection) -> int:
+        processed = 0
+        for job_id, (job, error) in list(self._unrecorded.items()):
+            self._record(conn, job, error)
+            del self._unrecorded[job_id]
+        while not self._stop.is_set():
+            job = self._claim(conn)
+            if job is None:
+                break
+            processed += 1
+            error: Exception | None = None
+            try:
+                document = render_job(job["job_type"], json.loads(job["payload_json"]), self._backend.content_type, self._backend.render_options)
+                self._backend.send(name=f"{job['job_type'].lower()}_{int(job['id'])}", document=document)
+            except Exception as exc:
+                error = exc
+            try:
+                self._record(conn, job, error)
+            except sqlite3.Error as exc:
+                # The job was sent (or attempted); keep its outcome rather than leave it PRINTING.
+                logger.warning("print job %d: could not record outcome (%s); will retry", int(job["id"]), exc)
+                self._unrecorded[int(job["id"])] = (job, error)
+                break
+        return processed
+
+    def _record(self, conn: sqlite3.Connection, job: sqlite3.Row, error: Exception | None) -> None:
+        if error is None:
+            self._mark_done(conn, int(job["id"]))
+        else:
+            self._mark_failed(conn, job, error)
+
+    def _claim(self, conn: sqlite3.Connection) -> sqlite3.Row | None:
+        now = utc_now().isoformat()
+        with transaction(conn):
+            job = conn.execute(
+                """
+                SELECT id, job_type, payload_json, attempts
+                FROM print_jobs
+                WHERE device_id = ? AND status = 'QUEUED' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                ORDER BY id
+                LIMIT 1
+                """,
+                (self._device_id, now),
+            ).fetchone()
+            if job is None:
+                return None
+            conn.execute(
+                "UPDATE print_jobs SET status = 'PRINTING', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, int(job["id"])),
+            )
+        return job
+
+    def _mark_done(self, conn: sqlite3.Connection, job_id: int) -> None:
+        now = utc_now().isoformat()
+        with transaction(conn):
+            conn.execute(
+                "UPDATE print_jobs SET status = 'DONE', last_error = NULL, printed_at = ?, updated_at = ? WHERE id = ?",
+                (now, now, job_id),
+            )
+
+    def _mark_failed(self, conn: sqlite3.Connection, job: sqlite3.Row, exc: Exception) -> None:
+        now = utc_now()
+        attempts = int(job["attempts"]) + 1
+        if attempts >= self._max_attempts:
+            status, next_attempt_at = "FAILED", None
+        else:
+            status, next_attempt_at = "QUEUED", (now + timedelta(seconds=self._retry_delay * attempts)).isoformat()
+        with transaction(conn):
+            conn.execute(
+                "UPDATE print_jobs SET status = ?, next_attempt_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (status, next_attempt_at, f"{type(exc).__name__}: {exc}", now.isoformat(), int(job["id"])),
+            )
@@ -3,9 +3,9 @@ from __future__ import annotations
 import json
 import sqlite3
 from dataclasses import dataclass
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
-from cockpit.utils.clock import utc_now
+from cockpit.utils.clock import now
 
 
 @dataclass(frozen=True)
@@ -38,6 +38,7 @@ class AuditService:
         new_state: Mapping[str, Any] | None = None,
         metadata: Mapping[str, Any] | None = None,
     ) -> None:
+        moment = now()
         self._conn.execute(
             """
             INSERT INTO audit_log (
@@ -49,9 +50,10 @@ class AuditService:
               previous_state_json,
               new_state_json,
               metadata_json,
-              created_at
+              created_at,
+              created_at_us
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 actor.user_id,
@@ -62,7 +64,56 @@ class AuditService:
                 json.dumps(previous_state, ensure_ascii=False) if previous_state is not None else None,
                 json.dumps(new_state, ensure_ascii=False) if new_state is not None else None,
                 json.dumps(metadata, ensure_ascii=False) if metadata is not None else None,
-                utc_now().isoformat(),
+                moment.iso,
+                moment.us,
             ),
         )
 
+    def log_many(
+        self,
+        *,
+        actor: Actor,
+        action: str,
+        entity_type: str,
+        entries: Iterable[tuple[str | None, Mapping[str, Any] | None, Mapping[str, Any] | None]],
+        metadata: Mapping[str, Any] | None = None,
+    ) -> int:
+        """
+        One row per `(entity_id, previous_state, new_state)` entry for a batch operation, inserted with a single executemany.
+        """
+        moment = now()
+        metadata_json = json.dumps(metadata, ensure_ascii=False) if metadata is not None else None
+        params = [
+            (
+                actor.user_id,
+                actor.device_id,
+                action,
+                entity_type,
+                entity_id,
+                json.dumps(previous_state, ensure_ascii=False) if previous_state is not None else None,
+                json.dumps(new_state, ensure_ascii=False) if new_state is not None else None,
+                metadata_json,
+                moment.iso,
+                moment.us,
+            )
+            for entity_id, previous_state, new_state in entries
+        ]
+        self._conn.executemany(
+            """
+            INSERT INTO audit_log (
+              actor_user_id,
+              actor_device_id,
+              action,
+              entity_type,
+              entity_id,
+              previous_state_json,
+              new_state_json,
+              metadata_json,
+              created_at,
+              created_at_us
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            params,
+        )
+        return len(params)
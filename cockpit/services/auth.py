@@ -7,7 +7,7 @@ from datetime import timedelta
 from cockpit.services.audit import Actor, AuditService
 from cockpit.services.errors import AuthError
 from cockpit.utils.clock import utc_now
-from cockpit.utils.security import hash_password, verify_password
+from cockpit.utils.security import PBKDF2_ITERATIONS, hash_password, needs_rehash, verify_password
 
 
 _SESSION_STALE_AFTER_SECONDS = 30
@@ -22,10 +22,38 @@ class User:
     is_frozen: bool
 
 
+@dataclass(frozen=True)
+class Credentials:
+    user: User
+    password_hash: str
+
+
+def check_password(credentials: Credentials, password: str, *, iterations: int = PBKDF2_ITERATIONS) -> str | None:
+    """
+    Verifies a password against stored credentials (CPU-bound; touches no database, safe on a worker thread).
+
+    Returns a replacement hash when the stored one uses fewer iterations than `iterations`, else None.
+    """
+    if not verify_password(password, credentials.password_hash):
+        raise AuthError("Invalid username/password")
+    if needs_rehash(credentials.password_hash, iterations):
+        return hash_password(password, iterations)
+    return None
+
+
 class AuthService:
-    def __init__(self, conn: sqlite3.Connection, audit: AuditService) -> None:
+    """
+    Users and sessions.
+
+    Login is split so the slow hash check never runs inside a write transaction:
+    `fetch_credentials` (read) -> `check_password` (CPU, any thread) -> `start_session` (write).
+    `login` runs all three in sequence.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService, *, password_iterations: int = PBKDF2_ITERATIONS) -> None:
         self._conn = conn
         self._audit = audit
+        self.password_iterations = password_iterations
 
     def ensure_bootstrap_admin(self) -> bool:
         """
@@ -44,7 +72,7 @@ class AuthService:
         role_names: list[str],
     ) -> int:
         now = utc_now().isoformat()
-        pw_hash = hash_password(password)
+        pw_hash = hash_password(password, self.password_iterations)
         cur = self._conn.execute(
             """
             INSERT INTO users(username, password_hash, full_name, is_active, is_frozen, created_at, updated_at)
@@ -88,14 +116,22 @@ class AuthService:
         )
 
     def cleanup_stale_sessions(self, *, actor: Actor) -> int:
+        """
+        Expires open sessions whose lease has not been renewed recently, in one batch.
+
+        Liveness comes from telemetry.session_leases; a session without a lease (e.g. the
+        telemetry file was lost) falls back to the durable last_seen_at.
+        """
         now = utc_now()
         stale_before = (now - timedelta(seconds=_SESSION_STALE_AFTER_SECONDS)).isoformat()
         rows = self._conn.execute(
             """
-            SELECT id, user_id, device_id, last_seen_at
-            FROM sessions
-            WHERE logged_out_at IS NULL
-              AND COALESCE(last_seen_at, logged_in_at) <= ?
+            SELECT s.id, s.user_id, s.device_id,
+                   COALESCE(l.last_seen_at, s.last_seen_at, s.logged_in_at) AS last_seen_at
+            FROM sessions s
+            LEFT JOIN telemetry.session_leases l ON l.session_id = s.id
+            WHERE s.logged_out_at IS NULL
+              AND COALESCE(l.last_seen_at, s.last_seen_at, s.logged_in_at) <= ?
             """,
             (stale_before,),
         ).fetchall()
@@ -103,35 +139,45 @@ class AuthService:
             return 0
 
         logged_out_at = now.isoformat()
-        self._conn.execute(
-            """
-            UPDATE sessions
-            SET logged_out_at = ?
-            WHERE logged_out_at IS NULL
-              AND COALESCE(last_seen_at, logged_in_at) <= ?
-            """,
-            (logged_out_at, stale_before),
+        self._conn.executemany(
+            "UPDATE sessions SET logged_out_at = ?, last_seen_at = ? WHERE id = ? AND logged_out_at IS NULL",
+            [(logged_out_at, r["last_seen_at"], int(r["id"])) for r in rows],
+        )
+        self._conn.executemany("DELETE FROM telemetry.session_leases WHERE session_id = ?", [(int(r["id"]),) for r in rows])
+        self._audit.log_many(
+            actor=actor,
+            action="SESSION_AUTO_LOGOUT",
+            entity_type="session",
+            entries=[
+                (
+                    str(int(r["id"])),
+                    {"session_id": int(r["id"]), "user_id": int(r["user_id"]), "device_id": r["device_id"]},
+                    {"session_id": int(r["id"]), "logged_out_at": logged_out_at},
+                )
+                for r in rows
+            ],
+            metadata={"reason": "STALE"},
         )
-        for r in rows:
-            self._audit.log(
-                actor=actor,
-                action="SESSION_AUTO_LOGOUT",
-                entity_type="session",
-                entity_id=str(int(r["id"])),
-                previous_state={"session_id": int(r["id"]), "user_id": int(r["user_id"]), "device_id": r["device_id"]},
-                new_state={"session_id": int(r["id"]), "logged_out_at": logged_out_at},
-                metadata={"reason": "STALE"},
-            )
         return len(rows)
 
     def heartbeat(self, *, session_id: int) -> None:
+        """
+        Renews the session lease; touches only the low-durability telemetry file.
+
+        A missing lease (telemetry file lost, or a session opened before leases) is recreated from the
+        open session row, so cleanup never mistakes a live session for a stale one.
+        """
         now = utc_now().isoformat()
         self._conn.execute(
-            "UPDATE sessions SET last_seen_at = ? WHERE id = ? AND logged_out_at IS NULL",
+            """
+            INSERT INTO telemetry.session_leases(session_id, user_id, device_id, last_seen_at)
+            SELECT id, user_id, device_id, ? FROM sessions WHERE id = ? AND logged_out_at IS NULL
+            ON CONFLICT(session_id) DO UPDATE SET last_seen_at = excluded.last_seen_at
+            """,
             (now, session_id),
         )
 
-    def login(self, *, username: str, password: str, device_id: str) -> tuple[User, int]:
+    def fetch_credentials(self, username: str) -> Credentials:
         row = self._conn.execute(
             "SELECT id, username, full_name, password_hash, is_active, is_frozen FROM users WHERE username = ?",
             (username,),
@@ -140,30 +186,47 @@ class AuthService:
             raise AuthError("Invalid username/password")
         if not bool(row["is_active"]) or bool(row["is_frozen"]):
             raise AuthError("User is inactive or frozen")
-        if not verify_password(password, row["password_hash"]):
+        user = User(
+            id=int(row["id"]),
+            username=row["username"],
+            full_name=row["full_name"],
+            is_active=bool(row["is_active"]),
+            is_frozen=bool(row["is_frozen"]),
+        )
+        return Credentials(user=user, password_hash=row["password_hash"])
+
+    def start_session(self, *, credentials: Credentials, device_id: str, new_password_hash: str | None = None) -> int:
+        """
+        Opens the session for already-verified credentials. Call inside a write transaction.
+        """
+        user = credentials.user
+        # The account may have been frozen or re-passworded while the hash was being checked.
+        current = self._conn.execute("SELECT password_hash, is_active, is_frozen FROM users WHERE id = ?", (user.id,)).fetchone()
+        if current is None or current["password_hash"] != credentials.password_hash:
             raise AuthError("Invalid username/password")
+        if not bool(current["is_active"]) or bool(current["is_frozen"]):
+            raise AuthError("User is inactive or frozen")
 
         self.cleanup_stale_sessions(actor=Actor(user_id=None, device_id=device_id))
 
         active = self._conn.execute(
             "SELECT id FROM sessions WHERE user_id = ? AND logged_out_at IS NULL",
-            (row["id"],),
+            (user.id,),
         ).fetchone()
         if active is not None:
             raise AuthError("User already logged in on another device")
 
         now = utc_now().isoformat()
+        if new_password_hash is not None:
+            self._conn.execute("UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ?", (new_password_hash, now, user.id))
         cur = self._conn.execute(
             "INSERT INTO sessions(user_id, device_id, logged_in_at, last_seen_at, logged_out_at) VALUES (?, ?, ?, ?, NULL)",
-            (row["id"], device_id, now, now),
+            (user.id, device_id, now, now),
         )
         session_id = int(cur.lastrowid)
-        user = User(
-            id=int(row["id"]),
-            username=row["username"],
-            full_name=row["full_name"],
-            is_active=bool(row["is_active"]),
-            is_frozen=bool(row["is_frozen"]),
+        self._conn.execute(
+            "INSERT OR REPLACE INTO telemetry.session_leases(session_id, user_id, device_id, last_seen_at) VALUES (?, ?, ?, ?)",
+            (session_id, user.id, device_id, now),
         )
         self._audit.log(
             actor=Actor(user_id=user.id, device_id=device_id),
@@ -171,8 +234,15 @@ class AuthService:
             entity_type="session",
             entity_id=str(session_id),
             new_state={"session_id": session_id, "user_id": user.id, "username": user.username},
+            metadata={"password_rehashed": True} if new_password_hash is not None else None,
         )
-        return user, session_id
+        return session_id
+
+    def login(self, *, username: str, password: str, device_id: str) -> tuple[User, int]:
+        credentials = self.fetch_credentials(username)
+        new_hash = check_password(credentials, password, iterations=self.password_iterations)
+        session_id = self.start_session(credentials=credentials, device_id=device_id, new_password_hash=new_hash)
+        return credentials.user, session_id
 
     def logout(self, *, actor: Actor, session_id: int) -> None:
         row = self._conn.execute("SELECT id, user_id, device_id, logged_out_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
@@ -181,7 +251,8 @@ class AuthService:
         if row["logged_out_at"] is not None:
             return
         logged_out_at = utc_now().isoformat()
-        self._conn.execute("UPDATE sessions SET logged_out_at = ? WHERE id = ?", (logged_out_at, session_id))
+        self._conn.execute("UPDATE sessions SET logged_out_at = ?, last_seen_at = ? WHERE id = ?", (logged_out_at, logged_out_at, session_id))
+        self._conn.execute("DELETE FROM telemetry.session_leases WHERE session_id = ?", (session_id,))
         self._audit.log(
             actor=actor,
             action="LOGOUT",
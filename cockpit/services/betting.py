@@ -1,25 +1,33 @@
 from __future__ import annotations
 
 import json
-import math
-import secrets
 import sqlite3
-from dataclasses import dataclass
 from typing import Any
 
 from cockpit.services.audit import Actor, AuditService
 from cockpit.services.errors import ValidationError
-from cockpit.utils.clock import utc_now
+from cockpit.services.liabilities import LiabilityService
+from cockpit.services.limits import LimitService
+from cockpit.services.payouts import Exposure, Odds, exposure_for, payout_for
+from cockpit.services.slip_identity import SlipIdentityPool, default_pool
+from cockpit.utils.clock import business_day, now
 
 
-@dataclass(frozen=True)
-class Odds:
-    total_wala: int
-    total_meron: int
-    total_draw: int
-    total_all: int
-    wala_multiplier: float | None
-    meron_multiplier: float | None
+def _odds_from_totals(totals: sqlite3.Row | tuple[Any, ...] | None) -> Odds:
+    if totals is None:
+        return Odds.from_totals(0, 0, 0, 0)
+    return Odds.from_totals(*(int(v or 0) for v in tuple(totals)[-4:]))
+
+
+def _odds_payload(odds: Odds) -> dict[str, Any]:
+    return {
+        "total_wala": odds.total_wala,
+        "total_meron": odds.total_meron,
+        "total_draw": odds.total_draw,
+        "total_all": odds.total_all,
+        "wala_multiplier": odds.wala_multiplier,
+        "meron_multiplier": odds.meron_multiplier,
+    }
 
 
 class BettingService:
@@ -32,40 +40,74 @@ class BettingService:
     - If CANCELLED / NO_CONTEST: all bettors refunded.
     """
 
-    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None) -> None:
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None, identities: SlipIdentityPool | None = None) -> None:
         self._conn = conn
         self._audit = audit
+        self._identities = identities
+        self.limits = LimitService(conn, audit)
+        self.liabilities = LiabilityService(conn, audit)
 
     def get_odds(self, match_id: int) -> Odds:
         totals = self._conn.execute(
-            "SELECT total_wala, total_meron, total_draw, total_all FROM vw_bet_totals WHERE match_id = ?",
+            "SELECT total_wala, total_meron, total_draw, total_all FROM match_pools WHERE match_id = ?",
+            (match_id,),
+        ).fetchone()
+        return _odds_from_totals(totals)
+
+    def get_exposure(self, match_id: int) -> Exposure:
+        """Per-result liability for a match; one keyed read of match_pools, which the triggers keep current."""
+        pool = self._conn.execute(
+            "SELECT pool_version, total_wala, total_meron, total_draw, total_all FROM match_pools WHERE match_id = ?",
             (match_id,),
         ).fetchone()
-        if totals is None:
-            tw = tm = td = ta = 0
-        else:
-            tw = int(totals["total_wala"] or 0)
-            tm = int(totals["total_meron"] or 0)
-            td = int(totals["total_draw"] or 0)
-            ta = int(totals["total_all"] or 0)
-
-        wala_mult = (ta / tw) if tw > 0 else None
-        meron_mult = (ta / tm) if tm > 0 else None
-        return Odds(
-            total_wala=tw,
-            total_meron=tm,
-            total_draw=td,
-            total_all=ta,
-            wala_multiplier=wala_mult,
-            meron_multiplier=meron_mult,
+        odds = _odds_from_totals(pool)
+        return Exposure(
+            match_id=match_id,
+            pool_version=int(pool["pool_version"]) if pool is not None else 0,
+            total_all=odds.total_all,
+            payouts=exposure_for(odds),
         )
 
-    def _new_slip_number(self) -> str:
-        token = secrets.token_hex(4).upper()
-        return f"S{utc_now().strftime('%Y%m%d')}-{token}"
+    def odds_snapshot(self, bet_id: int) -> dict[str, Any]:
+        """The odds a slip was sold at, with the keys of the former per-slip odds_snapshot_json."""
+        row = self._conn.execute(
+            """
+            SELECT s.total_wala, s.total_meron, s.total_draw, s.total_all
+            FROM bet_slips b
+            JOIN odds_snapshots s ON s.id = b.odds_snapshot_id
+            WHERE b.id = ?
+            """,
+            (bet_id,),
+        ).fetchone()
+        if row is None:
+            raise ValidationError("Bet slip not found")
+        return _odds_payload(_odds_from_totals(row))
+
+    def odds_snapshot_json(self, bet_id: int) -> str:
+        """`odds_snapshot` serialised exactly as slips used to store it, for printing and audit exports."""
+        return json.dumps(self.odds_snapshot(bet_id), ensure_ascii=False)
 
-    def _new_qr_payload(self) -> str:
-        return secrets.token_urlsafe(16)
+    def _current_snapshot(self, match_id: int) -> tuple[int, Odds]:
+        """The odds_snapshots row for the match's current pool_version, created on first use."""
+        pool = self._conn.execute(
+            "SELECT pool_version, total_wala, total_meron, total_draw, total_all FROM match_pools WHERE match_id = ?",
+            (match_id,),
+        ).fetchone()
+        version = int(pool["pool_version"]) if pool is not None else 0
+        odds = _odds_from_totals(pool)
+        self._conn.execute(
+            """
+            INSERT INTO odds_snapshots(match_id, pool_version, total_wala, total_meron, total_draw, total_all)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(match_id, pool_version) DO NOTHING
+            """,
+            (match_id, version, odds.total_wala, odds.total_meron, odds.total_draw, odds.total_all),
+        )
+        row = self._conn.execute(
+            "SELECT id FROM odds_snapshots WHERE match_id = ? AND pool_version = ?",
+            (match_id, version),
+        ).fetchone()
+        return int(row["id"]), odds
 
     def encode_bet(
         self,
@@ -88,50 +130,44 @@ class BettingService:
         if match["state"] in ("FINISHED", "VOIDED"):
             raise ValidationError("Cannot bet on finished/voided match")
 
-        odds = self.get_odds(match_id)
-        slip_number = self._new_slip_number()
-        qr_payload = self._new_qr_payload()
-        now = utc_now().isoformat()
+        snapshot_id, odds = self._current_snapshot(match_id)
+        self.limits.check(match_id=match_id, side=side, amount=amount, cashier_id=encoded_by, odds=odds)
+        identity = (self._identities or default_pool()).take()
+        slip_number = identity.slip_number
+        qr_payload = identity.qr_payload
+        moment = now()
 
-        self._conn.execute(
+        cur = self._conn.execute(
             """
             INSERT INTO bet_slips(
-              slip_number, match_id, side, amount, odds_snapshot_json, status,
-              encoded_by, encoded_at, printed_at, payout_by, payout_at, payout_amount,
-              qr_payload, device_id, archived_at
+              slip_number, match_id, side, amount, odds_snapshot_id, status,
+              encoded_by, encoded_at, encoded_at_us, business_day, printed_at, payout_by, payout_at, payout_at_us,
+              payout_amount, payout_business_day, qr_payload, device_id, archived_at
             )
-            VALUES(?, ?, ?, ?, ?, 'ENCODED', ?, ?, NULL, NULL, NULL, NULL, ?, ?, NULL)
+            VALUES(?, ?, ?, ?, ?, 'ENCODED', ?, ?, ?, ?, NULL, NULL, NULL, NULL, NULL, NULL, ?, ?, NULL)
             """,
             (
                 slip_number,
                 match_id,
                 side,
                 amount,
-                json.dumps(
-                    {
-                        "total_wala": odds.total_wala,
-                        "total_meron": odds.total_meron,
-                        "total_draw": odds.total_draw,
-                        "total_all": odds.total_all,
-                        "wala_multiplier": odds.wala_multiplier,
-                        "meron_multiplier": odds.meron_multiplier,
-                    },
-                    ensure_ascii=False,
-                ),
+                snapshot_id,
                 encoded_by,
-                now,
+                moment.iso,
+                moment.us,
+                business_day(moment.dt),
                 qr_payload,
                 device_id,
             ),
         )
-        bet_id = int(self._conn.execute("SELECT id FROM bet_slips WHERE slip_number = ?", (slip_number,)).fetchone()["id"])
+        bet_id = int(cur.lastrowid)
         if self._audit is not None:
             self._audit.log(
                 actor=actor,
                 action="BET_ENCODE",
                 entity_type="bet_slip",
                 entity_id=str(bet_id),
-                new_state={"slip_number": slip_number, "match_id": match_id, "side": side, "amount": amount},
+                new_state={"slip_number": slip_number, "match_id": match_id, "side": side, "amount": amount, "odds_snapshot_id": snapshot_id},
             )
         return {"id": bet_id, "slip_number": slip_number, "qr_payload": qr_payload, "odds": odds}
 
@@ -144,10 +180,10 @@ class BettingService:
             raise ValidationError("Bet slip not found")
         if row["status"] not in ("ENCODED", "PRINTED"):
             raise ValidationError("Slip cannot be printed in current state")
-        now = utc_now().isoformat()
-        self._conn.execute("UPDATE bet_slips SET status = 'PRINTED', printed_at = COALESCE(printed_at, ?) WHERE id = ?", (now, bet_id))
+        printed_at = now().iso
+        self._conn.execute("UPDATE bet_slips SET status = 'PRINTED', printed_at = COALESCE(printed_at, ?) WHERE id = ?", (printed_at, bet_id))
         if self._audit is not None:
-            self._audit.log(actor=actor, action="BET_PRINT", entity_type="bet_slip", entity_id=str(bet_id), new_state={"printed_at": now})
+            self._audit.log(actor=actor, action="BET_PRINT", entity_type="bet_slip", entity_id=str(bet_id), new_state={"printed_at": printed_at})
 
     def compute_payout_for_slip(self, bet_id: int) -> int:
         slip = self._conn.execute(
@@ -159,32 +195,7 @@ class BettingService:
         result = self._conn.execute("SELECT result_type FROM fight_results WHERE match_id = ?", (slip["match_id"],)).fetchone()
         if result is None:
             raise ValidationError("Match has no result yet")
-        result_type = result["result_type"]
-        amount = int(slip["amount"])
-
-        # Cancelled / no contest: refund everyone (stake returned).
-        if result_type in ("CANCELLED", "NO_CONTEST"):
-            return amount
-
-        # Draw: draw bettors are paid 5×; Wala/Meron are refunded.
-        if result_type == "DRAW":
-            if slip["side"] == "DRAW":
-                return amount * 5
-            return amount
-
-        # Wala/Meron win: losing side gets 0; draw bets lose.
-        if result_type in ("WALA", "MERON"):
-            if slip["side"] != result_type:
-                return 0
-            odds = self.get_odds(int(slip["match_id"]))
-            side_pool = odds.total_wala if result_type == "WALA" else odds.total_meron
-            total_pool = odds.total_all
-            if side_pool <= 0 or total_pool <= 0:
-                return 0
-            raw = amount * (total_pool / side_pool)
-            return int(math.floor(raw))
-
-        raise ValidationError("Unsupported result type")
+        return payout_for(slip["side"], int(slip["amount"]), result["result_type"], self.get_odds(int(slip["match_id"])))
 
     def payout_by_qr(
         self,
@@ -206,19 +217,22 @@ class BettingService:
         if slip["status"] not in ("PRINTED",):
             raise ValidationError("Slip is not eligible for payout")
         payout_amount = self.compute_payout_for_slip(int(slip["id"]))
-        now = utc_now().isoformat()
+        moment = now()
         self._conn.execute(
             """
             UPDATE bet_slips
             SET status = 'ARCHIVED',
                 payout_by = ?,
                 payout_at = ?,
+                payout_at_us = ?,
                 payout_amount = ?,
+                payout_business_day = ?,
                 archived_at = ?
             WHERE id = ?
             """,
-            (payout_by, now, payout_amount, now, int(slip["id"])),
+            (payout_by, moment.iso, moment.us, payout_amount, business_day(moment.dt), moment.iso, int(slip["id"])),
         )
+        self.liabilities.mark_paid(int(slip["id"]), paid_at_us=moment.us)
         if self._audit is not None:
             self._audit.log(
                 actor=actor,
@@ -236,7 +250,7 @@ class BettingService:
             return
         if row["status"] != "PAID":
             return
-        now = utc_now().isoformat()
-        self._conn.execute("UPDATE bet_slips SET status = 'ARCHIVED', archived_at = ? WHERE id = ?", (now, bet_id))
+        archived_at = now().iso
+        self._conn.execute("UPDATE bet_slips SET status = 'ARCHIVED', archived_at = ? WHERE id = ?", (archived_at, bet_id))
         if self._audit is not None:
-            self._audit.log(actor=actor, action="BET_ARCHIVE", entity_type="bet_slip", entity_id=str(bet_id), new_state={"archived_at": now})
+            self._audit.log(actor=actor, action="BET_ARCHIVE", entity_type="bet_slip", entity_id=str(bet_id), new_state={"archived_at": archived_at})
@@ -7,7 +7,7 @@ from typing import Any
 
 from cockpit.services.audit import Actor, AuditService
 from cockpit.services.errors import ValidationError
-from cockpit.utils.clock import utc_now
+from cockpit.utils.clock import business_day, now, utc_now
 
 
 @dataclass(frozen=True)
@@ -50,7 +50,7 @@ class CanteenService:
     def upsert_item(self, *, actor: Actor, sku: str, name: str, unit_price: int, created_by: int) -> int:
         if unit_price < 0:
             raise ValidationError("Unit price must be >= 0")
-        now = utc_now().isoformat()
+        created_at = now().iso
         existing = self._conn.execute("SELECT id, name, unit_price FROM canteen_items WHERE sku = ?", (sku,)).fetchone()
         if existing is None:
             cur = self._conn.execute(
@@ -58,7 +58,7 @@ class CanteenService:
                 INSERT INTO canteen_items(sku, name, unit_price, is_active, created_at)
                 VALUES(?, ?, ?, 1, ?)
                 """,
-                (sku, name, unit_price, now),
+                (sku, name, unit_price, created_at),
             )
             item_id = int(cur.lastrowid)
             if self._audit is not None:
@@ -82,12 +82,13 @@ class CanteenService:
             raise ValidationError("Qty must be > 0")
         if unit_cost is not None and unit_cost < 0:
             raise ValidationError("Unit cost must be >= 0")
+        moment = now()
         self._conn.execute(
             """
-            INSERT INTO canteen_stock_movements(item_id, movement_type, qty, unit_cost, reference_type, reference_id, created_by, created_at)
-            VALUES (?, 'IN', ?, ?, 'MANUAL', NULL, ?, ?)
+            INSERT INTO canteen_stock_movements(item_id, movement_type, qty, unit_cost, reference_type, reference_id, created_by, created_at, created_at_us)
+            VALUES (?, 'IN', ?, ?, 'MANUAL', NULL, ?, ?, ?)
             """,
-            (item_id, qty, unit_cost, created_by, utc_now().isoformat()),
+            (item_id, qty, unit_cost, created_by, moment.iso, moment.us),
         )
         if self._audit is not None:
             self._audit.log(actor=actor, action="CANTEEN_STOCK_IN", entity_type="canteen_item", entity_id=str(item_id), new_state={"qty": qty, "unit_cost": unit_cost, "notes": notes})
@@ -112,7 +113,7 @@ class CanteenService:
         if not lines:
             raise ValidationError("Sale requires at least one item")
         receipt = self._new_receipt_number()
-        sold_at = utc_now().isoformat()
+        sold = now()
         total = 0
         normalized: list[dict[str, int]] = []
         for line in lines:
@@ -134,10 +135,10 @@ class CanteenService:
 
         cur = self._conn.execute(
             """
-            INSERT INTO canteen_sales(receipt_number, drawer_id, sold_by, sold_at, total_amount, status)
-            VALUES (?, ?, ?, ?, ?, 'PAID')
+            INSERT INTO canteen_sales(receipt_number, drawer_id, sold_by, sold_at, sold_at_us, business_day, total_amount, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'PAID')
             """,
-            (receipt, drawer_id, sold_by, sold_at, total),
+            (receipt, drawer_id, sold_by, sold.iso, sold.us, business_day(sold.dt), total),
         )
         sale_id = int(cur.lastrowid)
         for line in normalized:
@@ -150,10 +151,10 @@ class CanteenService:
             )
             self._conn.execute(
                 """
-                INSERT INTO canteen_stock_movements(item_id, movement_type, qty, unit_cost, reference_type, reference_id, created_by, created_at)
-                VALUES (?, 'OUT', ?, NULL, 'SALE', ?, ?, ?)
+                INSERT INTO canteen_stock_movements(item_id, movement_type, qty, unit_cost, reference_type, reference_id, created_by, created_at, created_at_us)
+                VALUES (?, 'OUT', ?, NULL, 'SALE', ?, ?, ?, ?)
                 """,
-                (line["item_id"], line["qty"], str(sale_id), sold_by, sold_at),
+                (line["item_id"], line["qty"], str(sale_id), sold_by, sold.iso, sold.us),
             )
 
         if self._audit is not None:
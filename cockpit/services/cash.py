@@ -6,7 +6,7 @@ from typing import Literal
 
 from cockpit.services.audit import Actor, AuditService
 from cockpit.services.errors import ValidationError
-from cockpit.utils.clock import utc_now
+from cockpit.utils.clock import business_day, now
 
 
 DrawerType = Literal["BETTING_CASHIER", "CANTEEN"]
@@ -44,13 +44,13 @@ class CashService:
     ) -> int:
         if opening_cash < 0:
             raise ValidationError("Opening cash must be >= 0")
-        now = utc_now().isoformat()
+        opened_at = now().iso
         cur = self._conn.execute(
             """
             INSERT INTO cash_drawers(drawer_type, name, owner_user_id, opened_at, closed_at, opening_cash, current_cash)
             VALUES (?, ?, ?, ?, NULL, ?, ?)
             """,
-            (drawer_type, name, owner_user_id, now, opening_cash, opening_cash),
+            (drawer_type, name, owner_user_id, opened_at, opening_cash, opening_cash),
         )
         drawer_id = int(cur.lastrowid)
         self._audit.log(
@@ -85,13 +85,13 @@ class CashService:
     ) -> None:
         if amount <= 0:
             raise ValidationError("Amount must be > 0")
-        now = utc_now().isoformat()
+        moment = now()
         self._conn.execute(
             """
-            INSERT INTO cash_movements(drawer_id, movement_type, reference_type, reference_id, amount, notes, created_by, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO cash_movements(drawer_id, movement_type, reference_type, reference_id, amount, notes, created_by, created_at, created_at_us, business_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (drawer_id, movement_type, reference_type, reference_id, amount, notes, created_by, now),
+            (drawer_id, movement_type, reference_type, reference_id, amount, notes, created_by, moment.iso, moment.us, business_day(moment.dt)),
         )
         # We only update the specific drawer; betting and canteen drawers stay separate by design.
         delta = amount if movement_type in ("BET_IN", "ADJUSTMENT_IN", "CANTEEN_SALE_IN") else -amount
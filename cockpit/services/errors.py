@@ -13,3 +13,15 @@ class PermissionError(DomainError):
 class ValidationError(DomainError):
     pass
 
+
+class LimitExceededError(ValidationError):
+    """A bet rejected by a bet_limits rule; carries what the audit row records."""
+
+    def __init__(self, message: str, *, limit_id: int, rule: str, limit: int, attempted: int, bet: dict[str, object]) -> None:
+        super().__init__(message)
+        self.limit_id = limit_id
+        self.rule = rule
+        self.limit = limit
+        self.attempted = attempted
+        self.bet = bet
+        self.recorded = False
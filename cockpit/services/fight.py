@@ -6,7 +6,9 @@ from typing import Any
 
 from cockpit.services.audit import Actor, AuditService
 from cockpit.services.errors import ValidationError
-from cockpit.utils.clock import utc_now
+from cockpit.services.liabilities import LiabilityService
+from cockpit.services.pits import DEFAULT_PIT_ID
+from cockpit.utils.clock import business_day, utc_now
 
 
 @dataclass(frozen=True)
@@ -34,6 +36,7 @@ class FightService:
     def __init__(self, conn: sqlite3.Connection, audit: AuditService) -> None:
         self._conn = conn
         self._audit = audit
+        self._liabilities = LiabilityService(conn, audit)
 
     def create_match(
         self,
@@ -43,6 +46,7 @@ class FightService:
         structure_code: str,
         rounds: int,
         created_by: int,
+        pit_id: int = DEFAULT_PIT_ID,
     ) -> int:
         if rounds <= 0:
             raise ValidationError("Rounds must be >= 1")
@@ -52,13 +56,19 @@ class FightService:
         ).fetchone()
         if structure is None:
             raise ValidationError("Invalid or inactive fight structure")
-        now = utc_now().isoformat()
+        pit = self._conn.execute("SELECT is_active FROM pits WHERE id = ?", (pit_id,)).fetchone()
+        if pit is None or not pit["is_active"]:
+            raise ValidationError("Invalid or inactive pit")
+        created = utc_now()
+        now = created.isoformat()
         cur = self._conn.execute(
             """
-            INSERT INTO fight_matches(match_number, fight_number, structure_code, rounds, state, locked_at, started_at, stopped_at, created_by, created_at)
-            VALUES (?, NULL, ?, ?, 'DRAFT', NULL, NULL, NULL, ?, ?)
+            INSERT INTO fight_matches(
+              match_number, fight_number, structure_code, rounds, state, locked_at, started_at, stopped_at, created_by, created_at, pit_id, business_day
+            )
+            VALUES (?, NULL, ?, ?, 'DRAFT', NULL, NULL, NULL, ?, ?, ?, ?)
             """,
-            (match_number, structure_code, rounds, created_by, now),
+            (match_number, structure_code, rounds, created_by, now, pit_id, business_day(created)),
         )
         match_id = int(cur.lastrowid)
         self._conn.execute("UPDATE fight_matches SET fight_number = COALESCE(fight_number, ?) WHERE id = ?", (match_id, match_id))
@@ -67,7 +77,7 @@ class FightService:
             action="MATCH_CREATE",
             entity_type="fight_match",
             entity_id=str(match_id),
-            new_state={"match_number": match_number, "fight_number": match_id, "structure_code": structure_code, "rounds": rounds, "state": "DRAFT"},
+            new_state={"match_number": match_number, "fight_number": match_id, "structure_code": structure_code, "rounds": rounds, "state": "DRAFT", "pit_id": pit_id},
         )
         return match_id
 
@@ -214,6 +224,7 @@ class FightService:
             (match_id, result_type, decided_by, now, notes),
         )
         self._conn.execute("UPDATE fight_matches SET state = 'FINISHED' WHERE id = ? AND state != 'VOIDED'", (match_id,))
+        self._liabilities.settle_match(match_id)
         self._audit.log(
             actor=actor,
             action="MATCH_RESULT_OVERRIDE" if (prev_result is not None and override) else "MATCH_RESULT_SET",
@@ -242,6 +253,7 @@ class FightService:
                 """,
                 (match_id, actor.user_id, now, f"VOIDED: {reason}"),
             )
+            self._liabilities.settle_match(match_id)
         self._audit.log(
             actor=actor,
             action="MATCH_VOID",
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+
+from cockpit.db.connection import transaction
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.services.payouts import Odds, payout_for
+from cockpit.utils.clock import now
+
+
+_DAY_US = 86_400 * 1_000_000
+
+
+@dataclass(frozen=True)
+class Outstanding:
+    """Unpaid winnings grouped by `key` (a match id, a drawer id, or an age bucket label)."""
+
+    key: int | str | None
+    slips: int
+    amount: int
+
+
+class LiabilityService:
+    """
+    Ledger of money owed on settled slips (liabilities), one row per slip with a non-zero payout.
+
+    - `settle_match` writes the rows when a result is set, pricing each slip with `payout_for`.
+    - Payout marks the row PAID; `expire_unclaimed` archives old unpaid slips and marks them EXPIRED.
+    - Outstanding totals read only UNPAID rows, through the partial index idx_liabilities_unpaid.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None) -> None:
+        self._conn = conn
+        self._audit = audit
+
+    def settle_match(self, match_id: int, *, settled_at_us: int | None = None) -> int:
+        """
+        (Re)writes the unpaid rows for a match from its result; returns how many were written.
+
+        Slips already paid or expired keep their rows, so an overridden result only re-prices what is
+        still outstanding. Call inside the transaction that sets the result.
+        """
+        result = self._conn.execute("SELECT result_type FROM fight_results WHERE match_id = ?", (match_id,)).fetchone()
+        self._conn.execute("DELETE FROM liabilities WHERE match_id = ? AND status = 'UNPAID'", (match_id,))
+        if result is None:
+            return 0
+        pool = self._conn.execute(
+            "SELECT total_wala, total_meron, total_draw, total_all FROM match_pools WHERE match_id = ?",
+            (match_id,),
+        ).fetchone()
+        odds = Odds.from_totals(*(int(v) for v in tuple(pool))) if pool is not None else Odds.from_totals(0, 0, 0, 0)
+        slips = self._conn.execute(
+            """
+            SELECT b.id, b.side, b.amount, m.drawer_id
+            FROM bet_slips b
+            LEFT JOIN cash_movements m
+              ON m.reference_type = 'BET_SLIP' AND m.reference_id = CAST(b.id AS TEXT) AND m.movement_type = 'BET_IN'
+            WHERE b.match_id = ? AND b.status IN ('ENCODED','PRINTED')
+            """,
+            (match_id,),
+        ).fetchall()
+        at_us = settled_at_us if settled_at_us is not None else now().us
+        rows = []
+        for slip in slips:
+            amount = payout_for(slip["side"], int(slip["amount"]), result["result_type"], odds)
+            if amount > 0:
+                rows.append((int(slip["id"]), match_id, slip["drawer_id"], amount, at_us))
+        self._conn.executemany(
+            "INSERT INTO liabilities(bet_id, match_id, drawer_id, amount, settled_at_us, status) VALUES (?, ?, ?, ?, ?, 'UNPAID')",
+            rows,
+        )
+        return len(rows)
+
+    def mark_paid(self, bet_id: int, *, paid_at_us: int) -> None:
+        self._conn.execute(
+            "UPDATE liabilities SET status = 'PAID', closed_at_us = ? WHERE bet_id = ? AND status = 'UNPAID'",
+            (paid_at_us, bet_id),
+        )
+
+    def outstanding_by_match(self) -> list[Outstanding]:
+        return self._grouped("match_id")
+
+    def outstanding_by_drawer(self) -> list[Outstanding]:
+        """Per drawer that took the bets; None collects slips with no BET_IN movement."""
+        return self._grouped("drawer_id")
+
+    def outstanding_by_age(self, *, bucket_days: tuple[int, ...] = (1, 7, 30), at_us: int | None = None) -> list[Outstanding]:
+        """Buckets by days since settlement, e.g. "<1d", "1-7d", "7-30d", "30d+"; empty buckets are included."""
+        at = at_us if at_us is not None else now().us
+        edges = sorted(bucket_days)
+        labels = [f"<{edges[0]}d"] + [f"{lo}-{hi}d" for lo, hi in zip(edges, edges[1:])] + [f"{edges[-1]}d+"]
+        cases = " ".join(f"WHEN settled_at_us > ? THEN {i}" for i in range(len(edges)))
+        rows = self._conn.execute(
+            f"""
+            SELECT CASE {cases} ELSE {len(edges)} END AS bucket, COUNT(*) AS slips, SUM(amount) AS amount
+            FROM liabilities
+            WHERE status = 'UNPAID'
+            GROUP BY bucket
+            """,
+            tuple(at - days * _DAY_US for days in edges),
+        ).fetchall()
+        found = {int(r["bucket"]): (int(r["slips"]), int(r["amount"])) for r in rows}
+        return [Outstanding(label, *found.get(i, (0, 0))) for i, label in enumerate(labels)]
+
+    def expire_unclaimed(self, *, actor: Actor, older_than_days: int, at_us: int | None = None) -> Outstanding:
+        """
+        Archives every unpaid slip settled more than `older_than_days` ago, in one transaction.
+
+        The slips become ARCHIVED with no payout (so their QR no longer pays) and their rows EXPIRED;
+        returns how many slips and how much money were written off. The window is at least a day,
+        so a slip is never written off the moment its result is set.
+        """
+        if older_than_days < 1:
+            raise ValidationError("Unclaimed winnings can only expire after at least 1 day")
+        with transaction(self._conn):
+            moment = now()
+            cutoff = (at_us if at_us is not None else moment.us) - older_than_days * _DAY_US
+            expired = self._conn.execute(
+                "SELECT bet_id, match_id, amount FROM liabilities WHERE status = 'UNPAID' AND settled_at_us < ?",
+                (cutoff,),
+            ).fetchall()
+            if not expired:
+                return Outstanding(None, 0, 0)
+            self._conn.execute(
+                """
+                UPDATE bet_slips SET status = 'ARCHIVED', archived_at = ?
+                WHERE id IN (SELECT bet_id FROM liabilities WHERE status = 'UNPAID' AND settled_at_us < ?)
+                  AND status IN ('ENCODED','PRINTED')
+                """,
+                (moment.iso, cutoff),
+            )
+            self._conn.execute(
+                "UPDATE liabilities SET status = 'EXPIRED', closed_at_us = ? WHERE status = 'UNPAID' AND settled_at_us < ?",
+                (moment.us, cutoff),
+            )
+            if self._audit is not None:
+                self._audit.log_many(
+                    actor=actor,
+                    action="BET_EXPIRE",
+                    entity_type="bet_slip",
+                    entries=(
+                        (str(r["bet_id"]), {"status": "UNPAID", "amount": int(r["amount"])}, {"status": "ARCHIVED", "match_id": int(r["match_id"])})
+                        for r in expired
+                    ),
+                    metadata={"older_than_days": older_than_days},
+                )
+        return Outstanding(None, len(expired), sum(int(r["amount"]) for r in expired))
+
+    def _grouped(self, column: str) -> list[Outstanding]:
+        rows = self._conn.execute(
+            f"""
+            SELECT {column} AS key, COUNT(*) AS slips, SUM(amount) AS amount
+            FROM liabilities
+            WHERE status = 'UNPAID'
+            GROUP BY {column}
+            ORDER BY amount DESC
+            """
+        ).fetchall()
+        return [Outstanding(r["key"], int(r["slips"]), int(r["amount"])) for r in rows]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import asdict, dataclass
+
+from cockpit.db.connection import transaction
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import LimitExceededError, ValidationError
+from cockpit.services.payouts import Odds, exposure_for
+from cockpit.utils.clock import now
+
+
+LIMIT_RULES: dict[str, str] = {
+    "max_bet": "single bet limit",
+    "max_total": "pool limit",
+    "max_payout": "payout limit",
+    "max_cashier_total": "per-cashier limit",
+}
+
+
+@dataclass(frozen=True)
+class BetLimit:
+    id: int
+    match_id: int | None
+    side: str | None
+    max_bet: int | None
+    max_total: int | None
+    max_payout: int | None
+    max_cashier_total: int | None
+
+    @property
+    def scope(self) -> str:
+        match = f"match {self.match_id}" if self.match_id is not None else "every match"
+        return f"{match}, {self.side or 'all sides'}"
+
+
+_COLUMNS = "id, match_id, side, max_bet, max_total, max_payout, max_cashier_total"
+
+
+class LimitService:
+    """
+    Betting caps (bet_limits) enforced inside encode_bet's transaction.
+
+    The running figures a cap is compared with are the trigger-maintained counters: match_pools for
+    pool and payout caps, rollup_bets for per-cashier caps. A check is a few keyed reads however
+    many slips the match already has, and because it runs under the bet's write lock, two terminals
+    cannot both squeeze under the same cap.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None) -> None:
+        self._conn = conn
+        self._audit = audit
+
+    def list_limits(self, *, match_id: int | None = None) -> list[BetLimit]:
+        """Every rule, or with `match_id` the rules that apply to that match."""
+        if match_id is None:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM bet_limits ORDER BY match_id IS NOT NULL, match_id, side").fetchall()
+        else:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM bet_limits WHERE match_id IS NULL OR match_id = ? ORDER BY match_id IS NOT NULL, side",
+                (match_id,),
+            ).fetchall()
+        return [BetLimit(*tuple(r)) for r in rows]
+
+    def set_limit(
+        self,
+        *,
+        actor: Actor,
+        match_id: int | None,
+        side: str | None,
+        max_bet: int | None = None,
+        max_total: int | None = None,
+        max_payout: int | None = None,
+        max_cashier_total: int | None = None,
+    ) -> int:
+        """Creates or replaces the rule for (match_id, side); None leaves that cap off."""
+        if side is not None and side not in ("WALA", "MERON", "DRAW"):
+            raise ValidationError("Side must be WALA, MERON, DRAW, or empty for the whole match")
+        caps = {"max_bet": max_bet, "max_total": max_total, "max_payout": max_payout, "max_cashier_total": max_cashier_total}
+        if all(v is None for v in caps.values()):
+            raise ValidationError("Set at least one limit")
+        if any(v is not None and v <= 0 for v in caps.values()):
+            raise ValidationError("Limits must be positive amounts")
+        if max_cashier_total is not None and side is not None:
+            raise ValidationError("Per-cashier limits apply to the whole match; leave the side empty")
+
+        with transaction(self._conn):
+            previous = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM bet_limits WHERE match_id IS ? AND side IS ?",
+                (match_id, side),
+            ).fetchone()
+            if previous is None:
+                limit_id = int(
+                    self._conn.execute(
+                        """
+                        INSERT INTO bet_limits(match_id, side, max_bet, max_total, max_payout, max_cashier_total, created_by, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (match_id, side, max_bet, max_total, max_payout, max_cashier_total, actor.user_id, now().iso),
+                    ).lastrowid
+                )
+            else:
+                limit_id = int(previous["id"])
+                self._conn.execute(
+                    "UPDATE bet_limits SET max_bet = ?, max_total = ?, max_payout = ?, max_cashier_total = ? WHERE id = ?",
+                    (max_bet, max_total, max_payout, max_cashier_total, limit_id),
+                )
+            if self._audit is not None:
+                self._audit.log(
+                    actor=actor,
+                    action="BET_LIMIT_SET",
+                    entity_type="bet_limit",
+                    entity_id=str(limit_id),
+                    previous_state=asdict(BetLimit(*tuple(previous))) if previous is not None else None,
+                    new_state={"match_id": match_id, "side": side, **caps},
+                )
+        return limit_id
+
+    def remove_limit(self, *, actor: Actor, limit_id: int) -> None:
+        with transaction(self._conn):
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM bet_limits WHERE id = ?", (limit_id,)).fetchone()
+            if row is None:
+                raise ValidationError("Limit not found")
+            self._conn.execute("DELETE FROM bet_limits WHERE id = ?", (limit_id,))
+            if self._audit is not None:
+                self._audit.log(
+                    actor=actor,
+                    action="BET_LIMIT_REMOVE",
+                    entity_type="bet_limit",
+                    entity_id=str(limit_id),
+                    previous_state=asdict(BetLimit(*tuple(row))),
+                )
+
+    def check(self, *, match_id: int, side: str, amount: int, cashier_id: int, odds: Odds) -> None:
+        """
+        Raises LimitExceededError if the bet would break any applicable rule.
+
+        `odds` is the match's pool before the bet, as read in the same transaction.
+        """
+        limits = [
+            BetLimit(*tuple(r))
+            for r in self._conn.execute(
+                f"SELECT {_COLUMNS} FROM bet_limits WHERE (match_id IS NULL OR match_id = ?) AND (side IS NULL OR side = ?)",
+                (match_id, side),
+            ).fetchall()
+        ]
+        if not limits:
+            return
+
+        after = Odds.from_totals(
+            odds.total_wala + (amount if side == "WALA" else 0),
+            odds.total_meron + (amount if side == "MERON" else 0),
+            odds.total_draw + (amount if side == "DRAW" else 0),
+            odds.total_all + amount,
+        )
+        side_total = {"WALA": after.total_wala, "MERON": after.total_meron, "DRAW": after.total_draw}[side]
+        payouts = exposure_for(after)
+        cashier_total: int | None = None
+
+        for limit in limits:
+            checks: list[tuple[str, int, int]] = []
+            if limit.max_bet is not None:
+                checks.append(("max_bet", limit.max_bet, amount))
+            if limit.max_total is not None:
+                checks.append(("max_total", limit.max_total, side_total if limit.side else after.total_all))
+            if limit.max_payout is not None:
+                checks.append(("max_payout", limit.max_payout, payouts[side] if limit.side else max(payouts.values())))
+            if limit.max_cashier_total is not None:
+                if cashier_total is None:
+                    row = self._conn.execute(
+                        "SELECT COALESCE(SUM(bet_in), 0) FROM rollup_bets WHERE match_id = ? AND user_id = ?",
+                        (match_id, cashier_id),
+                    ).fetchone()
+                    cashier_total = int(row[0]) + amount
+                checks.append(("max_cashier_total", limit.max_cashier_total, cashier_total))
+            for rule, cap, attempted in checks:
+                if attempted > cap:
+                    raise LimitExceededError(
+                        f"Bet rejected: {LIMIT_RULES[rule]} for {limit.scope} is ₱{cap}; this bet would make it ₱{attempted}",
+                        limit_id=limit.id,
+                        rule=rule,
+                        limit=cap,
+                        attempted=attempted,
+                        bet={"match_id": match_id, "side": side, "amount": amount, "encoded_by": cashier_id},
+                    )
+
+    def record_rejection(self, *, actor: Actor, error: LimitExceededError) -> bool:
+        """
+        Audits a rejected bet once the transaction that tried it has rolled back.
+
+        Returns False without writing while a transaction is still open (the row would roll back
+        with the bet), so callers at every level can call it and the outermost one records it.
+        """
+        if error.recorded:
+            return True
+        if self._audit is None or self._conn.in_transaction:
+            return False
+        with transaction(self._conn):
+            self._audit.log(
+                actor=actor,
+                action="BET_LIMIT_REJECT",
+                entity_type="bet_limit",
+                entity_id=str(error.limit_id),
+                new_state={"rule": error.rule, "limit": error.limit, "attempted": error.attempted, **error.bet},
+            )
+        error.recorded = True
+        return True
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import deque
+from dataclasses import dataclass
+
+from cockpit.db.connection import telemetry_transaction
+from cockpit.services.pits import DEFAULT_PIT_ID
+from cockpit.utils.clock import now
+
+
+@dataclass(frozen=True)
+class OddsPoint:
+    at_us: int
+    pool_version: int
+    total_wala: int
+    total_meron: int
+    total_draw: int
+    total_all: int
+
+    @property
+    def wala_share(self) -> float | None:
+        """WALA's share of the WALA+MERON money, or None before either side has a bet."""
+        both = self.total_wala + self.total_meron
+        return self.total_wala / both if both else None
+
+
+def odds_series(conn: sqlite3.Connection, match_id: int, *, limit: int | None = None) -> list[OddsPoint]:
+    """Persisted (downsampled) points for one match, oldest first; `limit` keeps the newest N."""
+    rows = conn.execute(
+        """
+        SELECT sampled_at_us, pool_version, total_wala, total_meron, total_draw, total_all
+        FROM telemetry.odds_series
+        WHERE match_id = ?
+        ORDER BY bucket_us DESC
+        LIMIT ?
+        """,
+        (match_id, -1 if limit is None else limit),
+    ).fetchall()
+    return [OddsPoint(*tuple(r)) for r in reversed(rows)]
+
+
+class OddsRecorder:
+    """
+    Samples a pit's current match pool (pit_state -> match_pools) each time `sample()` is called.
+
+    - The caller sets the cadence (`odds_sample_seconds`); an unchanged pool_version costs one
+      keyed read and records nothing.
+    - Full-resolution points for the current match are kept in a ring of `ring_size`, so memory
+      stays bounded however long betting stays open.
+    - telemetry.odds_series keeps one row per `bucket_seconds` per match (the latest sample in the
+      bucket), which is what reports and a restarted display read back.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, *, pit_id: int = DEFAULT_PIT_ID, bucket_seconds: int = 30, ring_size: int = 360) -> None:
+        self._conn = conn
+        self._pit_id = pit_id
+        self._bucket_us = max(1, int(bucket_seconds)) * 1_000_000
+        self._ring: deque[OddsPoint] = deque(maxlen=ring_size)
+        self.match_id: int | None = None
+
+    def points(self) -> list[OddsPoint]:
+        return list(self._ring)
+
+    def sample(self, *, at_us: int | None = None) -> OddsPoint | None:
+        """Records a point if the current match's pool moved; returns it (None when nothing changed)."""
+        row = self._conn.execute(
+            """
+            SELECT v.current_match_id, p.pool_version, p.total_wala, p.total_meron, p.total_draw, p.total_all
+            FROM pit_state v
+            LEFT JOIN match_pools p ON p.match_id = v.current_match_id
+            WHERE v.pit_id = ?
+            """,
+            (self._pit_id,),
+        ).fetchone()
+        match_id = row[0] if row is not None else None
+        if match_id != self.match_id:
+            self.match_id = match_id
+            self._ring.clear()
+            if match_id is not None:
+                self._ring.extend(odds_series(self._conn, match_id, limit=self._ring.maxlen))
+        if match_id is None or row[1] is None:
+            return None
+        if self._ring and self._ring[-1].pool_version == row[1]:
+            return None
+
+        point = OddsPoint(at_us if at_us is not None else now().us, *(int(v) for v in tuple(row)[1:]))
+        self._ring.append(point)
+        with telemetry_transaction(self._conn):
+            self._conn.execute(
+                """
+                INSERT INTO telemetry.odds_series(match_id, bucket_us, sampled_at_us, pool_version, total_wala, total_meron, total_draw, total_all)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(match_id, bucket_us) DO UPDATE SET
+                  sampled_at_us = excluded.sampled_at_us,
+                  pool_version = excluded.pool_version,
+                  total_wala = excluded.total_wala,
+                  total_meron = excluded.total_meron,
+                  total_draw = excluded.total_draw,
+                  total_all = excluded.total_all
+                WHERE excluded.pool_version >= pool_version
+                """,
+                (
+                    match_id,
+                    point.at_us - point.at_us % self._bucket_us,
+                    point.at_us,
+                    point.pool_version,
+                    point.total_wala,
+                    point.total_meron,
+                    point.total_draw,
+                    point.total_all,
+                ),
+            )
+        return point
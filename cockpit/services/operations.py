@@ -7,7 +7,7 @@ from cockpit.services.audit import Actor, AuditService
 from cockpit.services.betting import BettingService
 from cockpit.services.cash import CashService
 from cockpit.services.canteen import CanteenService
-from cockpit.services.errors import ValidationError
+from cockpit.services.errors import LimitExceededError, ValidationError
 
 
 class OperationsService:
@@ -37,27 +37,32 @@ class OperationsService:
         side: str,
         amount: int,
     ) -> dict:
-        with transaction(self._conn):
-            drawer_id = self.cash.get_or_open_user_drawer(actor=actor, drawer_type="BETTING_CASHIER", user_id=cashier_user_id)
-            slip = self.betting.encode_bet(
-                actor=actor,
-                encoded_by=cashier_user_id,
-                device_id=device_id,
-                match_id=match_id,
-                side=side,
-                amount=amount,
-            )
-            self.cash.record_movement(
-                actor=actor,
-                created_by=cashier_user_id,
-                drawer_id=drawer_id,
-                movement_type="BET_IN",
-                amount=amount,
-                reference_type="BET_SLIP",
-                reference_id=str(slip["id"]),
-                notes=None,
-            )
-            return slip
+        try:
+            with transaction(self._conn):
+                drawer_id = self.cash.get_or_open_user_drawer(actor=actor, drawer_type="BETTING_CASHIER", user_id=cashier_user_id)
+                slip = self.betting.encode_bet(
+                    actor=actor,
+                    encoded_by=cashier_user_id,
+                    device_id=device_id,
+                    match_id=match_id,
+                    side=side,
+                    amount=amount,
+                )
+                self.cash.record_movement(
+                    actor=actor,
+                    created_by=cashier_user_id,
+                    drawer_id=drawer_id,
+                    movement_type="BET_IN",
+                    amount=amount,
+                    reference_type="BET_SLIP",
+                    reference_id=str(slip["id"]),
+                    notes=None,
+                )
+                return slip
+        except LimitExceededError as exc:
+            # Recorded here only if this was the outermost transaction; otherwise the caller records it.
+            self.betting.limits.record_rejection(actor=actor, error=exc)
+            raise
 
     def payout_bet_with_cash(
         self,
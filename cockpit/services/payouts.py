@@ -0,0 +1,93 @@
+"""
+Payout rules as pure functions of a match's pool, shared by slip payouts, exposure and bet limits.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from cockpit.services.errors import ValidationError
+
+
+@dataclass(frozen=True)
+class Odds:
+    total_wala: int
+    total_meron: int
+    total_draw: int
+    total_all: int
+    wala_multiplier: float | None
+    meron_multiplier: float | None
+
+    @classmethod
+    def from_totals(cls, total_wala: int, total_meron: int, total_draw: int, total_all: int) -> Odds:
+        return cls(
+            total_wala=total_wala,
+            total_meron=total_meron,
+            total_draw=total_draw,
+            total_all=total_all,
+            wala_multiplier=(total_all / total_wala) if total_wala > 0 else None,
+            meron_multiplier=(total_all / total_meron) if total_meron > 0 else None,
+        )
+
+
+# DRAW bets are paid this multiple of the stake when the result is DRAW.
+DRAW_PAYOUT_MULTIPLE = 5
+
+RESULT_TYPES = ("WALA", "MERON", "DRAW", "CANCELLED", "NO_CONTEST")
+
+
+def payout_for(side: str, amount: int, result_type: str, odds: Odds) -> int:
+    """
+    What a stake of `amount` on `side` pays for `result_type`, given the match's pool.
+
+    Pure, so the same rules price a single slip at payout time and a whole side's total for exposure.
+    """
+    # Cancelled / no contest: refund everyone (stake returned).
+    if result_type in ("CANCELLED", "NO_CONTEST"):
+        return amount
+
+    # Draw: draw bettors are paid 5×; Wala/Meron are refunded.
+    if result_type == "DRAW":
+        if side == "DRAW":
+            return amount * DRAW_PAYOUT_MULTIPLE
+        return amount
+
+    # Wala/Meron win: losing side gets 0; draw bets lose.
+    if result_type in ("WALA", "MERON"):
+        if side != result_type:
+            return 0
+        side_pool = odds.total_wala if result_type == "WALA" else odds.total_meron
+        if side_pool <= 0 or odds.total_all <= 0:
+            return 0
+        # amount × (pool / side pool), floored; integer arithmetic so a side's total floors to exactly the pool.
+        return amount * odds.total_all // side_pool
+
+    raise ValidationError("Unsupported result type")
+
+
+@dataclass(frozen=True)
+class Exposure:
+    """Cash a match pays out under each result, from its current pool (see `exposure_for`)."""
+
+    match_id: int
+    pool_version: int
+    total_all: int
+    payouts: dict[str, int]
+
+    @property
+    def worst_result(self) -> str:
+        return max(RESULT_TYPES, key=lambda r: self.payouts[r])
+
+    @property
+    def worst_case(self) -> int:
+        return self.payouts[self.worst_result]
+
+
+def exposure_for(odds: Odds) -> dict[str, int]:
+    """
+    Payout per result for a pool: `payout_for` applied to each side's total stake.
+
+    Per-slip flooring can only lower a winning side's payout (by under ₱1 per slip), so this
+    is the worst case the drawers need to cover.
+    """
+    stakes = {"WALA": odds.total_wala, "MERON": odds.total_meron, "DRAW": odds.total_draw}
+    return {result: sum(payout_for(side, stake, result, odds) for side, stake in stakes.items()) for result in RESULT_TYPES}
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+
+from cockpit.db.connection import transaction
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.utils.clock import now
+
+
+# Seeded by schema.sql; matches created before pits existed belong to it.
+DEFAULT_PIT_ID = 1
+
+
+@dataclass(frozen=True)
+class Pit:
+    id: int
+    code: str
+    name: str
+    is_active: bool
+
+
+class PitService:
+    """
+    Pits (rings) that run matches in parallel.
+
+    Each pit has its own current match in pit_state, so displays and cashier terminals bound to
+    a pit (`AppConfig.pit_code`) only ever read that pit's rows.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService | None) -> None:
+        self._conn = conn
+        self._audit = audit
+
+    def list_pits(self, *, active_only: bool = False) -> list[Pit]:
+        rows = self._conn.execute(
+            f"SELECT id, code, name, is_active FROM pits {'WHERE is_active = 1' if active_only else ''} ORDER BY id"
+        ).fetchall()
+        return [Pit(int(r["id"]), r["code"], r["name"], bool(r["is_active"])) for r in rows]
+
+    def get(self, pit_id: int) -> Pit:
+        row = self._conn.execute("SELECT id, code, name, is_active FROM pits WHERE id = ?", (pit_id,)).fetchone()
+        if row is None:
+            raise ValidationError(f"Unknown pit id: {pit_id}")
+        return Pit(int(row["id"]), row["code"], row["name"], bool(row["is_active"]))
+
+    def get_by_code(self, code: str) -> Pit:
+        row = self._conn.execute("SELECT id, code, name, is_active FROM pits WHERE code = ?", (code.strip().upper(),)).fetchone()
+        if row is None:
+            raise ValidationError(f"Unknown pit: {code}")
+        return Pit(int(row["id"]), row["code"], row["name"], bool(row["is_active"]))
+
+    def create_pit(self, *, actor: Actor, code: str, name: str) -> int:
+        code = code.strip().upper()
+        if not code or not name.strip():
+            raise ValidationError("Pit code and name are required")
+        with transaction(self._conn):
+            if self._conn.execute("SELECT 1 FROM pits WHERE code = ?", (code,)).fetchone() is not None:
+                raise ValidationError(f"Pit {code} already exists")
+            pit_id = int(
+                self._conn.execute(
+                    "INSERT INTO pits(code, name, is_active, created_at) VALUES (?, ?, 1, ?)",
+                    (code, name.strip(), now().iso),
+                ).lastrowid
+            )
+            if self._audit is not None:
+                self._audit.log(actor=actor, action="PIT_CREATE", entity_type="pit", entity_id=str(pit_id), new_state={"code": code, "name": name.strip()})
+        return pit_id
@@ -40,8 +40,17 @@ DEFAULT_ROLES: dict[str, list[str]] = {
 
 
 class RBACService:
+    """
+    Role/permission lookups with a per-user permission cache.
+
+    The cache is dropped whenever `rbac_version` (bumped by triggers on role_permissions and
+    user_roles) moves; call `sync()` periodically so edits made on other terminals are picked up.
+    """
+
     def __init__(self, conn: sqlite3.Connection) -> None:
         self._conn = conn
+        self._cache: dict[int, frozenset[str]] = {}
+        self._version: int | None = None
 
     def seed_defaults(self) -> None:
         for perm in DEFAULT_PERMISSIONS:
@@ -67,7 +76,25 @@ class RBACService:
                     (role_id, perm_id),
                 )
 
-    def user_permissions(self, user_id: int) -> set[str]:
+    def version(self) -> int:
+        row = self._conn.execute("SELECT version FROM rbac_version WHERE id = 1").fetchone()
+        return int(row["version"]) if row is not None else 0
+
+    def sync(self) -> bool:
+        """Drops cached permissions if roles changed since the last sync; returns True if it did."""
+        version = self.version()
+        if version == self._version:
+            return False
+        self._version = version
+        self._cache.clear()
+        return True
+
+    def user_permissions(self, user_id: int) -> frozenset[str]:
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+        if self._version is None:
+            self._version = self.version()
         rows = self._conn.execute(
             """
             SELECT p.code
@@ -78,11 +105,11 @@ class RBACService:
             """,
             (user_id,),
         ).fetchall()
-        codes = {r["code"] for r in rows}
+        codes = frozenset(r["code"] for r in rows)
         if "ADMIN_ALL" in codes:
-            return {"ADMIN_ALL"} | {p.code for p in DEFAULT_PERMISSIONS}
+            codes = frozenset({"ADMIN_ALL"} | {p.code for p in DEFAULT_PERMISSIONS})
+        self._cache[user_id] = codes
         return codes
 
     def has(self, user_id: int, perm_code: str) -> bool:
         return perm_code in self.user_permissions(user_id)
-
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from cockpit.db.connection import connect_reader
+from cockpit.services.errors import ValidationError
+from cockpit.utils.clock import format_business_day, format_timestamp, parse_business_day
+
+
+@dataclass(frozen=True)
+class ReportParam:
+    name: str
+    label: str
+    default: Any
+    convert: Callable[[str], Any] = str
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    """A named query; parameters are bound as `:name` placeholders, `formatters` apply per column on output."""
+
+    key: str
+    title: str
+    columns: tuple[str, ...]
+    headings: tuple[str, ...]
+    sql: str
+    params: tuple[ReportParam, ...] = ()
+    formatters: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if len(self.columns) != len(self.headings):
+            raise ValueError(f"report {self.key!r}: {len(self.columns)} columns but {len(self.headings)} headings")
+
+    def bind(self, values: Mapping[str, Any] | None = None) -> dict[str, Any]:
+        values = values or {}
+        bound: dict[str, Any] = {}
+        for p in self.params:
+            raw = values.get(p.name, p.default)
+            try:
+                bound[p.name] = p.convert(raw) if isinstance(raw, str) else raw
+            except (TypeError, ValueError):
+                raise ValidationError(f"{self.title}: invalid {p.label}: {raw!r}") from None
+        return bound
+
+    def row_values(self, row: sqlite3.Row) -> tuple[Any, ...]:
+        fmt = self.formatters
+        return tuple(fmt[c](row[c]) if c in fmt else row[c] for c in self.columns)
+
+
+_REPORTS: dict[str, ReportDefinition] = {}
+
+
+def register_report(definition: ReportDefinition) -> ReportDefinition:
+    _REPORTS[definition.key] = definition
+    return definition
+
+
+def report_definitions() -> list[ReportDefinition]:
+    return list(_REPORTS.values())
+
+
+def get_report(key: str) -> ReportDefinition:
+    try:
+        return _REPORTS[key]
+    except KeyError:
+        raise ValidationError(f"Unknown report: {key}") from None
+
+
+def _day_from(value: str) -> int:
+    return parse_business_day(value) if value.strip() else 0
+
+
+def _day_to(value: str) -> int:
+    return parse_business_day(value) if value.strip() else 99991231
+
+
+# Business-day range (YYYY-MM-DD, blank = open); bound to BETWEEN :day_from AND :day_to so the
+# day-leading indexes serve the filter. A business day is one event night (see cockpit.utils.clock).
+_DAY_RANGE = (ReportParam("day_from", "From", "", _day_from), ReportParam("day_to", "To", "", _day_to))
+
+
+register_report(
+    ReportDefinition(
+        key="fight_history",
+        title="Fight History",
+        columns=("match_number", "state", "result", "decided_at"),
+        headings=("Match #", "State", "Result", "Decided At"),
+        sql="""
+          SELECT fm.match_number, fm.state, COALESCE(fr.result_type, '') AS result, COALESCE(fr.decided_at, '') AS decided_at
+          FROM fight_matches fm
+          LEFT JOIN fight_results fr ON fr.match_id = fm.id
+          WHERE fm.business_day BETWEEN :day_from AND :day_to
+          ORDER BY fm.id DESC
+        """,
+        params=_DAY_RANGE,
+    )
+)
+
+register_report(
+    ReportDefinition(
+        key="daily_income",
+        title="Daily Income",
+        columns=("day", "bet_in", "bet_payouts", "bet_net", "canteen_sales"),
+        headings=("Day", "Bet In", "Bet Payouts", "Bet Net", "Canteen Sales"),
+        sql="""
+          WITH bet AS (
+            SELECT business_day AS day, SUM(bet_in) AS bet_in, SUM(payouts) AS bet_payouts
+            FROM rollup_bets
+            WHERE business_day BETWEEN :day_from AND :day_to
+            GROUP BY business_day
+          ),
+          canteen AS (
+            SELECT business_day AS day, SUM(sales_total) AS sales
+            FROM rollup_canteen
+            WHERE business_day BETWEEN :day_from AND :day_to
+            GROUP BY business_day
+          ),
+          days AS (
+            SELECT day FROM bet
+            UNION
+            SELECT day FROM canteen
+          )
+          SELECT
+            d.day AS day,
+            COALESCE(b.bet_in, 0) AS bet_in,
+            COALESCE(b.bet_payouts, 0) AS bet_payouts,
+            COALESCE(b.bet_in, 0) - COALESCE(b.bet_payouts, 0) AS bet_net,
+            COALESCE(c.sales, 0) AS canteen_sales
+          FROM days d
+          LEFT JOIN bet b ON b.day = d.day
+          LEFT JOIN canteen c ON c.day = d.day
+          ORDER BY d.day DESC
+        """,
+        params=_DAY_RANGE,
+        formatters={"day": format_business_day},
+    )
+)
+
+register_report(
+    ReportDefinition(
+        key="cashier_performance",
+        title="Cashiers",
+        columns=("cashier", "bets_count", "bet_in", "payouts"),
+        headings=("Cashier", "Bets", "Bet In", "Payouts"),
+        sql="""
+          SELECT
+            u.username AS cashier,
+            SUM(r.bets_count) AS bets_count,
+            SUM(r.bet_in) AS bet_in,
+            SUM(r.payouts) AS payouts
+          FROM rollup_bets r
+          JOIN users u ON u.id = r.user_id
+          WHERE r.business_day BETWEEN :day_from AND :day_to
+          GROUP BY r.user_id
+          ORDER BY bet_in DESC
+        """,
+        params=_DAY_RANGE,
+    )
+)
+
+register_report(
+    ReportDefinition(
+        key="canteen_sales",
+        title="Canteen",
+        columns=("seller", "sales_count", "sales_total"),
+        headings=("Seller", "Sales", "Total"),
+        sql="""
+          SELECT
+            u.username AS seller,
+            SUM(r.sales_count) AS sales_count,
+            SUM(r.sales_total) AS sales_total
+          FROM rollup_canteen r
+          JOIN users u ON u.id = r.user_id
+          WHERE r.business_day BETWEEN :day_from AND :day_to
+          GROUP BY r.user_id
+          ORDER BY sales_total DESC
+        """,
+        params=_DAY_RANGE,
+    )
+)
+
+register_report(
+    ReportDefinition(
+        key="bet_slips",
+        title="Bet Slips",
+        columns=("business_day", "encoded_at_us", "slip_number", "match_number", "side", "amount", "status", "cashier", "payout_amount"),
+        headings=("Day", "Encoded At", "Slip #", "Match #", "Side", "Amount", "Status", "Cashier", "Payout"),
+        # Ordered exactly like idx_bet_slips_day_cashier so a season-long range streams without a sort.
+        sql="""
+          SELECT
+            b.business_day, b.encoded_at_us, b.slip_number, fm.match_number, b.side, b.amount, b.status,
+            u.username AS cashier, COALESCE(b.payout_amount, 0) AS payout_amount
+          FROM bet_slips b
+          JOIN fight_matches fm ON fm.id = b.match_id
+          JOIN users u ON u.id = b.encoded_by
+          WHERE b.business_day BETWEEN :day_from AND :day_to
+          ORDER BY b.business_day, b.encoded_by, b.id
+        """,
+        params=_DAY_RANGE,
+        formatters={"business_day": format_business_day, "encoded_at_us": format_timestamp},
+    )
+)
+
+
+register_report(
+    ReportDefinition(
+        key="odds_history",
+        title="Odds History",
+        columns=("match_number", "sampled_at_us", "total_wala", "total_meron", "total_draw", "total_all", "wala_multiplier", "meron_multiplier"),
+        headings=("Match #", "Time", "Wala", "Meron", "Draw", "Total", "Wala Mult", "Meron Mult"),
+        sql="""
+          SELECT
+            fm.match_number, s.sampled_at_us, s.total_wala, s.total_meron, s.total_draw, s.total_all,
+            ROUND(CAST(s.total_all AS REAL) / NULLIF(s.total_wala, 0), 2) AS wala_multiplier,
+            ROUND(CAST(s.total_all AS REAL) / NULLIF(s.total_meron, 0), 2) AS meron_multiplier
+          FROM fight_matches fm
+          JOIN telemetry.odds_series s ON s.match_id = fm.id
+          WHERE fm.business_day BETWEEN :day_from AND :day_to
+          ORDER BY fm.id, s.bucket_us
+        """,
+        params=_DAY_RANGE,
+        formatters={"sampled_at_us": format_timestamp},
+    )
+)
+
+
+class ReportRun:
+    """
+    Executes one report on a background thread with its own read-only connection.
+
+    - Rows are fetched `chunk_size` at a time and formatted into tuples in column order.
+      Without a `sink` they are queued for the UI thread to `drain()`; with one (e.g.
+      `ReportWriter.write`) each chunk is handed to it on the worker thread, so exports run
+      in constant memory.
+    - `cancel()` stops between chunks and interrupts a statement that is still computing.
+    - `state` is RUNNING, DONE, CANCELLED or FAILED (`error` holds the message).
+    """
+
+    def __init__(
+        self,
+        definition: ReportDefinition,
+        *,
+        db_path: Path,
+        params: Mapping[str, Any] | None = None,
+        chunk_size: int = 500,
+        sink: Callable[[list[tuple[Any, ...]]], None] | None = None,
+    ) -> None:
+        self.definition = definition
+        self._db_path = db_path
+        self._params = definition.bind(params)
+        self._chunk_size = chunk_size
+        self._sink = sink
+        self._chunks: queue.SimpleQueue[list[tuple[Any, ...]]] = queue.SimpleQueue()
+        self._cancelled = threading.Event()
+        self._conn: sqlite3.Connection | None = None
+        self._conn_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"report-{definition.key}", daemon=True)
+        self.rows_fetched = 0
+        self.state = "RUNNING"
+        self.error: str | None = None
+
+    def start(self) -> "ReportRun":
+        self._thread.start()
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self.state != "RUNNING"
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def drain(self, max_chunks: int | None = None) -> list[tuple[Any, ...]]:
+        rows: list[tuple[Any, ...]] = []
+        taken = 0
+        while max_chunks is None or taken < max_chunks:
+            try:
+                rows.extend(self._chunks.get_nowait())
+            except queue.Empty:
+                break
+            taken += 1
+        return rows
+
+    def _run(self) -> None:
+        definition = self.definition
+        deliver = self._sink or self._chunks.put
+        try:
+            conn = connect_reader(self._db_path)
+            with self._conn_lock:
+                self._conn = conn
+            try:
+                cur = conn.execute(definition.sql, self._params)
+                while not self._cancelled.is_set():
+                    batch = cur.fetchmany(self._chunk_size)
+                    if not batch:
+                        break
+                    deliver([definition.row_values(r) for r in batch])
+                    self.rows_fetched += len(batch)
+            finally:
+                with self._conn_lock:
+                    self._conn = None
+                conn.close()
+            self.state = "CANCELLED" if self._cancelled.is_set() else "DONE"
+        except sqlite3.OperationalError as exc:
+            if self._cancelled.is_set():
+                self.state = "CANCELLED"
+            else:
+                self.error = str(exc)
+                self.state = "FAILED"
+        except Exception as exc:
+            self.error = str(exc)
+            self.state = "FAILED"
+
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def export_format_for(path: Path) -> str:
+    fmt = path.suffix.lower().lstrip(".")
+    if fmt == "json":
+        fmt = "jsonl"
+    if fmt not in EXPORT_FORMATS:
+        raise ValidationError("Export file must end in .csv or .jsonl")
+    return fmt
+
+
+class ReportWriter:
+    """
+    Streams report rows to CSV (header = headings) or JSONL (one object per row, keyed by column).
+
+    Writes go to `<path>.part`; `close(keep=True)` moves it into place, `close(keep=False)`
+    discards it, so a cancelled export never leaves a truncated file behind.
+    """
+
+    def __init__(self, definition: ReportDefinition, path: Path, fmt: str | None = None) -> None:
+        self.path = path
+        self._fmt = fmt or export_format_for(path)
+        self._columns = definition.columns
+        self._tmp = path.with_name(path.name + ".part")
+        self._file = self._tmp.open("w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._file) if self._fmt == "csv" else None
+        if self._csv is not None:
+            self._csv.writerow(definition.headings)
+
+    def write(self, rows: list[tuple[Any, ...]]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(rows)
+            return
+        columns = self._columns
+        self._file.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self, *, keep: bool) -> None:
+        self._file.close()
+        if keep:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
+
+
+def export_report(
+    definition: ReportDefinition,
+    *,
+    db_path: Path,
+    path: Path,
+    params: Mapping[str, Any] | None = None,
+    fmt: str | None = None,
+    progress: Callable[[int], None] | None = None,
+    progress_every: float = 1.0,
+    chunk_size: int = 2000,
+) -> int:
+    """Blocking export for headless use; returns the row count. Ctrl+C cancels and removes the partial file."""
+    definition.bind(params)  # Reject bad parameters before creating the output file.
+    writer = ReportWriter(definition, path, fmt)
+    run = ReportRun(definition, db_path=db_path, params=params, chunk_size=chunk_size, sink=writer.write)
+    try:
+        run.start()
+        while not run.wait(progress_every):
+            if progress is not None:
+                progress(run.rows_fetched)
+    except BaseException:
+        run.cancel()
+        run.wait()
+        writer.close(keep=False)
+        raise
+    writer.close(keep=run.state == "DONE")
+    if run.state == "FAILED":
+        raise ValidationError(f"{definition.title} export failed: {run.error}")
+    if progress is not None:
+        progress(run.rows_fetched)
+    return run.rows_fetched
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import secrets
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from cockpit.utils.clock import utc_now
+
+
+@dataclass(frozen=True)
+class SlipIdentity:
+    day: str
+    slip_number: str
+    qr_payload: str
+
+
+def _today() -> str:
+    return utc_now().strftime("%Y%m%d")
+
+
+def new_slip_identity(day: str | None = None) -> SlipIdentity:
+    day = day or _today()
+    return SlipIdentity(day=day, slip_number=f"S{day}-{secrets.token_hex(4).upper()}", qr_payload=secrets.token_urlsafe(16))
+
+
+class SlipIdentityPool:
+    """
+    In-process pool of pre-generated slip numbers and QR payloads.
+
+    - A background thread tops the pool up to `batch_size` whenever it drops below `low_watermark`.
+    - `prerender` (optional) is called with each QR payload while refilling to warm a cache the
+      print path reads from (the app passes `qr_for_payload`); its result is discarded.
+    - Identities generated for a previous day are discarded at take time (slip numbers carry the date).
+    - Each identity is handed out once per process; cross-terminal uniqueness is still enforced by
+      the UNIQUE constraints on bet_slips.slip_number / qr_payload.
+    - `take` never blocks on the refill: an empty pool falls back to generating inline.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 64,
+        low_watermark: int = 16,
+        prerender: Callable[[str], Any] | None = None,
+    ) -> None:
+        self._batch_size = batch_size
+        self._low_watermark = low_watermark
+        self._prerender = prerender
+        self._ready: deque[SlipIdentity] = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._reserved = 0
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    def take(self) -> SlipIdentity:
+        today = _today()
+        with self._lock:
+            while self._ready and self._ready[0].day != today:
+                self._ready.popleft()
+            identity = self._ready.popleft() if self._ready else None
+            start_refill = len(self._ready) < self._low_watermark and not self._refilling
+            if start_refill:
+                self._refilling = True
+        if start_refill:
+            threading.Thread(target=self._refill, name="slip-identity-refill", daemon=True).start()
+        return identity or new_slip_identity(today)
+
+    def fill(self) -> int:
+        """Tops the pool up to `batch_size` on the calling thread; returns how many were added."""
+        added = 0
+        while True:
+            # Slots are reserved under the lock so the warmup and refill threads never overfill.
+            with self._lock:
+                if len(self._ready) + self._reserved >= self._batch_size:
+                    return added
+                self._reserved += 1
+            try:
+                identity = new_slip_identity()
+                if self._prerender is not None:
+                    self._prerender(identity.qr_payload)
+                with self._lock:
+                    self._ready.append(identity)
+            finally:
+                with self._lock:
+                    self._reserved -= 1
+            added += 1
+
+    def _refill(self) -> None:
+        try:
+            self.fill()
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+_default_pool = SlipIdentityPool()
+
+
+def default_pool() -> SlipIdentityPool:
+    return _default_pool
+
+
+def configure_default_pool(*, batch_size: int = 64, low_watermark: int = 16, prerender: Callable[[str], Any] | None = None) -> SlipIdentityPool:
+    """Replaces the process-wide pool (called once at app start-up) and warms it in the background."""
+    global _default_pool
+    _default_pool = SlipIdentityPool(batch_size=batch_size, low_watermark=low_watermark, prerender=prerender)
+    threading.Thread(target=_default_pool.fill, name="slip-identity-warmup", daemon=True).start()
+    return _default_pool
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Sequence
+
+from cockpit.db.connection import transaction
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.utils.clock import utc_now
+from cockpit.utils.security import PBKDF2_ITERATIONS, hash_password
+
+
+# Below this many users a process pool costs more to start than it saves.
+_MIN_PARALLEL = 4
+# Keeps IN (...) lists under SQLite's default host-parameter limit.
+_IN_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class UserImportRow:
+    username: str
+    password: str
+    full_name: str | None
+    role_names: tuple[str, ...]
+
+
+def _split_roles(value: Any) -> tuple[str, ...]:
+    if isinstance(value, str):
+        parts = value.replace("|", ";").split(";")
+    elif isinstance(value, (list, tuple)):
+        parts = [str(v) for v in value]
+    else:
+        parts = []
+    return tuple(p.strip() for p in parts if p.strip())
+
+
+def _row_from_mapping(raw: dict[str, Any], line: int) -> UserImportRow:
+    username = str(raw.get("username") or "").strip()
+    password = str(raw.get("password") or "")
+    if not username or not password:
+        raise ValidationError(f"Row {line}: username and password are required")
+    full_name = str(raw.get("full_name") or "").strip() or None
+    roles = _split_roles(raw.get("roles", raw.get("role")))
+    if not roles:
+        raise ValidationError(f"Row {line}: at least one role is required")
+    return UserImportRow(username=username, password=password, full_name=full_name, role_names=roles)
+
+
+def parse_users_file(path: Path) -> list[UserImportRow]:
+    """
+    Reads users from CSV (`username,password,full_name,roles`, roles separated by `;`)
+    or JSON (a list of objects with the same keys; `roles` may be a list).
+    """
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, list):
+            raise ValidationError("JSON import must be a list of user objects")
+        rows = [_row_from_mapping(item, i) for i, item in enumerate(data, start=1)]
+    else:
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            rows = [_row_from_mapping(item, i) for i, item in enumerate(csv.DictReader(f), start=2)]
+    seen: set[str] = set()
+    for row in rows:
+        if row.username in seen:
+            raise ValidationError(f"Duplicate username in file: {row.username}")
+        seen.add(row.username)
+    return rows
+
+
+def hash_passwords(passwords: Sequence[str], *, iterations: int = PBKDF2_ITERATIONS, max_workers: int | None = None) -> list[str]:
+    """Hashes on a process pool across all cores (inline for a handful of passwords)."""
+    if len(passwords) < _MIN_PARALLEL:
+        return [hash_password(p, iterations) for p in passwords]
+    workers = min(len(passwords), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords, repeat(iterations), chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _chunks(items: Sequence[str]) -> list[Sequence[str]]:
+    return [items[i:i + _IN_CHUNK] for i in range(0, len(items), _IN_CHUNK)]
+
+
+class UserImportService:
+    """
+    Bulk user provisioning (e.g. temporary cashier/canteen accounts before a derby).
+
+    `import_users` validates with two reads, hashes outside any transaction, then writes
+    users, user_roles and one USER_CREATE audit row per user in a single transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, audit: AuditService) -> None:
+        self._conn = conn
+        self._audit = audit
+
+    def resolve_roles(self, rows: Sequence[UserImportRow]) -> dict[str, int]:
+        names = sorted({name for row in rows for name in row.role_names})
+        role_ids: dict[str, int] = {}
+        for chunk in _chunks(names):
+            sql = "SELECT id, name FROM roles WHERE name IN (%s)" % ",".join("?" for _ in chunk)
+            role_ids.update({r["name"]: int(r["id"]) for r in self._conn.execute(sql, tuple(chunk)).fetchall()})
+        missing = [n for n in names if n not in role_ids]
+        if missing:
+            raise ValidationError(f"Role not found: {', '.join(missing)}")
+        return role_ids
+
+    def validate(self, rows: Sequence[UserImportRow]) -> dict[str, int]:
+        if not rows:
+            raise ValidationError("No users to import")
+        role_ids = self.resolve_roles(rows)
+        existing: list[str] = []
+        for chunk in _chunks([r.username for r in rows]):
+            sql = "SELECT username FROM users WHERE username IN (%s)" % ",".join("?" for _ in chunk)
+            existing.extend(r["username"] for r in self._conn.execute(sql, tuple(chunk)).fetchall())
+        if existing:
+            raise ValidationError(f"Username already exists: {', '.join(sorted(existing))}")
+        return role_ids
+
+    def insert_users(self, *, actor: Actor, rows: Sequence[UserImportRow], password_hashes: Sequence[str]) -> dict[str, int]:
+        """Writes pre-hashed users. Call inside a transaction; returns username -> user id."""
+        if len(rows) != len(password_hashes):
+            raise ValueError("rows and password_hashes must line up")
+        role_ids = self.resolve_roles(rows)
+        now = utc_now().isoformat()
+        self._conn.executemany(
+            """
+            INSERT INTO users(username, password_hash, full_name, is_active, is_frozen, created_at, updated_at)
+            VALUES (?, ?, ?, 1, 0, ?, ?)
+            """,
+            [(row.username, pw_hash, row.full_name, now, now) for row, pw_hash in zip(rows, password_hashes)],
+        )
+        user_ids: dict[str, int] = {}
+        for chunk in _chunks([r.username for r in rows]):
+            sql = "SELECT id, username FROM users WHERE username IN (%s)" % ",".join("?" for _ in chunk)
+            user_ids.update({r["username"]: int(r["id"]) for r in self._conn.execute(sql, tuple(chunk)).fetchall()})
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO user_roles(user_id, role_id) VALUES (?, ?)",
+            [(user_ids[row.username], role_ids[name]) for row in rows for name in row.role_names],
+        )
+        self._audit.log_many(
+            actor=actor,
+            action="USER_CREATE",
+            entity_type="user",
+            entries=[
+                (
+                    str(user_ids[row.username]),
+                    None,
+                    {"id": user_ids[row.username], "username": row.username, "full_name": row.full_name, "roles": list(row.role_names)},
+                )
+                for row in rows
+            ],
+            metadata={"bulk_import": True, "count": len(rows)},
+        )
+        return user_ids
+
+    def import_users(self, *, actor: Actor, rows: Sequence[UserImportRow], iterations: int = PBKDF2_ITERATIONS) -> dict[str, int]:
+        self.validate(rows)
+        hashes = hash_passwords([r.password for r in rows], iterations=iterations)
+        with transaction(self._conn):
+            return self.insert_users(actor=actor, rows=rows, password_hashes=hashes)
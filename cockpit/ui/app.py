@@ -10,14 +10,21 @@ from tkinter import messagebox
 from cockpit.config import get_config
 from cockpit.db.connection import connect, transaction
 from cockpit.db.migrate import initialize_database
+from cockpit.printing.backends import make_backend
+from cockpit.printing.qrcache import qr_for_payload
+from cockpit.printing.spooler import PrintWorker
 from cockpit.services.audit import Actor
 from cockpit.services.auth import AuthService
+from cockpit.services.errors import ValidationError
 from cockpit.services.operations import OperationsService
+from cockpit.services.pits import DEFAULT_PIT_ID, PitService
 from cockpit.services.rbac import RBACService
+from cockpit.services.slip_identity import configure_default_pool
 from cockpit.ui.common import apply_theme
 from cockpit.ui.public_display import PublicDisplayWindow
 from cockpit.ui.setup_admin import SetupAdminWindow
 from cockpit.ui.shell import ShellWindow
+from cockpit.utils.clock import configure_business_day
 from cockpit.utils.device import get_device_id
 
 
@@ -36,6 +43,7 @@ def _bootstrap(conn: sqlite3.Connection) -> None:
 def run_app() -> None:
     args = _parse_args(sys.argv[1:])
     config = get_config()
+    configure_business_day(tz_name=config.venue_timezone, cutoff_hour=config.business_day_cutoff_hour)
     conn = connect(config.db_path)
     _bootstrap(conn)
 
@@ -44,10 +52,26 @@ def run_app() -> None:
     root.geometry("1100x720")
     apply_theme(root)
 
+    print_worker: PrintWorker | None = None
     try:
         if args.viewer:
-            PublicDisplayWindow(root=root, conn=conn).show()
+            try:
+                pit_id = PitService(conn, audit=None).get_by_code(config.pit_code).id
+            except ValidationError as exc:
+                pit_id = DEFAULT_PIT_ID
+                messagebox.showwarning("Unknown pit", f"{exc}. Check pit_code in config.json; showing the main pit until then.")
+            PublicDisplayWindow(
+                root=root,
+                conn=conn,
+                pit_id=pit_id,
+                odds_sample_seconds=config.odds_sample_seconds,
+                odds_bucket_seconds=config.odds_bucket_seconds,
+            ).show()
         else:
+            print_worker = PrintWorker(db_path=config.db_path, device_id=get_device_id(), backend=make_backend(config))
+            print_worker.start()
+            # Slip numbers, QR payloads and QR symbols are prepared off the encode path.
+            configure_default_pool(prerender=qr_for_payload)
             ops = OperationsService(conn)
             auth = AuthService(conn, ops.audit)
             with transaction(conn):
@@ -61,6 +85,8 @@ def run_app() -> None:
         messagebox.showerror("Fatal Error", str(exc))
         raise
     finally:
+        if print_worker is not None:
+            print_worker.stop()
         try:
             conn.close()
         except Exception:
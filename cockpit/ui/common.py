@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import time
 import tkinter as tk
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass
 from tkinter import messagebox
 from tkinter import ttk
+from typing import Any
 
 
 def show_error(parent: tk.Misc, title: str, exc: Exception | str) -> None:
@@ -222,3 +226,283 @@ def apply_theme(root: tk.Misc) -> None:
 
 def palette() -> dict[str, str]:
     return dict(_PALETTE)
+
+
+# fetch_page(after_key, limit) -> [(key, values), ...] in display order, strictly after `after_key`
+# (from the start when it is None). Views implement it as a keyset query: WHERE id < ? ORDER BY id DESC LIMIT ?.
+PageFetcher = Callable[[Any, int], Sequence[tuple[Hashable, Sequence[Any]]]]
+
+
+@dataclass
+class RenderStats:
+    """What redraws cost: Tk item operations (insert/update/move/delete) and wall time."""
+
+    renders: int = 0
+    tk_ops: int = 0
+    last_tk_ops: int = 0
+    last_ms: float = 0.0
+    total_ms: float = 0.0
+
+    def record(self, tk_ops: int, started: float) -> None:
+        elapsed = (time.perf_counter() - started) * 1000.0
+        self.renders += 1
+        self.tk_ops += tk_ops
+        self.last_tk_ops = tk_ops
+        self.last_ms = elapsed
+        self.total_ms += elapsed
+
+
+@dataclass(frozen=True)
+class MergedHead:
+    keys: list[Hashable]
+    rows: list[tuple[Any, ...]]
+    top: int
+    exhausted: bool
+
+
+def merge_refreshed_head(
+    keys: Sequence[Hashable],
+    rows: Sequence[tuple[Any, ...]],
+    fresh: Sequence[tuple[Hashable, Sequence[Any]]],
+    *,
+    want: int,
+    top: int,
+    exhausted: bool,
+) -> MergedHead:
+    """
+    Combines a re-read head (`fresh`, the first `want` rows) with the rows already loaded.
+
+    - A short head is the whole result: it replaces everything and the list is exhausted.
+    - If the head's last key is already loaded, the loaded tail after it is kept, not re-read.
+    - Otherwise the head replaces everything and more pages may follow.
+    The view stays on the row it was showing (`top`) if that row survives; at the top it stays at the top.
+    """
+    new_keys = [k for k, _v in fresh]
+    new_rows = [tuple(v) for _k, v in fresh]
+    anchor = keys[top] if 0 < top < len(keys) else None
+    if len(fresh) < want:
+        exhausted = True
+    elif new_keys[-1] in keys:
+        j = list(keys).index(new_keys[-1]) + 1
+        new_keys += keys[j:]
+        new_rows += rows[j:]
+    else:
+        exhausted = False
+    if anchor is not None and anchor in new_keys:
+        top = new_keys.index(anchor)
+    return MergedHead(new_keys, new_rows, top, exhausted)
+
+
+# <End> loads at most this many further pages per press, so it never pulls a whole table into memory.
+_END_MAX_PAGES = 10
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    A Treeview that only materialises the rows in view.
+
+    - Rows are kept as Python tuples; the Tk widget holds just the visible window, so the cost of a
+      redraw depends on the window height, not on how many rows have been loaded.
+    - With `fetch_page`, pages are pulled by keyset as the view approaches the end of what is loaded.
+      Without it, rows are pushed with `extend` and keyed by position.
+    - `refresh()` re-reads from the first row through the visible window and applies a keyed diff:
+      unchanged rows are not touched, changed rows are updated in place, and the view stays on the
+      row it was showing unless it was already at the top.
+    - `<End>` goes to the last loaded row after loading at most `_END_MAX_PAGES` more pages, so a
+      long table is walked a bounded step per press instead of read whole.
+    - Emits `<<VirtualSelect>>` when the selected key changes; read it with `selected_key()`.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Misc,
+        *,
+        columns: Sequence[tuple[str, str, int]],
+        fetch_page: PageFetcher | None = None,
+        page_size: int = 200,
+        height: int = 18,
+    ) -> None:
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._keys: list[Hashable] = []
+        self._rows: list[tuple[Any, ...]] = []
+        self._exhausted = fetch_page is None
+        self._top = 0
+        self._visible = height
+        self._selected: Hashable | None = None
+        self._shown: dict[str, tuple[Any, ...]] = {}
+        self._iid_keys: dict[str, Hashable] = {}
+        self.render_stats = RenderStats()
+
+        self.tree = ttk.Treeview(self, columns=[c for c, _t, _w in columns], show="headings", height=height, selectmode="browse")
+        for col, title, width in columns:
+            self.tree.heading(col, text=title)
+            self.tree.column(col, width=width, anchor="center")
+        self._scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self._scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1, "units", 3))
+        self.tree.bind("<Button-4>", lambda _e: self._scroll_by(-1, "units", 3))
+        self.tree.bind("<Button-5>", lambda _e: self._scroll_by(1, "units", 3))
+        self.tree.bind("<Up>", lambda _e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda _e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda _e: self._move_selection(-self._visible))
+        self.tree.bind("<Next>", lambda _e: self._move_selection(self._visible))
+        self.tree.bind("<Home>", lambda _e: self._select_index(0))
+        self.tree.bind("<End>", lambda _e: self._select_last_loaded())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def selected_key(self) -> Hashable | None:
+        return self._selected
+
+    def reload(self) -> None:
+        """Drops everything loaded and starts again from the first page."""
+        self._keys, self._rows = [], []
+        self._exhausted = self._fetch_page is None
+        self._top = 0
+        self._ensure_loaded(self._visible * 2)
+        self._render()
+
+    def refresh(self) -> None:
+        if self._fetch_page is None:
+            self._render()
+            return
+        want = max(self._page_size, self._top + self._visible)
+        merged = merge_refreshed_head(
+            self._keys, self._rows, list(self._fetch_page(None, want)), want=want, top=self._top, exhausted=self._exhausted
+        )
+        self._keys, self._rows, self._exhausted = merged.keys, merged.rows, merged.exhausted
+        self._scroll_to(merged.top)
+
+    def extend(self, rows: Sequence[Sequence[Any]]) -> None:
+        """Appends pushed rows (views without `fetch_page`)."""
+        start = len(self._keys)
+        self._keys.extend(range(start, start + len(rows)))
+        self._rows.extend(tuple(r) for r in rows)
+        if start < self._top + self._visible:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def clear(self) -> None:
+        self._keys, self._rows = [], []
+        self._top = 0
+        self._selected = None
+        self._render()
+
+    def _ensure_loaded(self, count: int) -> None:
+        while not self._exhausted and len(self._keys) < count:
+            assert self._fetch_page is not None
+            page = list(self._fetch_page(self._keys[-1] if self._keys else None, self._page_size))
+            self._keys.extend(k for k, _v in page)
+            self._rows.extend(tuple(v) for _k, v in page)
+            if len(page) < self._page_size:
+                self._exhausted = True
+
+    def _select_last_loaded(self) -> str:
+        self._ensure_loaded(len(self._keys) + self._page_size * _END_MAX_PAGES)
+        return self._select_index(len(self._keys) - 1)
+
+    def _scroll_to(self, top: int) -> None:
+        self._ensure_loaded(top + self._visible * 2)
+        self._top = max(0, min(top, len(self._keys) - self._visible))
+        self._render()
+
+    def _scroll_by(self, amount: int, what: str, step: int = 1) -> str:
+        self._scroll_to(self._top + amount * (self._visible if what == "pages" else step))
+        return "break"
+
+    def _yview(self, *args: str) -> None:
+        if args and args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._keys)))
+        elif args and args[0] == "scroll":
+            self._scroll_by(int(args[1]), args[2])
+
+    def _on_configure(self, event: tk.Event) -> None:
+        row_height = int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+        # One row's worth of height is taken by the headings.
+        visible = max(1, event.height // row_height - 1)
+        if visible != self._visible:
+            self._visible = visible
+            self._scroll_to(self._top)
+
+    def _on_tree_select(self, _event: tk.Event) -> None:
+        sel = self.tree.selection()
+        key = self._iid_keys.get(sel[0]) if sel else None
+        if key is not None and key != self._selected:
+            self._selected = key
+            self.event_generate("<<VirtualSelect>>")
+
+    def _select_index(self, index: int) -> str:
+        self._ensure_loaded(index + 1)
+        if not self._keys:
+            return "break"
+        index = max(0, min(index, len(self._keys) - 1))
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._visible:
+            self._top = index - self._visible + 1
+        if self._keys[index] != self._selected:
+            self._selected = self._keys[index]
+            self.event_generate("<<VirtualSelect>>")
+        self._scroll_to(self._top)
+        return "break"
+
+    def _move_selection(self, delta: int) -> str:
+        if self._selected in self._iid_keys.values():
+            current = self._top + self.tree.index(self._iid(self._selected))
+        else:
+            current = self._top - (1 if delta > 0 else 0)
+        return self._select_index(current + delta)
+
+    @staticmethod
+    def _iid(key: Hashable) -> str:
+        return str(key)
+
+    def _render(self) -> None:
+        started = time.perf_counter()
+        ops = 0
+        tree = self.tree
+        end = min(self._top + self._visible, len(self._keys))
+        wanted = [(self._iid(self._keys[i]), self._keys[i], self._rows[i]) for i in range(self._top, end)]
+        wanted_iids = {iid for iid, _k, _v in wanted}
+        stale = [iid for iid in tree.get_children() if iid not in wanted_iids]
+        if stale:
+            tree.delete(*stale)
+            ops += len(stale)
+            for iid in stale:
+                self._shown.pop(iid, None)
+                self._iid_keys.pop(iid, None)
+        for pos, (iid, key, values) in enumerate(wanted):
+            shown = self._shown.get(iid)
+            if shown is None:
+                tree.insert("", pos, iid=iid, values=values)
+                ops += 1
+            else:
+                if tree.index(iid) != pos:
+                    tree.move(iid, "", pos)
+                    ops += 1
+                if shown != values:
+                    tree.item(iid, values=values)
+                    ops += 1
+            self._shown[iid] = values
+            self._iid_keys[iid] = key
+        if self._selected is not None:
+            iid = self._iid(self._selected)
+            if iid in wanted_iids and tree.selection() != (iid,):
+                tree.selection_set(iid)
+        self._update_scrollbar()
+        self.render_stats.record(ops, started)
+
+    def _update_scrollbar(self) -> None:
+        total = len(self._keys)
+        if total == 0:
+            self._scrollbar.set(0.0, 1.0)
+            return
+        self._scrollbar.set(self._top / total, min(1.0, (self._top + self._visible) / total))
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import sqlite3
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import messagebox
 from tkinter import ttk
 
 from cockpit.db.connection import transaction
 from cockpit.services.audit import Actor
-from cockpit.services.auth import AuthService
+from cockpit.config import get_config
+from cockpit.services.auth import AuthService, Credentials, check_password
 from cockpit.services.operations import OperationsService
 from cockpit.services.rbac import RBACService
 from cockpit.ui.main_window import MainWindow
@@ -15,6 +17,10 @@ from cockpit.ui.common import palette
 from cockpit.utils.device import get_device_id
 
 
+# PBKDF2 releases the GIL, so a worker thread keeps the Tk loop responsive while a password is checked.
+_PASSWORD_CHECKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-check")
+
+
 class LoginWindow:
     def __init__(self, *, root: tk.Tk, conn: sqlite3.Connection) -> None:
         self._root = root
@@ -26,6 +32,10 @@ class LoginWindow:
         self._shell = tk.Frame(self._frame, bg=bg)
         self._username = tk.StringVar()
         self._password = tk.StringVar()
+        self._status = tk.StringVar()
+        self._login_btn: ttk.Button | None = None
+        self._pending: tuple[Credentials, Future] | None = None
+        self._password_iterations = get_config().password_iterations
 
     def show(self) -> None:
         self._root.protocol("WM_DELETE_WINDOW", self._root.destroy)
@@ -49,7 +59,9 @@ class LoginWindow:
         pw_entry = ttk.Entry(card, textvariable=self._password, show="*", width=34)
         pw_entry.grid(row=5, column=0, columnspan=2, sticky="we", padx=18, pady=(0, 16))
 
-        ttk.Button(card, text="Login", style="Primary.TButton", command=self._login).grid(row=6, column=0, columnspan=2, sticky="we", padx=18, pady=(0, 18))
+        self._login_btn = ttk.Button(card, text="Login", style="Primary.TButton", command=self._login)
+        self._login_btn.grid(row=6, column=0, columnspan=2, sticky="we", padx=18, pady=(0, 6))
+        ttk.Label(card, textvariable=self._status, style="Muted.TLabel").grid(row=7, column=0, columnspan=2, sticky="w", padx=18, pady=(0, 12))
 
         card.columnconfigure(0, weight=1)
         card.columnconfigure(1, weight=1)
@@ -57,15 +69,44 @@ class LoginWindow:
         self._root.bind("<Return>", lambda _e: self._login())
 
     def _login(self) -> None:
-        ops = OperationsService(self._conn)
-        auth = AuthService(self._conn, ops.audit)
+        if self._pending is not None:
+            return
+        auth = AuthService(self._conn, OperationsService(self._conn).audit, password_iterations=self._password_iterations)
+        try:
+            credentials = auth.fetch_credentials(self._username.get().strip())
+        except Exception as exc:
+            messagebox.showerror("Login Failed", str(exc), parent=self._root)
+            return
+        # Only the session insert takes the write lock; the hash check runs off the Tk thread first.
+        future = _PASSWORD_CHECKER.submit(check_password, credentials, self._password.get(), iterations=self._password_iterations)
+        self._pending = (credentials, future)
+        self._status.set("Checking password…")
+        if self._login_btn is not None:
+            self._login_btn.state(["disabled"])
+        self._root.after(20, self._poll_login)
+
+    def _poll_login(self) -> None:
+        if self._pending is None:
+            return
+        credentials, future = self._pending
+        if not future.done():
+            self._root.after(20, self._poll_login)
+            return
+        self._pending = None
+        self._status.set("")
+        if self._login_btn is not None:
+            self._login_btn.state(["!disabled"])
+
+        auth = AuthService(self._conn, OperationsService(self._conn).audit, password_iterations=self._password_iterations)
         try:
+            new_hash = future.result()
             with transaction(self._conn):
-                user, session_id = auth.login(username=self._username.get().strip(), password=self._password.get(), device_id=self._device_id)
-            perms = RBACService(self._conn).user_permissions(user.id)
+                session_id = auth.start_session(credentials=credentials, device_id=self._device_id, new_password_hash=new_hash)
+            perms = RBACService(self._conn).user_permissions(credentials.user.id)
         except Exception as exc:
             messagebox.showerror("Login Failed", str(exc), parent=self._root)
             return
 
+        self._root.unbind("<Return>")
         self._frame.destroy()
-        MainWindow(root=self._root, conn=self._conn, user=user, session_id=session_id, device_id=self._device_id, permissions=perms).show()
+        MainWindow(root=self._root, conn=self._conn, user=credentials.user, session_id=session_id, device_id=self._device_id, permissions=perms).show()
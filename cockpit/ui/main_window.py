@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import sqlite3
 import tkinter as tk
+from collections.abc import Set
 from tkinter import ttk
 
+from cockpit.config import get_config
 from cockpit.db.connection import transaction
 from cockpit.services.audit import Actor
 from cockpit.services.auth import AuthService, User
+from cockpit.services.errors import ValidationError
 from cockpit.services.operations import OperationsService
+from cockpit.services.pits import DEFAULT_PIT_ID, PitService
+from cockpit.services.rbac import RBACService
+from cockpit.ui.common import show_error
 from cockpit.ui.views.admin_users import AdminUsersView
 from cockpit.ui.views.audit_log import AuditLogView
 from cockpit.ui.views.canteen import CanteenView
@@ -28,18 +34,28 @@ class MainWindow:
         user: User,
         session_id: int,
         device_id: str,
-        permissions: set[str],
+        permissions: Set[str],
     ) -> None:
         self._root = root
         self._conn = conn
         self._user = user
         self._session_id = session_id
         self._device_id = device_id
-        self._perms = permissions
+        # Mutable so open views holding a reference see permission changes.
+        self._perms: set[str] = set(permissions)
+        self._rbac = RBACService(conn)
 
         self._ops = OperationsService(conn)
         self._auth = AuthService(conn, self._ops.audit)
         self._actor = Actor(user_id=user.id, device_id=device_id)
+        # Each terminal encodes and registers matches for one pit (config `pit_code`).
+        pits = PitService(conn, self._ops.audit)
+        self._pit_warning: str | None = None
+        try:
+            self._pit = pits.get_by_code(get_config().pit_code)
+        except ValidationError as exc:
+            self._pit = pits.get(DEFAULT_PIT_ID)
+            self._pit_warning = f"{exc}. Check pit_code in config.json; this terminal uses {self._pit.name} until then."
 
         bg = root.cget("bg")
         self._frame = tk.Frame(root, bg=bg)
@@ -47,7 +63,11 @@ class MainWindow:
         self._content = tk.Frame(self._frame, padx=18, pady=18, bg=bg)
         self._active_view: tk.Widget | None = None
         self._nav_buttons: list[ttk.Button] = []
+        self._nav_frame: tk.Frame | None = None
+        self._nav_by_label: dict[str, tuple[ttk.Button, object]] = {}
+        self._active_nav: str | None = None
         self._heartbeat_after_id: str | None = None
+        self._rbac_after_id: str | None = None
 
     def show(self) -> None:
         self._root.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -56,49 +76,97 @@ class MainWindow:
         self._content.pack(side="right", fill="both", expand=True)
 
         ttk.Label(self._sidebar, text=f"User: {self._user.username}", style="SidebarUser.TLabel").pack(anchor="w")
+        ttk.Label(self._sidebar, text=f"Pit: {self._pit.name}", style="TLabel").pack(anchor="w")
         ttk.Label(self._sidebar, text=" ", style="TLabel").pack()
-
-        def add_nav(label: str, perm: str, factory) -> None:
-            if perm in self._perms:
-                btn = ttk.Button(self._sidebar, text=label, style="Nav.TButton", command=lambda: self._activate_and_show(btn, factory))
-                btn.pack(fill="x", pady=5)
-                self._nav_buttons.append(btn)
-
-        add_nav("Dashboard", "VIEW_DASHBOARD", lambda parent: DashboardView(parent=parent, conn=self._conn))
-        add_nav(
-            "Fight Registry",
-            "FIGHT_REGISTER",
-            lambda parent: FightRegistryView(parent=parent, conn=self._conn, actor=self._actor, permissions=self._perms),
-        )
-        add_nav("Fight Structures", "ADMIN_ALL", lambda parent: FightStructuresView(parent=parent, conn=self._conn, actor=self._actor))
-        add_nav("Cashiering / Betting", "BET_ENCODE", lambda parent: CashieringView(parent=parent, conn=self._conn, actor=self._actor, user_id=self._user.id, device_id=self._device_id))
-        add_nav("Canteen", "CANTEEN_POS", lambda parent: CanteenView(parent=parent, conn=self._conn, actor=self._actor, user_id=self._user.id))
-        add_nav("Roles & Permissions", "ROLE_MANAGE", lambda parent: RoleManagementView(parent=parent, conn=self._conn, actor=self._actor))
-        add_nav("Reports", "VIEW_REPORTS", lambda parent: ReportsView(parent=parent, conn=self._conn))
-        add_nav("Audit Log", "VIEW_AUDIT_LOG", lambda parent: AuditLogView(parent=parent, conn=self._conn))
-        add_nav("User Management", "USER_MANAGE", lambda parent: AdminUsersView(parent=parent, conn=self._conn, actor=self._actor))
+        self._nav_frame = tk.Frame(self._sidebar, bg=self._sidebar.cget("bg"))
+        self._nav_frame.pack(fill="x")
 
         ttk.Separator(self._sidebar).pack(fill="x", pady=14)
         ttk.Button(self._sidebar, text="Logout", style="Secondary.TButton", command=self._logout).pack(fill="x")
 
-        if "VIEW_DASHBOARD" in self._perms:
-            self._activate_and_show(self._nav_buttons[0] if self._nav_buttons else None, lambda parent: DashboardView(parent=parent, conn=self._conn))
-        elif "FIGHT_REGISTER" in self._perms:
-            self._activate_and_show(self._nav_buttons[0] if self._nav_buttons else None, lambda parent: FightRegistryView(parent=parent, conn=self._conn, actor=self._actor, permissions=self._perms))
-        elif "BET_ENCODE" in self._perms:
-            self._activate_and_show(
-                self._nav_buttons[0] if self._nav_buttons else None,
-                lambda parent: CashieringView(parent=parent, conn=self._conn, actor=self._actor, user_id=self._user.id, device_id=self._device_id),
-            )
+        self._build_nav()
+        self._show_default_view()
         self._schedule_heartbeat()
+        self._rbac.sync()
+        self._schedule_rbac_sync()
+        if self._pit_warning is not None:
+            show_error(self._root, "Unknown pit", self._pit_warning)
+
+    def _nav_items(self) -> list[tuple[str, str, object]]:
+        return [
+            ("Dashboard", "VIEW_DASHBOARD", lambda parent: DashboardView(parent=parent, conn=self._conn)),
+            (
+                "Fight Registry",
+                "FIGHT_REGISTER",
+                lambda parent: FightRegistryView(parent=parent, conn=self._conn, actor=self._actor, permissions=self._perms, pit_id=self._pit.id),
+            ),
+            ("Fight Structures", "ADMIN_ALL", lambda parent: FightStructuresView(parent=parent, conn=self._conn, actor=self._actor)),
+            ("Cashiering / Betting", "BET_ENCODE", lambda parent: CashieringView(parent=parent, conn=self._conn, actor=self._actor, user_id=self._user.id, device_id=self._device_id, pit_id=self._pit.id)),
+            ("Canteen", "CANTEEN_POS", lambda parent: CanteenView(parent=parent, conn=self._conn, actor=self._actor, user_id=self._user.id)),
+            ("Roles & Permissions", "ROLE_MANAGE", lambda parent: RoleManagementView(parent=parent, conn=self._conn, actor=self._actor)),
+            ("Reports", "VIEW_REPORTS", lambda parent: ReportsView(parent=parent, conn=self._conn)),
+            ("Audit Log", "VIEW_AUDIT_LOG", lambda parent: AuditLogView(parent=parent, conn=self._conn)),
+            ("User Management", "USER_MANAGE", lambda parent: AdminUsersView(parent=parent, conn=self._conn, actor=self._actor)),
+        ]
+
+    def _build_nav(self) -> None:
+        assert self._nav_frame is not None
+        for child in self._nav_frame.winfo_children():
+            child.destroy()
+        self._nav_buttons = []
+        self._nav_by_label = {}
+        for label, perm, factory in self._nav_items():
+            if perm not in self._perms:
+                continue
+            btn = ttk.Button(self._nav_frame, text=label, style="Nav.TButton")
+            btn.configure(command=lambda b=btn, lbl=label, f=factory: self._activate_and_show(b, f, lbl))
+            btn.pack(fill="x", pady=5)
+            self._nav_buttons.append(btn)
+            self._nav_by_label[label] = (btn, factory)
+            if label == self._active_nav:
+                btn.configure(style="NavActive.TButton")
+
+    def _show_default_view(self) -> None:
+        for label in ("Dashboard", "Fight Registry", "Cashiering / Betting"):
+            if label in self._nav_by_label:
+                btn, factory = self._nav_by_label[label]
+                self._activate_and_show(btn, factory, label)
+                return
+        self._clear_view()
+
+    def _schedule_rbac_sync(self) -> None:
+        try:
+            if self._rbac.sync():
+                perms = self._rbac.user_permissions(self._user.id)
+                if perms != self._perms:
+                    self._perms.clear()
+                    self._perms.update(perms)
+                    self._build_nav()
+                    # Views build their controls from the permission set, so rebuild the open one too.
+                    if self._active_nav in self._nav_by_label:
+                        btn, factory = self._nav_by_label[self._active_nav]
+                        self._activate_and_show(btn, factory, self._active_nav)
+                    else:
+                        self._show_default_view()
+        except Exception:
+            pass
+        try:
+            self._rbac_after_id = self._root.after(1000, self._schedule_rbac_sync)
+        except Exception:
+            self._rbac_after_id = None
+
+    def _cancel_timers(self) -> None:
+        for attr in ("_heartbeat_after_id", "_rbac_after_id"):
+            after_id = getattr(self, attr)
+            if after_id is not None:
+                try:
+                    self._root.after_cancel(after_id)
+                except Exception:
+                    pass
+                setattr(self, attr, None)
 
     def _on_close(self) -> None:
-        if self._heartbeat_after_id is not None:
-            try:
-                self._root.after_cancel(self._heartbeat_after_id)
-            except Exception:
-                pass
-            self._heartbeat_after_id = None
+        self._cancel_timers()
         try:
             with transaction(self._conn):
                 self._auth.logout(actor=self._actor, session_id=self._session_id)
@@ -116,13 +184,20 @@ class MainWindow:
         except Exception:
             self._heartbeat_after_id = None
 
-    def _activate_and_show(self, btn: ttk.Button | None, factory) -> None:
+    def _activate_and_show(self, btn: ttk.Button | None, factory, label: str | None = None) -> None:
         for b in self._nav_buttons:
             b.configure(style="Nav.TButton")
         if btn is not None:
             btn.configure(style="NavActive.TButton")
+        self._active_nav = label
         self._show(factory)
 
+    def _clear_view(self) -> None:
+        if self._active_view is not None:
+            self._active_view.destroy()
+            self._active_view = None
+        self._active_nav = None
+
     def _show(self, factory) -> None:
         if self._active_view is not None:
             self._active_view.destroy()
@@ -131,12 +206,7 @@ class MainWindow:
         self._active_view.pack(fill="both", expand=True)
 
     def _logout(self) -> None:
-        if self._heartbeat_after_id is not None:
-            try:
-                self._root.after_cancel(self._heartbeat_after_id)
-            except Exception:
-                pass
-            self._heartbeat_after_id = None
+        self._cancel_timers()
         with transaction(self._conn):
             self._auth.logout(actor=self._actor, session_id=self._session_id)
         self._frame.destroy()
@@ -2,20 +2,96 @@ from __future__ import annotations
 
 import sqlite3
 import tkinter as tk
+from collections import deque
 
-from cockpit.services.betting import BettingService
+from cockpit.db.connection import ChangeFeed
+from cockpit.display.payload import build_display_payload
+from cockpit.services.odds_history import OddsPoint, OddsRecorder
+from cockpit.services.pits import DEFAULT_PIT_ID
+
+
+_WALA_COLOR = "#4DA3FF"
+_MERON_COLOR = "#FF6B8B"
+
+
+class _PoolSparkline(tk.Canvas):
+    """
+    WALA/MERON share of the pool over time, drawn one segment per new point.
+
+    Once `capacity` points are shown, the oldest segment is deleted and the rest shift left by
+    one step; only `reset` (a new match) redraws everything.
+    """
+
+    def __init__(self, parent: tk.Misc, *, capacity: int, width: int = 900, height: int = 120) -> None:
+        super().__init__(parent, width=width, height=height, bg="black", highlightthickness=0)
+        self._capacity = max(2, capacity)
+        self._width = width
+        self._height = height
+        self._step = width / (self._capacity - 1)
+        self._points: deque[OddsPoint] = deque()
+        self._segments: deque[tuple[int, ...]] = deque()
+        self.create_line(0, height / 2, width, height / 2, fill="#444444", dash=(4, 4))
+
+    def _y(self, share: float) -> float:
+        pad = 6
+        return pad + (1.0 - share) * (self._height - 2 * pad)
+
+    def reset(self, points: list[OddsPoint]) -> None:
+        self.delete("segment")
+        self._points.clear()
+        self._segments.clear()
+        for point in points[-self._capacity:]:
+            self.append(point)
+
+    def append(self, point: OddsPoint) -> None:
+        if len(self._points) == self._capacity:
+            self._points.popleft()
+            for item in self._segments.popleft():
+                self.delete(item)
+            # The segment into the new first point started at the dropped one.
+            for item in self._segments[0]:
+                self.delete(item)
+            self._segments[0] = ()
+            self.move("segment", -self._step, 0)
+        items: tuple[int, ...] = ()
+        prev = self._points[-1] if self._points else None
+        if prev is not None and prev.wala_share is not None and point.wala_share is not None:
+            x0 = (len(self._points) - 1) * self._step
+            x1 = x0 + self._step
+            items = (
+                self.create_line(x0, self._y(prev.wala_share), x1, self._y(point.wala_share), fill=_WALA_COLOR, width=3, tags="segment"),
+                self.create_line(x0, self._y(1 - prev.wala_share), x1, self._y(1 - point.wala_share), fill=_MERON_COLOR, width=3, tags="segment"),
+            )
+        self._points.append(point)
+        self._segments.append(items)
 
 
 class PublicDisplayWindow:
-    def __init__(self, *, root: tk.Tk, conn: sqlite3.Connection) -> None:
+    """Single-screen Tk display; for several TVs use `python -m cockpit.cli display-server` instead."""
+
+    def __init__(
+        self,
+        *,
+        root: tk.Tk,
+        conn: sqlite3.Connection,
+        pit_id: int = DEFAULT_PIT_ID,
+        odds_sample_seconds: float = 5.0,
+        odds_bucket_seconds: int = 30,
+    ) -> None:
         self._root = root
         self._conn = conn
-        self._betting = BettingService(conn, audit=None)
+        self._pit_id = pit_id
+        self._feed = ChangeFeed(conn)
+        self._recorder = OddsRecorder(conn, pit_id=pit_id, bucket_seconds=odds_bucket_seconds)
+        self._sample_ms = max(250, int(odds_sample_seconds * 1000))
+        self._chart_match_id: int | None = None
 
         self._frame = tk.Frame(root, padx=18, pady=18, bg="black")
         self._title = tk.Label(self._frame, text="PUBLIC DISPLAY", fg="white", bg="black", font=("Segoe UI", 24, "bold"))
         self._active = tk.Label(self._frame, text="", fg="white", bg="black", font=("Segoe UI", 20, "bold"))
         self._odds = tk.Label(self._frame, text="", fg="white", bg="black", font=("Consolas", 16))
+        self._chart_title = tk.Label(self._frame, text="POOL SHARE  (WALA blue / MERON red)", fg="#AAAAAA", bg="black", font=("Segoe UI", 12))
+        self._chart = _PoolSparkline(self._frame, capacity=120)
         self._history = tk.Text(self._frame, height=12, width=80, bg="black", fg="white", font=("Consolas", 14), bd=0)
 
     def show(self) -> None:
@@ -25,66 +101,56 @@ class PublicDisplayWindow:
         self._title.pack(anchor="w", pady=(0, 18))
         self._active.pack(anchor="w", pady=(0, 10))
         self._odds.pack(anchor="w", pady=(0, 14))
+        self._chart_title.pack(anchor="w")
+        self._chart.pack(anchor="w", pady=(0, 14))
         self._history.pack(fill="both", expand=True)
         self._history.configure(state="disabled")
         self._frame.bind_all("<Escape>", lambda _e: self._root.destroy())
         self._refresh()
+        self._sample_odds()
+
+    def _sample_odds(self) -> None:
+        try:
+            point = self._recorder.sample()
+            if self._recorder.match_id != self._chart_match_id:
+                self._chart_match_id = self._recorder.match_id
+                self._chart.reset(self._recorder.points())
+            elif point is not None:
+                self._chart.append(point)
+        finally:
+            self._root.after(self._sample_ms, self._sample_odds)
 
     def _refresh(self) -> None:
-        match = self._conn.execute(
-            """
-            SELECT id, match_number, COALESCE(fight_number, id) AS fight_number, state
-            FROM fight_matches
-            WHERE state IN ('LOCKED','ACTIVE','DRAFT')
-            ORDER BY id DESC
-            LIMIT 1
-            """
-        ).fetchone()
+        if self._feed.poll():
+            self._render(build_display_payload(self._conn, pit_id=self._pit_id))
+        self._root.after(250, self._refresh)
 
+    def _render(self, payload: dict) -> None:
+        match, odds = payload["match"], payload["odds"]
+        pit = payload["pit"]
+        self._title.configure(text=f"PUBLIC DISPLAY  —  {pit['name'].upper()}" if pit else "PUBLIC DISPLAY")
         if match is None:
             self._active.configure(text="No active matches")
             self._odds.configure(text="")
         else:
-            entries = self._conn.execute(
-                """
-                SELECT side, entry_name
-                FROM fight_entries
-                WHERE match_id = ? AND deleted_at IS NULL
-                ORDER BY side, id
-                """,
-                (int(match["id"]),),
-            ).fetchall()
-            wala = ", ".join([e["entry_name"] for e in entries if e["side"] == "WALA"]) or "-"
-            meron = ", ".join([e["entry_name"] for e in entries if e["side"] == "MERON"]) or "-"
-            odds = self._betting.get_odds(int(match["id"]))
-            self._active.configure(text=f"Match {match['match_number']}  |  Fight {match['fight_number']}  |  {wala} vs {meron}  |  State: {match['state']}")
+            self._active.configure(
+                text=f"Match {match['match_number']}  |  Fight {match['fight_number']}  |  {match['wala']} vs {match['meron']}  |  State: {match['state']}"
+            )
             self._odds.configure(
                 text=(
-                    f"WALA ₱{odds.total_wala:<6}  "
-                    f"MERON ₱{odds.total_meron:<6}  "
-                    f"DRAW ₱{odds.total_draw:<6}  "
-                    f"TOTAL ₱{odds.total_all:<6}\n"
-                    f"WALA MULT: {odds.wala_multiplier or 0:.2f}   "
-                    f"MERON MULT: {odds.meron_multiplier or 0:.2f}   "
-                    f"DRAW MULT: 5.00"
+                    f"WALA ₱{odds['total_wala']:<6}  "
+                    f"MERON ₱{odds['total_meron']:<6}  "
+                    f"DRAW ₱{odds['total_draw']:<6}  "
+                    f"TOTAL ₱{odds['total_all']:<6}\n"
+                    f"WALA MULT: {odds['wala_multiplier']:.2f}   "
+                    f"MERON MULT: {odds['meron_multiplier']:.2f}   "
+                    f"DRAW MULT: {odds['draw_multiplier']:.2f}"
                 )
             )
 
-        rows = self._conn.execute(
-            """
-            SELECT fm.match_number, fr.result_type, fr.decided_at
-            FROM fight_results fr
-            JOIN fight_matches fm ON fm.id = fr.match_id
-            ORDER BY fr.decided_at DESC
-            LIMIT 10
-            """
-        ).fetchall()
         self._history.configure(state="normal")
         self._history.delete("1.0", "end")
         self._history.insert("end", "RECENT MATCH HISTORY\n\n")
-        for r in rows:
+        for r in payload["history"]:
             self._history.insert("end", f"{r['decided_at']}  |  Match {r['match_number']}  |  Result: {r['result_type']}\n")
         self._history.configure(state="disabled")
-
-        self._root.after(1000, self._refresh)
-
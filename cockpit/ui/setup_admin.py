@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
 
+from cockpit.config import get_config
 from cockpit.db.connection import transaction
 from cockpit.services.audit import Actor
 from cockpit.services.auth import AuthService
@@ -73,7 +74,7 @@ class SetupAdminWindow:
             return
 
         actor = Actor(user_id=None, device_id=self._device_id)
-        auth = AuthService(self._ops._conn, self._ops.audit)
+        auth = AuthService(self._ops._conn, self._ops.audit, password_iterations=get_config().password_iterations)
         with transaction(self._ops._conn):
             auth.create_user(actor=actor, username=username, password=password, full_name=full_name, role_names=["Admin"])
         messagebox.showinfo("Setup", "Admin user created. Restarting to login screen.", parent=self._root)
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import sqlite3
 import tkinter as tk
-from tkinter import ttk
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from tkinter import filedialog, messagebox, ttk
 
+from cockpit.config import get_config
 from cockpit.db.connection import transaction
 from cockpit.services.audit import Actor
 from cockpit.services.audit import AuditService
 from cockpit.services.auth import AuthService
 from cockpit.services.rbac import RBACService
+from cockpit.services.user_import import UserImportRow, UserImportService, hash_passwords, parse_users_file
 from cockpit.ui.common import ask_text, show_error
 
 
@@ -19,21 +23,26 @@ class AdminUsersView(tk.Frame):
         self._conn = conn
         self._actor = actor
         self._audit = AuditService(conn)
-        self._auth = AuthService(conn, self._audit)
+        self._auth = AuthService(conn, self._audit, password_iterations=get_config().password_iterations)
         self._rbac = RBACService(conn)
+        self._importer = UserImportService(conn, self._audit)
+        self._import_job: tuple[list[UserImportRow], Future] | None = None
+        self._import_status = tk.StringVar()
 
         ttk.Label(self, text="User Management", style="ViewTitle.TLabel").grid(row=0, column=0, columnspan=3, sticky="w", pady=(0, 12))
         ttk.Button(self, text="Create User", style="Primary.TButton", command=self._create_user).grid(row=1, column=0, sticky="w")
         ttk.Button(self, text="Freeze/Unfreeze", style="Secondary.TButton", command=self._toggle_freeze).grid(row=1, column=1, sticky="w", padx=(10, 0))
         ttk.Button(self, text="Set Roles", style="Secondary.TButton", command=self._set_roles).grid(row=1, column=2, sticky="w", padx=(10, 0))
+        ttk.Button(self, text="Import Users…", style="Secondary.TButton", command=self._import_users).grid(row=1, column=3, sticky="w", padx=(10, 0))
+        ttk.Label(self, textvariable=self._import_status, style="Muted.TLabel").grid(row=1, column=4, sticky="w", padx=(10, 0))
 
         self._tree = ttk.Treeview(self, columns=("username", "full_name", "frozen"), show="headings", height=14)
         for col, title, w in (("username", "Username", 160), ("full_name", "Full Name", 240), ("frozen", "Frozen", 80)):
             self._tree.heading(col, text=title)
             self._tree.column(col, width=w, anchor="center")
-        self._tree.grid(row=2, column=0, columnspan=3, sticky="nsew", pady=(10, 0))
+        self._tree.grid(row=2, column=0, columnspan=5, sticky="nsew", pady=(10, 0))
         self.rowconfigure(2, weight=1)
-        self.columnconfigure(2, weight=1)
+        self.columnconfigure(4, weight=1)
 
         self._refresh()
 
@@ -70,6 +79,46 @@ class AdminUsersView(tk.Frame):
         except Exception as exc:
             show_error(self, "Create User", exc)
 
+    def _import_users(self) -> None:
+        if self._import_job is not None:
+            return
+        path = filedialog.askopenfilename(
+            parent=self, title="Import Users", filetypes=[("CSV or JSON", "*.csv *.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            rows = parse_users_file(Path(path))
+            self._importer.validate(rows)
+        except Exception as exc:
+            show_error(self, "Import Users", exc)
+            return
+        # Hashing fans out to a process pool; the Tk loop only polls for the result.
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-import")
+        future = executor.submit(hash_passwords, [r.password for r in rows], iterations=self._auth.password_iterations)
+        executor.shutdown(wait=False)
+        self._import_job = (rows, future)
+        self._import_status.set(f"Hashing {len(rows)} passwords…")
+        self.after(100, self._poll_import)
+
+    def _poll_import(self) -> None:
+        if self._import_job is None:
+            return
+        rows, future = self._import_job
+        if not future.done():
+            self.after(100, self._poll_import)
+            return
+        self._import_job = None
+        self._import_status.set("")
+        try:
+            hashes = future.result()
+            with transaction(self._conn):
+                user_ids = self._importer.insert_users(actor=self._actor, rows=rows, password_hashes=hashes)
+            self._refresh()
+            messagebox.showinfo("Import Users", f"Imported {len(user_ids)} users.", parent=self)
+        except Exception as exc:
+            show_error(self, "Import Users", exc)
+
     def _toggle_freeze(self) -> None:
         user_id = self._selected_user_id()
         if user_id is None:
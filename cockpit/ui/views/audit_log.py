@@ -4,7 +4,8 @@ import sqlite3
 import tkinter as tk
 from tkinter import ttk
 
-from cockpit.ui.common import palette
+from cockpit.ui.common import VirtualTreeview, palette
+from cockpit.utils.clock import format_timestamp
 
 
 class AuditLogView(tk.Frame):
@@ -15,61 +16,56 @@ class AuditLogView(tk.Frame):
 
         ttk.Label(self, text="Immutable Audit Log", style="ViewTitle.TLabel").pack(anchor="w", pady=(0, 12))
 
-        self._tree = ttk.Treeview(
+        self._list = VirtualTreeview(
             self,
-            columns=("ts", "actor", "action", "entity", "entity_id"),
-            show="headings",
-            height=18,
+            columns=(
+                ("ts", "Timestamp", 190),
+                ("actor", "Actor User", 110),
+                ("action", "Action", 190),
+                ("entity", "Entity", 140),
+                ("entity_id", "Entity ID", 110),
+            ),
+            fetch_page=self._fetch_page,
         )
-        for col, title, w in (
-            ("ts", "Timestamp", 190),
-            ("actor", "Actor User", 110),
-            ("action", "Action", 190),
-            ("entity", "Entity", 140),
-            ("entity_id", "Entity ID", 110),
-        ):
-            self._tree.heading(col, text=title)
-            self._tree.column(col, width=w, anchor="center")
-        self._tree.pack(fill="both", expand=True)
+        self._list.pack(fill="both", expand=True)
 
         p = palette()
         self._details = tk.Text(self, height=10, bg=p["surface"], fg=p["text"], highlightthickness=1, highlightbackground=p["border"], bd=0)
         self._details.pack(fill="x", pady=(10, 0))
         self._details.configure(state="disabled")
 
-        self._tree.bind("<<TreeviewSelect>>", lambda _e: self._show_details())
-        self._refresh()
+        self._list.bind("<<VirtualSelect>>", lambda _e: self._show_details())
+        self._list.reload()
 
-    def _refresh(self) -> None:
-        for i in self._tree.get_children():
-            self._tree.delete(i)
+    def _fetch_page(self, after_id: int | None, limit: int) -> list[tuple[int, tuple[str, ...]]]:
         rows = self._conn.execute(
             """
-            SELECT id, actor_user_id, actor_device_id, action, entity_type, entity_id, created_at
+            SELECT id, actor_user_id, action, entity_type, entity_id, created_at_us
             FROM audit_log
+            WHERE id < ?
             ORDER BY id DESC
-            LIMIT 500
-            """
+            LIMIT ?
+            """,
+            (after_id if after_id is not None else 2**63 - 1, limit),
         ).fetchall()
-        for r in rows:
-            self._tree.insert(
-                "",
-                "end",
-                text=str(int(r["id"])),
-                values=(
-                    r["created_at"],
+        return [
+            (
+                int(r["id"]),
+                (
+                    format_timestamp(r["created_at_us"]),
                     str(r["actor_user_id"]) if r["actor_user_id"] is not None else "SYSTEM",
                     r["action"],
                     r["entity_type"],
                     r["entity_id"] or "",
                 ),
             )
+            for r in rows
+        ]
 
     def _show_details(self) -> None:
-        sel = self._tree.selection()
-        if not sel:
+        log_id = self._list.selected_key()
+        if log_id is None:
             return
-        log_id = int(self._tree.item(sel[0], "text"))
         row = self._conn.execute(
             """
             SELECT previous_state_json, new_state_json, metadata_json
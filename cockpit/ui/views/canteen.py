@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 
 from cockpit.db.connection import transaction
+from cockpit.printing.spooler import PrintSpooler
 from cockpit.services.audit import Actor
 from cockpit.services.canteen import CanteenService
 from cockpit.services.operations import OperationsService
@@ -48,6 +49,8 @@ class CanteenView(tk.Frame):
         self._user_id = user_id
         self._ops = OperationsService(conn)
         self._svc = CanteenService(conn, self._ops.audit)
+        self._spooler = PrintSpooler(conn, self._ops.audit)
+        self._last_sale_id: int | None = None
 
         ttk.Label(self, text="Canteen POS", style="ViewTitle.TLabel").grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 12))
 
@@ -64,6 +67,7 @@ class CanteenView(tk.Frame):
         ttk.Separator(self).grid(row=3, column=0, columnspan=4, sticky="ew", pady=14)
         ttk.Label(self, text="Quick Sale", style="TLabel").grid(row=4, column=0, sticky="w")
         ttk.Button(self, text="New Sale", style="Primary.TButton", command=self._new_sale).grid(row=4, column=1, sticky="w")
+        ttk.Button(self, text="Print Last Receipt", style="Secondary.TButton", command=self._print_last_receipt).grid(row=4, column=2, sticky="w", padx=(10, 0))
 
         p = palette()
         self._sale_log = tk.Text(self, height=8, bg=p["surface"], fg=p["text"], highlightthickness=1, highlightbackground=p["border"], bd=0)
@@ -143,7 +147,20 @@ class CanteenView(tk.Frame):
                     drawer_id=None,
                     lines=[{"item_id": item_id, "qty": int(qty_s)}],
                 )
+            self._last_sale_id = int(sale["sale_id"])
             self._sale_log.insert("end", f"SALE {sale['receipt_number']} | ₱{sale['total_amount']}\n")
             self._sale_log.see("end")
         except Exception as exc:
             show_error(self, "Sale", exc)
+
+    def _print_last_receipt(self) -> None:
+        if self._last_sale_id is None:
+            show_error(self, "Receipt", "No sale yet")
+            return
+        try:
+            with transaction(self._conn):
+                self._spooler.enqueue_canteen_receipt(sale_id=self._last_sale_id, device_id=self._actor.device_id, created_by=self._user_id)
+            self._sale_log.insert("end", "RECEIPT QUEUED\n")
+            self._sale_log.see("end")
+        except Exception as exc:
+            show_error(self, "Receipt", exc)
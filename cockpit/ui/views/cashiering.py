@@ -1,31 +1,35 @@
 from __future__ import annotations
 
-import os
 import sqlite3
-import tempfile
 import tkinter as tk
 from tkinter import ttk
 
 from cockpit.db.connection import transaction
+from cockpit.printing.spooler import PrintSpooler
 from cockpit.services.audit import Actor
 from cockpit.services.audit import AuditService
 from cockpit.services.betting import BettingService
+from cockpit.services.errors import LimitExceededError
 from cockpit.services.operations import OperationsService
+from cockpit.services.pits import DEFAULT_PIT_ID
 from cockpit.ui.common import ask_text, show_error
 from cockpit.ui.common import palette
-from cockpit.utils.qrcodegen import QrCode
 
 
 class CashieringView(tk.Frame):
-    def __init__(self, *, parent: tk.Misc, conn: sqlite3.Connection, actor: Actor, user_id: int, device_id: str) -> None:
+    def __init__(self, *, parent: tk.Misc, conn: sqlite3.Connection, actor: Actor, user_id: int, device_id: str, pit_id: int = DEFAULT_PIT_ID) -> None:
         bg = parent.cget("bg")
         super().__init__(parent, bg=bg)
         self._conn = conn
         self._actor = actor
         self._user_id = user_id
         self._device_id = device_id
+        self._pit_id = pit_id
         self._ops = OperationsService(conn)
         self._betting = BettingService(conn, AuditService(conn))
+        self._spooler = PrintSpooler(conn, self._ops.audit)
+        self._pending_jobs: dict[int, str] = {}
+        self._print_status_error: str | None = None
 
         ttk.Label(self, text="Cashiering / Betting", style="ViewTitle.TLabel").grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 12))
 
@@ -45,6 +49,8 @@ class CashieringView(tk.Frame):
         amount_entry.grid(row=3, column=1, sticky="w", pady=(8, 0))
 
         ttk.Button(self, text="Encode + Print Slip", style="Primary.TButton", command=self._encode_and_print).grid(row=4, column=1, sticky="w", pady=(14, 0))
+        ttk.Button(self, text="Reprint Slip", style="Secondary.TButton", command=self._reprint).grid(row=4, column=2, sticky="w", pady=(14, 0), padx=(10, 0))
+        ttk.Button(self, text="Retry Failed Prints", style="Secondary.TButton", command=self._retry_failed).grid(row=4, column=3, sticky="w", pady=(14, 0), padx=(10, 0))
 
         ttk.Separator(self).grid(row=5, column=0, columnspan=4, sticky="ew", pady=14)
 
@@ -62,10 +68,12 @@ class CashieringView(tk.Frame):
         self.columnconfigure(2, weight=1)
 
         self._refresh_matches()
+        self._poll_print_status()
 
     def _refresh_matches(self) -> None:
         rows = self._conn.execute(
-            "SELECT id, match_number, state FROM fight_matches WHERE state IN ('DRAFT','LOCKED','ACTIVE') ORDER BY id DESC LIMIT 30"
+            "SELECT id, match_number, state FROM fight_matches WHERE pit_id = ? AND state IN ('DRAFT','LOCKED','ACTIVE') ORDER BY id DESC LIMIT 30",
+            (self._pit_id,),
         ).fetchall()
         options = [f"{r['id']} | {r['match_number']} | {r['state']}" for r in rows]
         self._match_combo["values"] = options
@@ -93,66 +101,16 @@ class CashieringView(tk.Frame):
                     amount=amount,
                 )
                 self._betting.mark_printed(actor=self._actor, bet_id=int(slip["id"]))
-            self._print_slip(slip_number=slip["slip_number"], qr_payload=slip["qr_payload"], match_id=match_id, side=side, amount=amount)
+                job_id = self._spooler.enqueue_bet_slip(bet_id=int(slip["id"]), device_id=self._device_id, created_by=self._user_id)
+            self._pending_jobs[job_id] = slip["slip_number"]
             self._append(f"ENCODED: {slip['slip_number']} | QR={slip['qr_payload']}\n")
+        except LimitExceededError as exc:
+            # The bet's transaction has rolled back by now, so the rejection's audit row sticks.
+            self._ops.betting.limits.record_rejection(actor=self._actor, error=exc)
+            show_error(self, "Encode Bet", exc)
         except Exception as exc:
             show_error(self, "Encode Bet", exc)
 
-    def _print_slip(self, *, slip_number: str, qr_payload: str, match_id: int, side: str, amount: int) -> None:
-        match = self._conn.execute("SELECT match_number FROM fight_matches WHERE id = ?", (match_id,)).fetchone()
-        match_no = match["match_number"] if match else str(match_id)
-        qr = QrCode.encode_text(qr_payload, QrCode.Ecc.MEDIUM)
-        border = 2
-        svg = (
-            f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" viewBox="0 0 {qr.get_size()+border*2} {qr.get_size()+border*2}" stroke="none">'
-            f'<rect width="100%" height="100%" fill="#FFFFFF"/>'
-            f'<path d="'
-        )
-        for y in range(qr.get_size()):
-            for x in range(qr.get_size()):
-                if qr.get_module(x, y):
-                    svg += f"M{x+border},{y+border}h1v1h-1z "
-        svg += f'" fill="#000000"/></svg>'
-
-        html = f"""<!doctype html>
-<html>
-<head>
-  <meta charset="utf-8">
-  <title>Bet Slip {slip_number}</title>
-  <style>
-    body {{ font-family: Segoe UI, Arial, sans-serif; }}
-    .slip {{ width: 320px; }}
-    .title {{ font-size: 18px; font-weight: 700; margin-bottom: 8px; }}
-    .row {{ font-size: 14px; margin: 2px 0; }}
-    .qr {{ margin-top: 10px; }}
-    .qr svg {{ width: 220px; height: 220px; }}
-    .payload {{ font-family: Consolas, monospace; font-size: 12px; word-break: break-all; }}
-  </style>
-</head>
-<body>
-  <div class="slip">
-    <div class="title">COCKFIGHT BET SLIP</div>
-    <div class="row">Slip #: {slip_number}</div>
-    <div class="row">Match #: {match_no}</div>
-    <div class="row">Side: {side}</div>
-    <div class="row">Amount: ₱{amount}</div>
-    <div class="qr">{svg}</div>
-    <div class="row">QR Payload:</div>
-    <div class="payload">{qr_payload}</div>
-  </div>
-</body>
-</html>
-"""
-
-        fd, path = tempfile.mkstemp(prefix="bet_slip_", suffix=".html")
-        os.close(fd)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(html)
-        try:
-            os.startfile(path, "print")
-        except Exception:
-            os.startfile(path)
-
     def _payout(self) -> None:
         qr = self._qr.get().strip()
         if not qr:
@@ -165,6 +123,44 @@ class CashieringView(tk.Frame):
         except Exception as exc:
             show_error(self, "Payout", exc)
 
+    def _reprint(self) -> None:
+        slip_number = ask_text(self, "Reprint Slip", "Slip number:")
+        if not slip_number:
+            return
+        try:
+            with transaction(self._conn):
+                job_id = self._spooler.reprint_bet_slip(actor=self._actor, slip_number=slip_number.strip().upper(), device_id=self._device_id, created_by=self._user_id)
+            self._pending_jobs[job_id] = slip_number.strip().upper()
+            self._append(f"REPRINT QUEUED: {slip_number.strip().upper()}\n")
+        except Exception as exc:
+            show_error(self, "Reprint Slip", exc)
+
+    def _retry_failed(self) -> None:
+        try:
+            with transaction(self._conn):
+                count = self._spooler.retry_failed(device_id=self._device_id)
+            self._append(f"PRINT RETRY: {count} job(s) re-queued\n")
+        except Exception as exc:
+            show_error(self, "Retry Failed Prints", exc)
+
+    def _poll_print_status(self) -> None:
+        try:
+            for job in self._spooler.job_statuses(list(self._pending_jobs)):
+                slip_number = self._pending_jobs[job.id]
+                if job.status == "DONE":
+                    del self._pending_jobs[job.id]
+                    self._append(f"PRINTED: {slip_number}\n")
+                elif job.status == "FAILED":
+                    del self._pending_jobs[job.id]
+                    self._append(f"PRINT FAILED: {slip_number} | {job.last_error or ''} (use Retry Failed Prints)\n")
+            self._print_status_error = None
+        except sqlite3.Error as exc:
+            # Usually a busy database; keep polling, but say so once rather than every tick.
+            if str(exc) != self._print_status_error:
+                self._print_status_error = str(exc)
+                self._append(f"PRINT STATUS UNAVAILABLE: {exc} (retrying)\n")
+        self.after(500, self._poll_print_status)
+
     def _append(self, text: str) -> None:
         self._result.insert("end", text)
         self._result.see("end")
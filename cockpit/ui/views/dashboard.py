@@ -1,43 +1,76 @@
 from __future__ import annotations
 
 import sqlite3
+import time
 import tkinter as tk
 from tkinter import ttk
 
-from cockpit.ui.common import palette
+from cockpit.db.connection import ChangeFeed
+from cockpit.services.payouts import Exposure, Odds, exposure_for
+from cockpit.ui.common import RenderStats, VirtualTreeview, palette
+
+
+# PRAGMA data_version is a header read, so polling it often is cheap; queries run only after a commit.
+_POLL_MS = 250
 
 
 class DashboardView(tk.Frame):
+    """
+    Live match totals, per-result payouts, and open drawers with the unclaimed winnings they owe.
+
+    Both panels are keyed models (match id, drawer id): a refresh touches only the Treeview cells
+    and cash lines whose values changed, and refreshes happen only when the change feed reports a commit.
+    """
+
     def __init__(self, *, parent: tk.Misc, conn: sqlite3.Connection) -> None:
         bg = parent.cget("bg")
         super().__init__(parent, bg=bg)
         self._conn = conn
+        self._feed = ChangeFeed(conn)
+        self._after_id: str | None = None
+        self._drawer_lines: dict[int, str] = {}
+        self._cash_stats = RenderStats()
 
         ttk.Label(self, text="Monitoring Dashboard", style="ViewTitle.TLabel").pack(anchor="w", pady=(0, 12))
 
-        self._tree = ttk.Treeview(self, columns=("match", "state", "wala", "meron", "draw", "total"), show="headings", height=14)
-        for col, title, w in (
-            ("match", "Match #", 120),
-            ("state", "State", 100),
-            ("wala", "Wala Bets", 100),
-            ("meron", "Meron Bets", 110),
-            ("draw", "Draw Bets", 100),
-            ("total", "Total", 100),
-        ):
-            self._tree.heading(col, text=title)
-            self._tree.column(col, width=w, anchor="center")
-        self._tree.pack(fill="both", expand=True)
+        self._matches = VirtualTreeview(
+            self,
+            columns=(
+                ("match", "Match #", 120),
+                ("state", "State", 100),
+                ("wala", "Wala Bets", 100),
+                ("meron", "Meron Bets", 110),
+                ("draw", "Draw Bets", 100),
+                ("total", "Total", 100),
+                ("pay_wala", "Pays if Wala", 110),
+                ("pay_meron", "Pays if Meron", 110),
+                ("pay_draw", "Pays if Draw", 110),
+                ("worst", "Worst Case", 150),
+            ),
+            fetch_page=self._fetch_matches,
+            page_size=50,
+            height=14,
+        )
+        self._matches.pack(fill="both", expand=True)
 
         p = palette()
         self._cash = tk.Text(self, height=6, bg=p["surface"], fg=p["text"], highlightthickness=1, highlightbackground=p["border"], bd=0)
         self._cash.pack(fill="x", pady=(10, 0))
+        self._cash.insert("end", "Cash On Hand (Open Drawers)\n")
         self._cash.configure(state="disabled")
 
-        self._refresh()
+        self._metrics = ttk.Label(self, text="")
+        self._metrics.pack(anchor="e", pady=(6, 0))
 
-    def _refresh(self) -> None:
-        for i in self._tree.get_children():
-            self._tree.delete(i)
+        self._poll()
+
+    def destroy(self) -> None:
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
+
+    def _fetch_matches(self, after_id: int | None, limit: int) -> list[tuple[int, tuple[str, ...]]]:
         rows = self._conn.execute(
             """
             SELECT
@@ -47,34 +80,98 @@ class DashboardView(tk.Frame):
               COALESCE(v.total_wala, 0) AS total_wala,
               COALESCE(v.total_meron, 0) AS total_meron,
               COALESCE(v.total_draw, 0) AS total_draw,
-              COALESCE(v.total_all, 0) AS total_all
+              COALESCE(v.total_all, 0) AS total_all,
+              COALESCE(v.pool_version, 0) AS pool_version
             FROM fight_matches fm
-            LEFT JOIN vw_bet_totals v ON v.match_id = fm.id
-            WHERE fm.state IN ('DRAFT','LOCKED','ACTIVE')
+            LEFT JOIN match_pools v ON v.match_id = fm.id
+            WHERE fm.state IN ('DRAFT','LOCKED','ACTIVE') AND fm.id < ?
             ORDER BY fm.id DESC
-            LIMIT 20
-            """
+            LIMIT ?
+            """,
+            (after_id if after_id is not None else 2**63 - 1, limit),
         ).fetchall()
+        page = []
         for r in rows:
-            self._tree.insert(
-                "",
-                "end",
-                values=(r["match_number"], r["state"], f"₱{int(r['total_wala'])}", f"₱{int(r['total_meron'])}", f"₱{int(r['total_draw'])}", f"₱{int(r['total_all'])}"),
+            # Exposure comes from the same pool row as the totals, so it costs no extra query.
+            odds = Odds.from_totals(int(r["total_wala"]), int(r["total_meron"]), int(r["total_draw"]), int(r["total_all"]))
+            exposure = Exposure(match_id=int(r["id"]), pool_version=int(r["pool_version"]), total_all=odds.total_all, payouts=exposure_for(odds))
+            page.append(
+                (
+                    int(r["id"]),
+                    (
+                        r["match_number"],
+                        r["state"],
+                        f"₱{int(r['total_wala'])}",
+                        f"₱{int(r['total_meron'])}",
+                        f"₱{int(r['total_draw'])}",
+                        f"₱{int(r['total_all'])}",
+                        f"₱{exposure.payouts['WALA']}",
+                        f"₱{exposure.payouts['MERON']}",
+                        f"₱{exposure.payouts['DRAW']}",
+                        f"₱{exposure.worst_case} ({exposure.worst_result})",
+                    ),
+                )
             )
+        return page
+
+    def _poll(self) -> None:
+        self._after_id = None
+        try:
+            if self._feed.poll():
+                self._refresh()
+        finally:
+            self._after_id = self.after(_POLL_MS, self._poll)
 
-        cash_rows = self._conn.execute(
+    def _refresh(self) -> None:
+        self._matches.refresh()
+        rows = self._conn.execute(
             """
-            SELECT drawer_type, name, owner_user_id, current_cash
-            FROM cash_drawers
-            WHERE closed_at IS NULL
-            ORDER BY drawer_type, name
+            SELECT d.id, d.drawer_type, d.name, d.owner_user_id, d.current_cash, COALESCE(l.unclaimed, 0) AS unclaimed
+            FROM cash_drawers d
+            LEFT JOIN (
+              SELECT drawer_id, SUM(amount) AS unclaimed FROM liabilities WHERE status = 'UNPAID' GROUP BY drawer_id
+            ) l ON l.drawer_id = d.id
+            WHERE d.closed_at IS NULL
+            ORDER BY d.drawer_type, d.name
             """
         ).fetchall()
-        self._cash.configure(state="normal")
-        self._cash.delete("1.0", "end")
-        self._cash.insert("end", "Cash On Hand (Open Drawers)\n")
-        for r in cash_rows:
-            self._cash.insert("end", f"- {r['drawer_type']} | {r['name']} | owner={r['owner_user_id']} | ₱{int(r['current_cash'])}\n")
-        self._cash.configure(state="disabled")
+        self._render_cash(
+            {
+                int(r["id"]): f"- {r['drawer_type']} | {r['name']} | owner={r['owner_user_id']} | ₱{int(r['current_cash'])} | unclaimed ₱{int(r['unclaimed'])}\n"
+                for r in rows
+            }
+        )
+        match_stats = self._matches.render_stats
+        self._metrics.configure(
+            text=(
+                f"Refreshes: {match_stats.renders} · last {match_stats.last_ms + self._cash_stats.last_ms:.1f} ms, "
+                f"{match_stats.last_tk_ops + self._cash_stats.last_tk_ops} widget updates"
+            )
+        )
 
-        self.after(1000, self._refresh)
+    def _render_cash(self, lines: dict[int, str]) -> None:
+        """Each drawer's line is a text span tagged `drawer-<id>`; only spans whose text changed are rewritten."""
+        started = time.perf_counter()
+        ops = 0
+        text = self._cash
+        text.configure(state="normal")
+        if list(lines) != list(self._drawer_lines):
+            # A drawer opened, closed or moved in the ordering: rebuild the spans in the new order.
+            for drawer_id in self._drawer_lines:
+                text.tag_delete(f"drawer-{drawer_id}")
+            text.delete("2.0", "end")
+            for drawer_id, line in lines.items():
+                text.insert("end", line, (f"drawer-{drawer_id}",))
+            ops = len(self._drawer_lines) + len(lines)
+        else:
+            for drawer_id, line in lines.items():
+                if self._drawer_lines[drawer_id] == line:
+                    continue
+                tag = f"drawer-{drawer_id}"
+                start = text.index(f"{tag}.first")
+                text.delete(start, f"{tag}.last")
+                text.insert(start, line, (tag,))
+                ops += 1
+        text.configure(state="disabled")
+        self._drawer_lines = lines
+        self._cash_stats.record(ops, started)
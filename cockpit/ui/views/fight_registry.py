@@ -8,31 +8,35 @@ from cockpit.db.connection import transaction
 from cockpit.services.audit import Actor
 from cockpit.services.audit import AuditService
 from cockpit.services.fight import FightService
-from cockpit.ui.common import ask_text, show_error
+from cockpit.services.pits import DEFAULT_PIT_ID
+from cockpit.ui.common import VirtualTreeview, ask_text, show_error
 
 
 class FightRegistryView(tk.Frame):
-    def __init__(self, *, parent: tk.Misc, conn: sqlite3.Connection, actor: Actor, permissions: set[str]) -> None:
+    def __init__(self, *, parent: tk.Misc, conn: sqlite3.Connection, actor: Actor, permissions: set[str], pit_id: int = DEFAULT_PIT_ID) -> None:
         bg = parent.cget("bg")
         super().__init__(parent, bg=bg)
         self._conn = conn
         self._actor = actor
         self._perms = permissions
+        self._pit_id = pit_id
         self._svc = FightService(conn, AuditService(conn))
 
         ttk.Label(self, text="Fight Registry", style="ViewTitle.TLabel").grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 12))
 
-        self._match_tree = ttk.Treeview(self, columns=("match", "structure", "rounds", "state", "locked"), show="headings", height=10)
-        for col, title, w in (
-            ("match", "Match #", 120),
-            ("structure", "Structure", 140),
-            ("rounds", "Rounds", 80),
-            ("state", "State", 100),
-            ("locked", "Locked At", 180),
-        ):
-            self._match_tree.heading(col, text=title)
-            self._match_tree.column(col, width=w, anchor="center")
-        self._match_tree.grid(row=1, column=0, columnspan=4, sticky="nsew")
+        self._match_list = VirtualTreeview(
+            self,
+            columns=(
+                ("match", "Match #", 120),
+                ("structure", "Structure", 140),
+                ("rounds", "Rounds", 80),
+                ("state", "State", 100),
+                ("locked", "Locked At", 180),
+            ),
+            fetch_page=self._fetch_matches,
+            height=10,
+        )
+        self._match_list.grid(row=1, column=0, columnspan=4, sticky="nsew")
 
         ttk.Button(self, text="New Match", style="Primary.TButton", command=self._new_match).grid(row=2, column=0, sticky="w", pady=(12, 0))
         ttk.Button(self, text="Add Entry", style="Secondary.TButton", command=self._add_entry).grid(row=2, column=1, sticky="w", pady=(12, 0), padx=(10, 0))
@@ -64,34 +68,38 @@ class FightRegistryView(tk.Frame):
         if "FIGHT_OVERRIDE" in self._perms:
             ttk.Button(self, text="Override Result", style="Secondary.TButton", command=self._override_result).grid(row=4, column=3, sticky="e", pady=(12, 0))
 
-        self._match_tree.bind("<<TreeviewSelect>>", lambda _e: self._refresh_entries())
+        self._match_list.bind("<<VirtualSelect>>", lambda _e: self._refresh_entries())
 
         for c in range(4):
             self.columnconfigure(c, weight=1)
         self.rowconfigure(1, weight=1)
         self.rowconfigure(3, weight=1)
 
-        self._refresh_matches()
+        self._match_list.reload()
+        self._refresh_entries()
 
     def _selected_match_id(self) -> int | None:
-        sel = self._match_tree.selection()
-        if not sel:
-            return None
-        return int(self._match_tree.item(sel[0], "text"))
+        match_id = self._match_list.selected_key()
+        return int(match_id) if match_id is not None else None
 
-    def _refresh_matches(self) -> None:
-        for i in self._match_tree.get_children():
-            self._match_tree.delete(i)
+    def _fetch_matches(self, after_id: int | None, limit: int) -> list[tuple[int, tuple]]:
         rows = self._conn.execute(
-            "SELECT id, match_number, structure_code, rounds, state, locked_at FROM fight_matches ORDER BY id DESC LIMIT 50"
+            """
+            SELECT id, match_number, structure_code, rounds, state, locked_at
+            FROM fight_matches
+            WHERE pit_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (self._pit_id, after_id if after_id is not None else 2**63 - 1, limit),
         ).fetchall()
-        for r in rows:
-            self._match_tree.insert(
-                "",
-                "end",
-                text=str(int(r["id"])),
-                values=(r["match_number"], r["structure_code"], r["rounds"], r["state"], r["locked_at"] or ""),
-            )
+        return [
+            (int(r["id"]), (r["match_number"], r["structure_code"], r["rounds"], r["state"], r["locked_at"] or ""))
+            for r in rows
+        ]
+
+    def _refresh_matches(self) -> None:
+        self._match_list.refresh()
         self._refresh_entries()
 
     def _refresh_entries(self) -> None:
@@ -118,7 +126,7 @@ class FightRegistryView(tk.Frame):
             )
 
     def _new_match(self) -> None:
-        match_number = ask_text(self, "New Match", "Match number (unique):")
+        match_number = ask_text(self, "New Match", "Match number (unique in this pit):")
         if not match_number:
             return
         structures = self._conn.execute("SELECT code FROM fight_structures WHERE is_active = 1 ORDER BY code").fetchall()
@@ -128,7 +136,7 @@ class FightRegistryView(tk.Frame):
         try:
             rounds = int(rounds_s)
             with transaction(self._conn):
-                self._svc.create_match(actor=self._actor, match_number=match_number, structure_code=structure, rounds=rounds, created_by=self._actor.user_id or 0)
+                self._svc.create_match(actor=self._actor, match_number=match_number, structure_code=structure, rounds=rounds, created_by=self._actor.user_id or 0, pit_id=self._pit_id)
             self._refresh_matches()
         except Exception as exc:
             show_error(self, "New Match", exc)
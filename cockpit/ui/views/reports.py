@@ -2,7 +2,18 @@ from __future__ import annotations
 
 import sqlite3
 import tkinter as tk
-from tkinter import ttk
+from pathlib import Path
+from tkinter import filedialog, messagebox, ttk
+
+from cockpit.db.connection import database_path
+from cockpit.services.errors import DomainError
+from cockpit.services.reports import ReportDefinition, ReportRun, ReportWriter, report_definitions
+from cockpit.ui.common import VirtualTreeview
+
+
+_POLL_MS = 30
+# Rows kept for on-screen browsing (only the visible window becomes Tk items); Export has no limit.
+_PREVIEW_ROWS = 200_000
 
 
 class ReportsView(tk.Frame):
@@ -10,169 +21,192 @@ class ReportsView(tk.Frame):
         bg = parent.cget("bg")
         super().__init__(parent, bg=bg)
         self._conn = conn
+        self._db_path = database_path(conn)
 
         ttk.Label(self, text="Reports", style="ViewTitle.TLabel").pack(anchor="w", pady=(0, 12))
 
-        nb = ttk.Notebook(self)
-        nb.pack(fill="both", expand=True)
-
-        self._fight_history = _TableTab(nb, conn=conn, title="Fight History")
-        self._daily_income = _TableTab(nb, conn=conn, title="Daily Income")
-        self._cashier_perf = _TableTab(nb, conn=conn, title="Cashier Performance")
-        self._canteen_sales = _TableTab(nb, conn=conn, title="Canteen Sales")
-
-        nb.add(self._fight_history, text="Fight History")
-        nb.add(self._daily_income, text="Daily Income")
-        nb.add(self._cashier_perf, text="Cashiers")
-        nb.add(self._canteen_sales, text="Canteen")
-
-        self._refresh()
-
-    def _refresh(self) -> None:
-        self._fight_history.set_query(
-            columns=("match_number", "state", "result", "decided_at"),
-            headings=("Match #", "State", "Result", "Decided At"),
-            query="""
-              SELECT fm.match_number, fm.state, COALESCE(fr.result_type, '') AS result, COALESCE(fr.decided_at, '') AS decided_at
-              FROM fight_matches fm
-              LEFT JOIN fight_results fr ON fr.match_id = fm.id
-              ORDER BY fm.id DESC
-              LIMIT 200
-            """,
-        )
+        self._nb = ttk.Notebook(self)
+        self._nb.pack(fill="both", expand=True)
 
-        self._daily_income.set_query(
-            columns=("day", "bet_in", "bet_payouts", "bet_net", "canteen_sales"),
-            headings=("Day", "Bet In", "Bet Payouts", "Bet Net", "Canteen Sales"),
-            query="""
-              WITH bet AS (
-                SELECT
-                  substr(COALESCE(payout_at, encoded_at), 1, 10) AS day,
-                  SUM(amount) AS bet_in,
-                  SUM(COALESCE(payout_amount, 0)) AS bet_payouts
-                FROM bet_slips
-                WHERE status IN ('PAID','ARCHIVED','PRINTED','ENCODED')
-                GROUP BY substr(COALESCE(payout_at, encoded_at), 1, 10)
-              ),
-              canteen AS (
-                SELECT substr(sold_at, 1, 10) AS day, SUM(total_amount) AS sales
-                FROM canteen_sales
-                WHERE status = 'PAID'
-                GROUP BY substr(sold_at, 1, 10)
-              )
-              SELECT
-                COALESCE(bet.day, canteen.day) AS day,
-                COALESCE(bet.bet_in, 0) AS bet_in,
-                COALESCE(bet.bet_payouts, 0) AS bet_payouts,
-                COALESCE(bet.bet_in, 0) - COALESCE(bet.bet_payouts, 0) AS bet_net,
-                COALESCE(canteen.sales, 0) AS canteen_sales
-              FROM bet
-              FULL OUTER JOIN canteen ON canteen.day = bet.day
-            """,
-        )
+        self._tabs: list[_ReportTab] = []
+        for definition in report_definitions():
+            tab = _ReportTab(self._nb, definition=definition, db_path=self._db_path)
+            self._nb.add(tab, text=definition.title)
+            self._tabs.append(tab)
 
-        self._cashier_perf.set_query(
-            columns=("cashier", "bets_count", "bet_in", "payouts"),
-            headings=("Cashier", "Bets", "Bet In", "Payouts"),
-            query="""
-              SELECT
-                u.username AS cashier,
-                COUNT(b.id) AS bets_count,
-                SUM(b.amount) AS bet_in,
-                SUM(COALESCE(b.payout_amount, 0)) AS payouts
-              FROM bet_slips b
-              JOIN users u ON u.id = b.encoded_by
-              GROUP BY u.username
-              ORDER BY bet_in DESC
-              LIMIT 100
-            """,
-        )
+        # Tabs run their query the first time they are shown, not at construction.
+        self._nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self.after_idle(self._on_tab_changed)
 
-        self._canteen_sales.set_query(
-            columns=("seller", "sales_count", "sales_total"),
-            headings=("Seller", "Sales", "Total"),
-            query="""
-              SELECT
-                u.username AS seller,
-                COUNT(s.id) AS sales_count,
-                SUM(s.total_amount) AS sales_total
-              FROM canteen_sales s
-              JOIN users u ON u.id = s.sold_by
-              WHERE s.status = 'PAID'
-              GROUP BY u.username
-              ORDER BY sales_total DESC
-              LIMIT 100
-            """,
-        )
+    def _on_tab_changed(self, _event: object = None) -> None:
+        try:
+            tab = self._nb.nametowidget(self._nb.select())
+        except (KeyError, tk.TclError):
+            return
+        if isinstance(tab, _ReportTab) and not tab.has_run:
+            tab.run()
 
-        self._fight_history.refresh()
-        self._daily_income.refresh()
-        self._cashier_perf.refresh()
-        self._canteen_sales.refresh()
+    def destroy(self) -> None:
+        for tab in self._tabs:
+            tab.cancel()
+            tab.cancel_export()
+        super().destroy()
 
 
-class _TableTab(tk.Frame):
-    def __init__(self, parent: ttk.Notebook, *, conn: sqlite3.Connection, title: str) -> None:
+class _ReportTab(tk.Frame):
+    def __init__(self, parent: ttk.Notebook, *, definition: ReportDefinition, db_path: Path | None) -> None:
         super().__init__(parent, bg=parent.winfo_toplevel().cget("bg"))
-        self._conn = conn
-        self._title = title
-        self._query = ""
-        self._columns: tuple[str, ...] = ()
-
-        self._tree = ttk.Treeview(self, columns=(), show="headings", height=18)
-        self._tree.pack(fill="both", expand=True, padx=8, pady=8)
-        ttk.Button(self, text="Refresh", style="Secondary.TButton", command=self.refresh).pack(anchor="e", padx=8, pady=(0, 8))
-
-    def set_query(self, *, columns: tuple[str, ...], headings: tuple[str, ...], query: str) -> None:
-        self._columns = columns
-        self._query = query
-        self._tree.configure(columns=columns)
-        for c, h in zip(columns, headings, strict=False):
-            self._tree.heading(c, text=h)
-            self._tree.column(c, width=160, anchor="center")
-
-    def refresh(self) -> None:
-        for i in self._tree.get_children():
-            self._tree.delete(i)
-        if not self._query:
+        self._definition = definition
+        self._db_path = db_path
+        self._run: ReportRun | None = None
+        self._poll_after_id: str | None = None
+        self._export: ReportRun | None = None
+        self._writer: ReportWriter | None = None
+        self._export_after_id: str | None = None
+        self.has_run = False
+
+        bar = tk.Frame(self, bg=self.cget("bg"))
+        bar.pack(fill="x", padx=8, pady=(8, 0))
+        self._param_vars: dict[str, tk.StringVar] = {}
+        for p in definition.params:
+            ttk.Label(bar, text=p.label).pack(side="left")
+            var = tk.StringVar(value=str(p.default))
+            ttk.Entry(bar, textvariable=var, width=11).pack(side="left", padx=(4, 12))
+            self._param_vars[p.name] = var
+        # The preview and an export run independently: Refresh and Cancel never touch a running export.
+        self._stop_export_btn = ttk.Button(bar, text="Stop Export", style="Secondary.TButton", command=self.cancel_export, state="disabled")
+        self._stop_export_btn.pack(side="right")
+        self._export_btn = ttk.Button(bar, text="Export…", style="Secondary.TButton", command=self.export)
+        self._export_btn.pack(side="right", padx=(0, 8))
+        self._cancel_btn = ttk.Button(bar, text="Cancel", style="Secondary.TButton", command=self.cancel, state="disabled")
+        self._cancel_btn.pack(side="right", padx=(0, 8))
+        ttk.Button(bar, text="Refresh", style="Secondary.TButton", command=self.run).pack(side="right", padx=(0, 8))
+        self._status = ttk.Label(bar, text="")
+        self._status.pack(side="right", padx=(0, 12))
+        self._export_status = ttk.Label(self, text="")
+        self._export_status.pack(anchor="e", padx=8)
+
+        self._list = VirtualTreeview(self, columns=[(c, h, 160) for c, h in zip(definition.columns, definition.headings, strict=True)])
+        self._list.pack(fill="both", expand=True, padx=8, pady=8)
+
+    def run(self) -> None:
+        self.cancel()
+        self.has_run = True
+        self._list.clear()
+        if self._db_path is None:
+            self._status.configure(text="Reports need a file-backed database")
             return
-
-        query = self._query
-        if "FULL OUTER JOIN" in query:
-            query = """
-              WITH bet AS (
-                SELECT
-                  substr(COALESCE(payout_at, encoded_at), 1, 10) AS day,
-                  SUM(amount) AS bet_in,
-                  SUM(COALESCE(payout_amount, 0)) AS bet_payouts
-                FROM bet_slips
-                WHERE status IN ('PAID','ARCHIVED','PRINTED','ENCODED')
-                GROUP BY substr(COALESCE(payout_at, encoded_at), 1, 10)
-              ),
-              canteen AS (
-                SELECT substr(sold_at, 1, 10) AS day, SUM(total_amount) AS sales
-                FROM canteen_sales
-                WHERE status = 'PAID'
-                GROUP BY substr(sold_at, 1, 10)
-              ),
-              days AS (
-                SELECT day FROM bet
-                UNION
-                SELECT day FROM canteen
-              )
-              SELECT
-                d.day AS day,
-                COALESCE(b.bet_in, 0) AS bet_in,
-                COALESCE(b.bet_payouts, 0) AS bet_payouts,
-                COALESCE(b.bet_in, 0) - COALESCE(b.bet_payouts, 0) AS bet_net,
-                COALESCE(c.sales, 0) AS canteen_sales
-              FROM days d
-              LEFT JOIN bet b ON b.day = d.day
-              LEFT JOIN canteen c ON c.day = d.day
-              ORDER BY d.day DESC
-              LIMIT 60
-            """
-
-        rows = self._conn.execute(query).fetchall()
-        for r in rows:
-            self._tree.insert("", "end", values=tuple(r[c] for c in self._columns))
+        try:
+            self._run = ReportRun(self._definition, db_path=self._db_path, params=self._params()).start()
+        except DomainError as e:
+            messagebox.showerror("Reports", str(e))
+            return
+        self._cancel_btn.configure(state="normal")
+        self._status.configure(text="Running…")
+        self._poll()
+
+    def _params(self) -> dict[str, str]:
+        return {name: var.get() for name, var in self._param_vars.items()}
+
+    def cancel(self) -> None:
+        """Stops the on-screen preview; an export in progress keeps going."""
+        if self._poll_after_id is not None:
+            try:
+                self.after_cancel(self._poll_after_id)
+            except Exception:
+                pass
+            self._poll_after_id = None
+        if self._run is not None and not self._run.finished:
+            self._run.cancel()
+            self._status.configure(text=f"Cancelled ({self._run.rows_fetched} rows)")
+        self._cancel_btn.configure(state="disabled")
+
+    def _poll(self) -> None:
+        self._poll_after_id = None
+        run = self._run
+        if run is None:
+            return
+        finished = run.finished
+        self._list.extend(run.drain()[: _PREVIEW_ROWS - len(self._list)])
+        shown = len(self._list)
+        if shown >= _PREVIEW_ROWS:
+            run.cancel()
+            self._cancel_btn.configure(state="disabled")
+            self._status.configure(text=f"First {shown} rows shown — use Export for the full range")
+            return
+        if not finished or shown < run.rows_fetched:
+            self._status.configure(text=f"Loading… {shown} rows")
+            self._poll_after_id = self.after(_POLL_MS, self._poll)
+            return
+        self._cancel_btn.configure(state="disabled")
+        if run.state == "FAILED":
+            self._status.configure(text=f"Failed: {run.error}")
+        elif run.state == "CANCELLED":
+            self._status.configure(text=f"Cancelled ({shown} rows)")
+        else:
+            self._status.configure(text=f"{shown} rows")
+
+    def export(self) -> None:
+        if self._db_path is None or (self._export is not None and not self._export.finished):
+            return
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            title=f"Export {self._definition.title}",
+            defaultextension=".csv",
+            initialfile=f"{self._definition.key}.csv",
+            filetypes=(("CSV", "*.csv"), ("JSON Lines", "*.jsonl")),
+        )
+        if not filename:
+            return
+        params = self._params()
+        try:
+            self._definition.bind(params)
+            self._writer = ReportWriter(self._definition, Path(filename))
+        except (DomainError, OSError) as e:
+            messagebox.showerror("Export", str(e))
+            return
+        self._export = ReportRun(
+            self._definition, db_path=self._db_path, params=params, chunk_size=2000, sink=self._writer.write
+        ).start()
+        self._export_btn.configure(state="disabled")
+        self._stop_export_btn.configure(state="normal")
+        self._export_status.configure(text="Exporting…")
+        self._poll_export()
+
+    def cancel_export(self) -> None:
+        if self._export_after_id is not None:
+            try:
+                self.after_cancel(self._export_after_id)
+            except Exception:
+                pass
+            self._export_after_id = None
+        if self._export is not None and not self._export.finished:
+            self._export.cancel()
+            self._export.wait()
+            self._finish_export()
+
+    def _poll_export(self) -> None:
+        self._export_after_id = None
+        export = self._export
+        if export is None:
+            return
+        if not export.finished:
+            self._export_status.configure(text=f"Exporting… {export.rows_fetched} rows")
+            self._export_after_id = self.after(250, self._poll_export)
+            return
+        self._finish_export()
+
+    def _finish_export(self) -> None:
+        export, writer = self._export, self._writer
+        self._export, self._writer = None, None
+        self._export_btn.configure(state="normal")
+        self._stop_export_btn.configure(state="disabled")
+        if export is None or writer is None:
+            return
+        writer.close(keep=export.state == "DONE")
+        if export.state == "DONE":
+            self._export_status.configure(text=f"Exported {export.rows_fetched} rows to {writer.path.name}")
+        elif export.state == "FAILED":
+            self._export_status.configure(text=f"Export failed: {export.error}")
+        else:
+            self._export_status.configure(text="Export cancelled")
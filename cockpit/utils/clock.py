@@ -1,8 +1,127 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Iterator
+from zoneinfo import ZoneInfo
 
 
 def utc_now() -> datetime:
     return datetime.now(tz=timezone.utc)
 
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def epoch_us(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+@dataclass(frozen=True)
+class Instant:
+    """One moment in every form the storage layer writes: `us` for *_us columns, `iso` for the TEXT ones."""
+
+    dt: datetime
+    us: int
+    iso: str
+
+
+def _instant(moment: datetime) -> Instant:
+    return Instant(dt=moment, us=epoch_us(moment), iso=moment.isoformat())
+
+
+_tx_instant: ContextVar[Instant | None] = ContextVar("cockpit_tx_instant", default=None)
+
+
+@contextmanager
+def transaction_clock() -> Iterator[Instant]:
+    """
+    Pins `now()` for the current thread until the block exits (nested use keeps the outer instant).
+    `transaction()` enters this right after BEGIN, so every row in a transaction shares one timestamp.
+    """
+    current = _tx_instant.get()
+    if current is not None:
+        yield current
+        return
+    token = _tx_instant.set(_instant(utc_now()))
+    try:
+        yield _tx_instant.get()  # type: ignore[misc]
+    finally:
+        _tx_instant.reset(token)
+
+
+def now() -> Instant:
+    """The current transaction's timestamp, or a fresh one outside a transaction."""
+    return _tx_instant.get() or _instant(utc_now())
+
+
+_OFFSET_RE = re.compile(r"^(?:UTC)?([+-])(\d{1,2})(?::?(\d{2}))?$")
+
+
+def venue_timezone(name: str) -> tzinfo:
+    """`+08:00` / `UTC+8` style fixed offsets, `UTC`, or an IANA name such as `Asia/Manila`."""
+    if name.upper() in ("UTC", "Z"):
+        return timezone.utc
+    m = _OFFSET_RE.match(name.strip())
+    if m:
+        sign, hours, minutes = m.groups()
+        delta = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-delta if sign == "-" else delta)
+    return ZoneInfo(name)
+
+
+# Process-wide business-day settings; the app calls configure_business_day() from AppConfig at start-up.
+_venue_tz: tzinfo = venue_timezone("+08:00")
+_cutoff = timedelta(hours=6)
+
+
+def configure_business_day(*, tz_name: str, cutoff_hour: int) -> None:
+    global _venue_tz, _cutoff
+    if not 0 <= cutoff_hour < 24:
+        raise ValueError("business_day_cutoff_hour must be between 0 and 23")
+    _venue_tz = venue_timezone(tz_name)
+    _cutoff = timedelta(hours=cutoff_hour)
+
+
+def business_day(moment: datetime | str | None = None) -> int:
+    """
+    Venue-local business day as an integer YYYYMMDD.
+
+    Times before the cutoff hour belong to the previous day, so an event that runs past
+    midnight is reported as one day.
+    """
+    if moment is None:
+        moment = utc_now()
+    elif isinstance(moment, str):
+        moment = datetime.fromisoformat(moment)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    local = moment.astimezone(_venue_tz) - _cutoff
+    return local.year * 10000 + local.month * 100 + local.day
+
+
+def format_timestamp(us: int | None, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """Epoch microseconds to venue-local display text ('' for None)."""
+    if us is None:
+        return ""
+    return from_epoch_us(int(us)).astimezone(_venue_tz).strftime(fmt)
+
+
+def format_business_day(day: int) -> str:
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+
+def parse_business_day(text: str) -> int:
+    """`YYYY-MM-DD` (or `YYYYMMDD`) to the integer form; raises ValueError."""
+    parsed = datetime.strptime(text.strip().replace("-", ""), "%Y%m%d")
+    return parsed.year * 10000 + parsed.month * 100 + parsed.day
@@ -228,6 +228,11 @@ class QrCode:
 		If the given coordinates are out of bounds, then False (light) is returned."""
 		return (0 <= x < self._size) and (0 <= y < self._size) and self._modules[y][x]
 	
+	def get_row(self, y: int) -> Sequence[bool]:
+		"""Returns row y of modules (True for dark) without per-module bounds checks.
+		The returned sequence belongs to this object and must not be modified."""
+		return self._modules[y]
+	
 	
 	# ---- Private helper methods for constructor: Drawing function modules ----
 	
@@ -0,0 +1,348 @@
+"""
+Fast encoder path on top of the vendored `qrcodegen` reference implementation.
+
+Produces exactly the same symbols as `QrCode.encode_text` / `QrCode.encode_segments`
+(same version, ECC level, mask choice and modules), but:
+
+- Reed-Solomon uses GF(256) log/antilog tables and a per-ECC-length table of
+  divisor multiples, so each data byte is one table lookup and one int XOR;
+- module grids are byte-per-module `bytes`, and masking is a single XOR of big
+  ints against cached per-version mask layers;
+- function patterns, format bits and the zigzag placement order are computed
+  once per version/ECC level (with the reference drawing code) and cached;
+- the penalty score is evaluated with regexes over all rows and columns and
+  whole-grid bit tricks instead of per-module loops;
+- callers may pass a fixed `mask` to skip the 8-way mask search entirely.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Sequence
+
+from cockpit.utils.qrcodegen import DataTooLongError, QrCode, QrSegment
+
+
+# ---- GF(2^8 / 0x11D) arithmetic ----
+
+_GF_EXP = bytearray(512)
+_GF_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _GF_EXP[_i] = _x
+    _GF_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11D
+for _i in range(255, 512):
+    _GF_EXP[_i] = _GF_EXP[_i - 255]
+del _x, _i
+
+
+def gf_multiply(x: int, y: int) -> int:
+    if x == 0 or y == 0:
+        return 0
+    return _GF_EXP[_GF_LOG[x] + _GF_LOG[y]]
+
+
+@lru_cache(maxsize=None)
+def rs_divisor(degree: int) -> bytes:
+    """Generator polynomial of the given degree (same coefficient layout as the reference)."""
+    if not (1 <= degree <= 255):
+        raise ValueError("Degree out of range")
+    result = bytearray(degree)
+    result[-1] = 1
+    root = 1
+    for _ in range(degree):
+        for j in range(degree):
+            result[j] = gf_multiply(result[j], root)
+            if j + 1 < degree:
+                result[j] ^= result[j + 1]
+        root = gf_multiply(root, 0x02)
+    return bytes(result)
+
+
+@lru_cache(maxsize=None)
+def _rs_factor_table(degree: int) -> tuple[int, ...]:
+    # Entry f is divisor * f packed big-endian into an int, so one LFSR step is a lookup and an XOR.
+    divisor = rs_divisor(degree)
+    return tuple(int.from_bytes(bytes(gf_multiply(c, f) for c in divisor), "big") for f in range(256))
+
+
+def rs_remainder(data: bytes, degree: int) -> bytes:
+    table = _rs_factor_table(degree)
+    shift = (degree - 1) * 8
+    full = (1 << (degree * 8)) - 1
+    rem = 0
+    for b in data:
+        rem = ((rem << 8) & full) ^ table[b ^ (rem >> shift)]
+    return rem.to_bytes(degree, "big")
+
+
+# ---- Per-version layout caches ----
+
+_ORDINALS = {ecl.ordinal: ecl for ecl in (QrCode.Ecc.LOW, QrCode.Ecc.MEDIUM, QrCode.Ecc.QUARTILE, QrCode.Ecc.HIGH)}
+
+
+def _scratch(version: int, ecl: QrCode.Ecc) -> QrCode:
+    # A bare reference object used only to run its function-pattern drawing code.
+    qr = QrCode.__new__(QrCode)
+    qr._version = version
+    qr._size = version * 4 + 17
+    qr._errcorlvl = ecl
+    qr._modules = [[False] * qr._size for _ in range(qr._size)]
+    qr._isfunction = [[False] * qr._size for _ in range(qr._size)]
+    qr._draw_function_patterns()
+    return qr
+
+
+class _VersionLayout:
+    __slots__ = ("size", "rawcodewords", "placement", "mask_layers", "valid_2x2", "n_cells")
+
+    def __init__(self, version: int) -> None:
+        qr = _scratch(version, QrCode.Ecc.LOW)
+        size = qr._size
+        isfunction = qr._isfunction
+        self.size = size
+        self.n_cells = size * size
+        self.rawcodewords = QrCode._get_num_raw_data_modules(version) // 8
+        nbits = self.rawcodewords * 8
+
+        # Zigzag placement order, same scan as QrCode._draw_codewords. Cell -> bit index,
+        # with function modules and remainder bits pointing at a trailing zero byte.
+        placement = [nbits] * self.n_cells
+        i = 0
+        for right in range(size - 1, 0, -2):
+            if right <= 6:
+                right -= 1
+            upward = (right + 1) & 2 == 0
+            for vert in range(size):
+                y = (size - 1 - vert) if upward else vert
+                for j in range(2):
+                    x = right - j
+                    if not isfunction[y][x] and i < nbits:
+                        placement[y * size + x] = i
+                        i += 1
+        self.placement = itemgetter(*placement)
+
+        # XOR layers for each mask pattern, restricted to non-function modules.
+        self.mask_layers = tuple(
+            int.from_bytes(
+                bytes(
+                    1 if (masker(x, y) == 0 and not isfunction[y][x]) else 0
+                    for y in range(size)
+                    for x in range(size)
+                ),
+                "big",
+            )
+            for masker in QrCode._MASK_PATTERNS
+        )
+        # Cells (x >= 1, y >= 1) whose 2x2 block with the up/left neighbours is scored.
+        self.valid_2x2 = int.from_bytes(
+            bytes(1 if (x >= 1 and y >= 1) else 0 for y in range(size) for x in range(size)), "big"
+        )
+
+
+@lru_cache(maxsize=None)
+def _layout(version: int) -> _VersionLayout:
+    return _VersionLayout(version)
+
+
+@lru_cache(maxsize=None)
+def _function_layers(version: int, ecl_ordinal: int) -> tuple[int, ...]:
+    """Function modules (finder, timing, alignment, version and format bits) per mask, as grid ints."""
+    qr = _scratch(version, _ORDINALS[ecl_ordinal])
+    layers = []
+    for mask in range(8):
+        qr._draw_format_bits(mask)
+        layers.append(int.from_bytes(bytes(1 if cell else 0 for row in qr._modules for cell in row), "big"))
+    return tuple(layers)
+
+
+# ---- Penalty score ----
+
+_LONG_RUN = re.compile(rb"\x00{5,}|\x01{5,}")
+
+
+@lru_cache(maxsize=None)
+def _finder_core(size: int) -> re.Pattern[bytes]:
+    # Dark:light:dark:light:dark runs of n:n:3n:n:n with whole dark runs at both ends.
+    cores = b"|".join(
+        b"\x01{%d}\x00{%d}\x01{%d}\x00{%d}\x01{%d}" % (n, n, 3 * n, n, n) for n in range(size // 7, 0, -1)
+    )
+    return re.compile(b"(?<!\x01)(?:" + cores + b")(?!\x01)")
+
+
+def _light_before(lines: bytes, start: int, size: int) -> int:
+    dark, sep = lines.rfind(b"\x01", 0, start), lines.rfind(b"\x02", 0, start)
+    if sep >= dark:  # run touches the start of the line: add the light border
+        return start - sep - 1 + size
+    return start - dark - 1
+
+
+def _light_after(lines: bytes, end: int, size: int) -> int:
+    dark, sep = lines.find(b"\x01", end), lines.find(b"\x02", end)
+    if dark == -1 or sep < dark:
+        return sep - end + size
+    return dark - end
+
+
+def penalty_score(grid: bytes, size: int, valid_2x2: int) -> int:
+    """Same result as QrCode._get_penalty_score for a byte-per-module grid."""
+    rows = [grid[y * size:(y + 1) * size] for y in range(size)]
+    cols = [grid[x::size] for x in range(size)]
+    lines = b"\x02".join(rows) + b"\x02" + b"\x02".join(cols) + b"\x02"
+
+    # N1: 3 for a run of 5, +1 per extra module.
+    runs = _LONG_RUN.findall(lines)
+    result = sum(map(len, runs)) - 2 * len(runs)
+
+    # N3: finder-like cores with enough light (border included) on either side.
+    finders = 0
+    search = _finder_core(size).search
+    m = search(lines)
+    while m is not None:
+        start, end = m.span()
+        n = (end - start) // 7
+        before = _light_before(lines, start, size)
+        after = _light_after(lines, end, size)
+        if before >= n * 4 and after >= n:
+            finders += 1
+        if after >= n * 4 and before >= n:
+            finders += 1
+        m = search(lines, end - n)  # the closing dark run may open the next core
+    result += finders * QrCode._PENALTY_N3
+
+    g = int.from_bytes(grid, "big")
+    differs = (g ^ (g >> 8)) | (g ^ (g >> (8 * size))) | (g ^ (g >> (8 * (size + 1))))
+    result += (valid_2x2 & ~differs).bit_count() * QrCode._PENALTY_N2
+
+    dark = grid.count(1)
+    total = size * size
+    k = (abs(dark * 20 - total * 10) + total - 1) // total - 1
+    result += k * QrCode._PENALTY_N4
+    return result
+
+
+# ---- Encoding ----
+
+_BITS_TO_ASCII = bytes.maketrans(b"\x00\x01", b"01")
+_ASCII_TO_BITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _data_codewords(segs: Sequence[QrSegment], ecl: QrCode.Ecc, minversion: int, maxversion: int, boostecl: bool) -> tuple[int, QrCode.Ecc, bytes]:
+    for version in range(minversion, maxversion + 1):
+        capacity = QrCode._get_num_data_codewords(version, ecl) * 8
+        used = QrSegment.get_total_bits(segs, version)
+        if used is not None and used <= capacity:
+            break
+        if version >= maxversion:
+            msg = "Segment too long"
+            if used is not None:
+                msg = f"Data length = {used} bits, Max capacity = {capacity} bits"
+            raise DataTooLongError(msg)
+    assert used is not None
+    for newecl in (QrCode.Ecc.MEDIUM, QrCode.Ecc.QUARTILE, QrCode.Ecc.HIGH):
+        if boostecl and used <= QrCode._get_num_data_codewords(version, newecl) * 8:
+            ecl = newecl
+
+    acc, nbits = 0, 0
+    for seg in segs:
+        mode = seg.get_mode()
+        ccbits = mode.num_char_count_bits(version)
+        acc = (acc << 4 | mode.get_mode_bits()) << ccbits | seg.get_num_chars()
+        data = seg._bitdata
+        if data:
+            acc = (acc << len(data)) | int(bytes(data).translate(_BITS_TO_ASCII), 2)
+        nbits += 4 + ccbits + len(data)
+    capacity_bytes = QrCode._get_num_data_codewords(version, ecl)
+    terminator = min(4, capacity_bytes * 8 - nbits)
+    acc <<= terminator
+    nbits += terminator
+    pad = -nbits % 8
+    acc <<= pad
+    nbits += pad
+    out = bytearray(acc.to_bytes(nbits // 8, "big"))
+    while len(out) < capacity_bytes:
+        out.append(0xEC if (len(out) - nbits // 8) % 2 == 0 else 0x11)
+    return version, ecl, bytes(out)
+
+
+def _add_ecc_and_interleave(version: int, ecl: QrCode.Ecc, data: bytes, rawcodewords: int) -> bytes:
+    numblocks = QrCode._NUM_ERROR_CORRECTION_BLOCKS[ecl.ordinal][version]
+    blockecclen = QrCode._ECC_CODEWORDS_PER_BLOCK[ecl.ordinal][version]
+    numshortblocks = numblocks - rawcodewords % numblocks
+    shortdatalen = rawcodewords // numblocks - blockecclen
+
+    datablocks: list[bytes] = []
+    eccblocks: list[bytes] = []
+    k = 0
+    for i in range(numblocks):
+        n = shortdatalen + (0 if i < numshortblocks else 1)
+        dat = data[k:k + n]
+        k += n
+        datablocks.append(dat)
+        eccblocks.append(rs_remainder(dat, blockecclen))
+    if numblocks == 1:
+        return datablocks[0] + eccblocks[0]
+
+    result = bytearray()
+    for i in range(shortdatalen + 1):
+        for blk in datablocks:
+            if i < len(blk):
+                result.append(blk[i])
+    for i in range(blockecclen):
+        for blk in eccblocks:
+            result.append(blk[i])
+    return bytes(result)
+
+
+def encode_grid(segs: Sequence[QrSegment], ecl: QrCode.Ecc, *, minversion: int = 1, maxversion: int = 40, mask: int = -1, boostecl: bool = True) -> tuple[int, QrCode.Ecc, int, bytes]:
+    """Returns (version, ecl, mask, grid) where grid is size*size bytes, 1 = dark, row-major."""
+    if not (QrCode.MIN_VERSION <= minversion <= maxversion <= QrCode.MAX_VERSION) or not (-1 <= mask <= 7):
+        raise ValueError("Invalid value")
+    version, ecl, data = _data_codewords(segs, ecl, minversion, maxversion, boostecl)
+    layout = _layout(version)
+    codewords = _add_ecc_and_interleave(version, ecl, data, layout.rawcodewords)
+
+    bits = format(int.from_bytes(codewords, "big"), f"0{len(codewords) * 8}b").encode("ascii").translate(_ASCII_TO_BITS) + b"\x00"
+    base = int.from_bytes(bytes(layout.placement(bits)), "big")
+    functions = _function_layers(version, ecl.ordinal)
+    n_cells = layout.n_cells
+
+    if mask == -1:
+        best = 1 << 32
+        for candidate in range(8):
+            grid = ((base ^ layout.mask_layers[candidate]) | functions[candidate]).to_bytes(n_cells, "big")
+            penalty = penalty_score(grid, layout.size, layout.valid_2x2)
+            if penalty < best:
+                best, mask = penalty, candidate
+    grid = ((base ^ layout.mask_layers[mask]) | functions[mask]).to_bytes(n_cells, "big")
+    return version, ecl, mask, grid
+
+
+def _to_qrcode(version: int, ecl: QrCode.Ecc, mask: int, grid: bytes) -> QrCode:
+    qr = QrCode.__new__(QrCode)
+    size = version * 4 + 17
+    qr._version = version
+    qr._size = size
+    qr._errcorlvl = ecl
+    qr._mask = mask
+    qr._modules = [list(map(bool, grid[y * size:(y + 1) * size])) for y in range(size)]
+    return qr
+
+
+def encode_segments(segs: Sequence[QrSegment], ecl: QrCode.Ecc, minversion: int = 1, maxversion: int = 40, mask: int = -1, boostecl: bool = True) -> QrCode:
+    """Drop-in for QrCode.encode_segments."""
+    return _to_qrcode(*encode_grid(segs, ecl, minversion=minversion, maxversion=maxversion, mask=mask, boostecl=boostecl))
+
+
+def encode_text(text: str, ecl: QrCode.Ecc, mask: int = -1) -> QrCode:
+    """Drop-in for QrCode.encode_text; pass `mask` (0-7) to skip the mask search."""
+    return encode_segments(QrSegment.make_segments(text), ecl, mask=mask)
+
+
+def encode_binary(data: bytes, ecl: QrCode.Ecc, mask: int = -1) -> QrCode:
+    """Drop-in for QrCode.encode_binary; pass `mask` (0-7) to skip the mask search."""
+    return encode_segments([QrSegment.make_bytes(data)], ecl, mask=mask)
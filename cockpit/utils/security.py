@@ -3,17 +3,20 @@ from __future__ import annotations
 import hashlib
 import hmac
 import os
+import time
 
 
 PBKDF2_ITERATIONS = 210_000
+# Calibration never goes below this, however slow the terminal is.
+MIN_PBKDF2_ITERATIONS = 100_000
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
     if not password:
         raise ValueError("Password must not be empty")
     salt = os.urandom(16)
-    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ITERATIONS)
-    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
 
 
 def verify_password(password: str, stored: str) -> bool:
@@ -29,3 +32,40 @@ def verify_password(password: str, stored: str) -> bool:
     test = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     return hmac.compare_digest(test, expected)
 
+
+def password_iterations(stored: str) -> int | None:
+    """Iteration count recorded in a stored hash, or None if it is not a PBKDF2 hash."""
+    try:
+        algo, iterations_s, _salt, _digest = stored.split("$", 3)
+        return int(iterations_s) if algo == "pbkdf2_sha256" else None
+    except ValueError:
+        return None
+
+
+def needs_rehash(stored: str, iterations: int) -> bool:
+    """
+    True when the stored hash is weaker than `iterations` (or not PBKDF2 at all).
+
+    Only ever upward: booths calibrated differently would otherwise rehash each other's users on
+    every login, and a slower booth would quietly lower the cost of hashes made elsewhere.
+    """
+    current = password_iterations(stored)
+    return current is None or current < iterations
+
+
+def calibrate_iterations(target_ms: float = 250.0, *, sample_iterations: int = 50_000, rounds: int = 3) -> int:
+    """
+    PBKDF2-SHA256 iteration count that takes about `target_ms` on this machine.
+
+    Uses the fastest of a few timed samples, rounds down to 10,000 and never returns less
+    than MIN_PBKDF2_ITERATIONS.
+    """
+    salt = os.urandom(16)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac("sha256", b"calibration", salt, sample_iterations)
+        best = min(best, time.perf_counter() - start)
+    per_iteration_ms = best * 1000 / sample_iterations
+    iterations = int(target_ms / per_iteration_ms) // 10_000 * 10_000
+    return max(MIN_PBKDF2_ITERATIONS, iterations)
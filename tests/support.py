@@ -0,0 +1,27 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from cockpit.db.connection import connect, transaction
+from cockpit.db.migrate import initialize_database
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """A migrated, file-backed database per test; a path (not :memory:) so readers on other threads can open it."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = Path(tmp.name) / "cockpit.sqlite3"
+        self.conn = connect(self.db_path)
+        self.addCleanup(self.conn.close)
+        initialize_database(self.conn)
+
+    def add_user(self, username: str = "a") -> int:
+        with transaction(self.conn):
+            return int(
+                self.conn.execute(
+                    "INSERT INTO users(username, password_hash, is_active, is_frozen, created_at, updated_at) VALUES (?, 'x', 1, 0, 'x', 'x')",
+                    (username,),
+                ).lastrowid
+            )
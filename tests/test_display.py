@@ -0,0 +1,64 @@
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from cockpit.db.connection import transaction
+from cockpit.display.client import iter_events
+from cockpit.display.server import DisplayServer
+from cockpit.services.audit import Actor
+from cockpit.services.pits import PitService
+from support import DatabaseTestCase
+
+
+class DisplayServerTests(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user_id = self.add_user()
+        self.server = DisplayServer(self.db_path, host="127.0.0.1", port=0, poll_interval=0.02).start()
+        self.url = f"http://127.0.0.1:{self.server.port}"
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    def _add_match(self, number: str, pit_id: int = 1) -> None:
+        with transaction(self.conn):
+            self.conn.execute(
+                "INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at, pit_id) VALUES (?, 'S', 1, 'DRAFT', ?, 'x', ?)",
+                (number, self.user_id, pit_id),
+            )
+
+    def test_streams_one_event_per_change(self) -> None:
+        events = iter_events(self.url, timeout=10)
+        first = next(events)
+        self.assertIsNone(first.payload["match"])
+
+        self._add_match("M-1")
+        second = next(events)
+        self.assertGreater(second.id, first.id)
+        self.assertEqual(second.payload["match"]["match_number"], "M-1")
+        self.assertEqual(second.payload["odds"]["total_all"], 0)
+
+        with urllib.request.urlopen(self.url + "/state", timeout=10) as resp:
+            self.assertEqual(json.loads(resp.read())["match"]["match_number"], "M-1")
+
+    def test_serves_display_page(self) -> None:
+        with urllib.request.urlopen(self.url + "/", timeout=10) as resp:
+            self.assertIn(b"EventSource", resp.read())
+
+    def test_each_pit_has_its_own_stream(self) -> None:
+        pit_b = PitService(self.conn, audit=None).create_pit(actor=Actor(user_id=None, device_id="TEST"), code="B", name="Pit B")
+        main_events = iter_events(self.url, timeout=10)
+        b_events = iter_events(self.url, pit="b", timeout=10)
+        self.assertIsNone(next(main_events).payload["match"])
+        self.assertEqual(next(b_events).payload["pit"]["code"], "B")
+
+        self._add_match("B-1", pit_id=pit_b)
+        self.assertEqual(next(b_events).payload["match"]["match_number"], "B-1")
+        self._add_match("M-1")
+        # The main pit's next event is its own match; pit B's match never reached it.
+        self.assertEqual(next(main_events).payload["match"]["match_number"], "M-1")
+
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(self.url + "/state?pit=NOPE", timeout=10)
+        self.assertEqual(ctx.exception.code, 404)
@@ -2,12 +2,16 @@ import sqlite3
 import unittest
 
 from cockpit.db.migrate import initialize_database
+from cockpit.display.payload import build_display_payload
+from cockpit.db.rollups import rebuild_rollups
 from cockpit.services.audit import Actor, AuditService
-from cockpit.services.auth import AuthService
+from cockpit.services.auth import AuthService, check_password
 from cockpit.services.betting import BettingService
+from cockpit.services.errors import ValidationError
 from cockpit.services.fight import FightService
+from cockpit.services.pits import PitService
 from cockpit.services.rbac import RBACService
-from cockpit.utils.security import hash_password
+from cockpit.utils.security import hash_password, password_iterations
 
 
 class DomainTests(unittest.TestCase):
@@ -46,6 +50,22 @@ class DomainTests(unittest.TestCase):
         with self.assertRaises(Exception):
             auth.login(username="admin", password="pw", device_id="B")
 
+    def test_login_rehashes_password_only_to_a_higher_cost(self) -> None:
+        # The stored hash uses the default 210,000; a booth calibrated lower leaves it alone.
+        self.assertIsNone(check_password(AuthService(self.conn, self.audit).fetch_credentials("admin"), "pw", iterations=150_000))
+
+        auth = AuthService(self.conn, self.audit, password_iterations=250_000)
+        credentials = auth.fetch_credentials("admin")
+        with self.assertRaises(Exception):
+            check_password(credentials, "wrong", iterations=250_000)
+        new_hash = check_password(credentials, "pw", iterations=250_000)
+        self.assertIsNotNone(new_hash)
+        auth.start_session(credentials=credentials, device_id="A", new_password_hash=new_hash)
+        stored = self.conn.execute("SELECT password_hash FROM users WHERE id = ?", (self.user_id,)).fetchone()["password_hash"]
+        self.assertEqual(password_iterations(stored), 250_000)
+        self.assertIsNone(check_password(auth.fetch_credentials("admin"), "pw", iterations=250_000))
+        self.assertIsNone(check_password(auth.fetch_credentials("admin"), "pw", iterations=210_000))
+
     def test_stale_session_auto_logout_allows_new_login(self) -> None:
         auth = AuthService(self.conn, self.audit)
         _user, session_id = auth.login(username="admin", password="pw", device_id="A")
@@ -53,12 +73,46 @@ class DomainTests(unittest.TestCase):
             "UPDATE sessions SET last_seen_at = ?, logged_out_at = NULL WHERE id = ?",
             ("2000-01-01T00:00:00+00:00", session_id),
         )
+        # Liveness is read from the session lease.
+        self.conn.execute(
+            "UPDATE telemetry.session_leases SET last_seen_at = ? WHERE session_id = ?",
+            ("2000-01-01T00:00:00+00:00", session_id),
+        )
         user2, session2 = auth.login(username="admin", password="pw", device_id="B")
         self.assertEqual(user2.id, self.user_id)
         self.assertNotEqual(session2, session_id)
         old = self.conn.execute("SELECT logged_out_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
         self.assertIsNotNone(old["logged_out_at"])
 
+    def test_heartbeat_renews_lease_without_touching_sessions(self) -> None:
+        auth = AuthService(self.conn, self.audit)
+        _user, session_id = auth.login(username="admin", password="pw", device_id="A")
+        before = self.conn.execute("SELECT last_seen_at FROM sessions WHERE id = ?", (session_id,)).fetchone()["last_seen_at"]
+        self.conn.execute("UPDATE telemetry.session_leases SET last_seen_at = '2000-01-01T00:00:00+00:00'")
+        changes = self.conn.total_changes
+        auth.heartbeat(session_id=session_id)
+        self.assertEqual(self.conn.total_changes, changes + 1)
+        lease = self.conn.execute("SELECT last_seen_at FROM telemetry.session_leases WHERE session_id = ?", (session_id,)).fetchone()
+        self.assertGreater(lease["last_seen_at"], "2000-01-01T00:00:00+00:00")
+        after = self.conn.execute("SELECT last_seen_at FROM sessions WHERE id = ?", (session_id,)).fetchone()["last_seen_at"]
+        self.assertEqual(before, after)
+        self.assertEqual(auth.cleanup_stale_sessions(actor=self.actor), 0)
+
+    def test_heartbeat_recreates_a_missing_lease(self) -> None:
+        auth = AuthService(self.conn, self.audit)
+        _user, session_id = auth.login(username="admin", password="pw", device_id="A")
+        # Telemetry file lost; the durable last_seen_at is old enough to look stale on its own.
+        self.conn.execute("DELETE FROM telemetry.session_leases")
+        self.conn.execute("UPDATE sessions SET last_seen_at = '2000-01-01T00:00:00+00:00' WHERE id = ?", (session_id,))
+        auth.heartbeat(session_id=session_id)
+        lease = self.conn.execute("SELECT user_id, device_id FROM telemetry.session_leases WHERE session_id = ?", (session_id,)).fetchone()
+        self.assertEqual(tuple(lease), (self.user_id, "A"))
+        self.assertEqual(auth.cleanup_stale_sessions(actor=self.actor), 0)
+        # A logged-out session gets no lease back.
+        auth.logout(actor=self.actor, session_id=session_id)
+        auth.heartbeat(session_id=session_id)
+        self.assertIsNone(self.conn.execute("SELECT 1 FROM telemetry.session_leases WHERE session_id = ?", (session_id,)).fetchone())
+
     def test_match_locks_on_first_bet_and_blocks_entry_edit(self) -> None:
         fight = FightService(self.conn, self.audit)
         betting = BettingService(self.conn, self.audit)
@@ -100,6 +154,179 @@ class DomainTests(unittest.TestCase):
         self.assertEqual(betting.compute_payout_for_slip(int(b2["id"])), 100)
         self.assertEqual(betting.compute_payout_for_slip(int(b3["id"])), 50)
 
+    def test_rollups_follow_encode_payout_and_void(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        betting = BettingService(self.conn, self.audit)
+
+        match_id = fight.create_match(actor=self.user_actor, match_number="M3", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+        b1 = betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=match_id, side="WALA", amount=100)
+        b2 = betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=match_id, side="MERON", amount=50)
+        betting.mark_printed(actor=self.user_actor, bet_id=int(b1["id"]))
+        fight.set_result(actor=self.user_actor, match_id=match_id, result_type="WALA", decided_by=self.user_id, notes=None)
+        betting.payout_by_qr(actor=self.user_actor, payout_by=self.user_id, qr_payload=b1["qr_payload"])
+        self.conn.execute("UPDATE bet_slips SET status = 'VOIDED' WHERE id = ?", (int(b2["id"]),))
+
+        def snapshot() -> list[tuple]:
+            return [
+                tuple(r)
+                for r in self.conn.execute(
+                    """
+                    SELECT business_day, user_id, match_id, bets_count, bet_in, payouts_count, payouts
+                    FROM rollup_bets WHERE bets_count <> 0 OR payouts_count <> 0 ORDER BY 1, 2, 3
+                    """
+                )
+            ]
+
+        live = snapshot()
+        self.assertEqual(sum(r[4] for r in live), 100)
+        self.assertEqual(sum(r[5] for r in live), 1)
+        rebuild_rollups(self.conn)
+        self.assertEqual(snapshot(), live)
+
+    def test_match_pools_and_pit_state_follow_bets_and_results(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        betting = BettingService(self.conn, self.audit)
+
+        def venue() -> tuple:
+            return tuple(self.conn.execute("SELECT current_match_id, odds_version FROM pit_state WHERE pit_id = 1").fetchone())
+
+        m1 = fight.create_match(actor=self.user_actor, match_number="P1", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+        m2 = fight.create_match(actor=self.user_actor, match_number="P2", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+        self.assertEqual(venue()[0], m2)
+
+        version = venue()[1]
+        betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=m2, side="WALA", amount=100)
+        b2 = betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=m2, side="MERON", amount=40)
+        self.assertGreater(venue()[1], version)
+        self.conn.execute("UPDATE bet_slips SET status = 'VOIDED' WHERE id = ?", (int(b2["id"]),))
+        pool = self.conn.execute("SELECT total_wala, total_meron, total_all, bets_count, pool_version FROM match_pools WHERE match_id = ?", (m2,)).fetchone()
+        self.assertEqual(tuple(pool), (100, 0, 100, 1, 3))
+        odds = betting.get_odds(m2)
+        self.assertEqual((odds.total_wala, odds.total_all), (100, 100))
+
+        fight.set_result(actor=self.user_actor, match_id=m2, result_type="WALA", decided_by=self.user_id, notes=None)
+        self.assertEqual(venue()[0], m1)
+
+        # Rebuilding changes nothing when the triggers were right, so versions do not move.
+        rebuild_rollups(self.conn)
+        self.assertEqual(self.conn.execute("SELECT pool_version FROM match_pools WHERE match_id = ?", (m2,)).fetchone()[0], 3)
+
+    def test_pits_keep_their_own_current_match_and_versions(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        betting = BettingService(self.conn, self.audit)
+        pit_b = PitService(self.conn, self.audit).create_pit(actor=self.user_actor, code="b", name="Pit B")
+
+        def state(pit_id: int) -> tuple:
+            return tuple(self.conn.execute("SELECT current_match_id, odds_version FROM pit_state WHERE pit_id = ?", (pit_id,)).fetchone())
+
+        a1 = fight.create_match(actor=self.user_actor, match_number="A1", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+        b1 = fight.create_match(actor=self.user_actor, match_number="B1", structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=pit_b)
+        self.assertEqual((state(1)[0], state(pit_b)[0]), (a1, b1))
+
+        # Betting and results in pit B never move pit A's row.
+        before_a = state(1)
+        betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=b1, side="WALA", amount=100)
+        fight.set_result(actor=self.user_actor, match_id=b1, result_type="WALA", decided_by=self.user_id, notes=None)
+        self.assertEqual(state(1), before_a)
+        self.assertIsNone(state(pit_b)[0])
+
+        with self.assertRaises(ValidationError):
+            fight.create_match(actor=self.user_actor, match_number="X1", structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=99)
+
+        # Match numbers are per pit: both pits can run "1", but not twice in one pit.
+        fight.create_match(actor=self.user_actor, match_number="1", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+        fight.create_match(actor=self.user_actor, match_number="1", structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=pit_b)
+        with self.assertRaises(sqlite3.IntegrityError):
+            fight.create_match(actor=self.user_actor, match_number="1", structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=pit_b)
+
+    def test_display_payload_reads_by_index(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        pit_b = PitService(self.conn, self.audit).create_pit(actor=self.user_actor, code="B", name="Pit B")
+        for n in range(20):
+            match_id = fight.create_match(
+                actor=self.user_actor, match_number=str(n), structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=1 + n % 2 * (pit_b - 1)
+            )
+            fight.set_result(actor=self.user_actor, match_id=match_id, result_type="WALA", decided_by=self.user_id, notes=None)
+        fight.create_match(actor=self.user_actor, match_number="live", structure_code="SINGLE", rounds=1, created_by=self.user_id, pit_id=pit_b)
+
+        statements: list[str] = []
+        self.conn.set_trace_callback(statements.append)
+        try:
+            payload = build_display_payload(self.conn, pit_id=pit_b)
+        finally:
+            self.conn.set_trace_callback(None)
+        self.assertEqual(payload["match"]["match_number"], "live")
+        self.assertEqual(sorted(int(h["match_number"]) for h in payload["history"]), list(range(1, 20, 2)))
+        # Every read is a keyed search: no table scans and no sorting, however long the season.
+        for sql in statements:
+            plan = " | ".join(r[3] for r in self.conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall())
+            self.assertNotIn("SCAN", plan, sql)
+            self.assertNotIn("TEMP B-TREE", plan, sql)
+
+    def test_slips_reference_odds_snapshots_by_pool_version(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        betting = BettingService(self.conn, self.audit)
+        match_id = fight.create_match(actor=self.user_actor, match_number="S1", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+
+        b1 = betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=match_id, side="WALA", amount=100)
+        b2 = betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=match_id, side="MERON", amount=300)
+        self.assertEqual(
+            betting.odds_snapshot_json(int(b1["id"])),
+            '{"total_wala": 0, "total_meron": 0, "total_draw": 0, "total_all": 0, "wala_multiplier": null, "meron_multiplier": null}',
+        )
+        self.assertEqual(betting.odds_snapshot(int(b2["id"])), {
+            "total_wala": 100, "total_meron": 0, "total_draw": 0, "total_all": 100, "wala_multiplier": 1.0, "meron_multiplier": None,
+        })
+
+        # A slip sold while the pool is unchanged reuses that pool_version's row.
+        pool_version = self.conn.execute("SELECT pool_version FROM match_pools WHERE match_id = ?", (match_id,)).fetchone()[0]
+        first, second = (betting._current_snapshot(match_id)[0] for _ in range(2))
+        self.assertEqual(first, second)
+        self.assertEqual(
+            tuple(self.conn.execute("SELECT pool_version, total_all FROM odds_snapshots WHERE id = ?", (first,)).fetchone()), (pool_version, 400)
+        )
+
+    def test_exposure_matches_slip_payouts_for_every_result(self) -> None:
+        fight = FightService(self.conn, self.audit)
+        betting = BettingService(self.conn, self.audit)
+        bets = (("WALA", 100), ("WALA", 70), ("MERON", 130), ("DRAW", 20))
+
+        exposures = {}
+        for result in ("WALA", "MERON", "DRAW", "CANCELLED"):
+            match_id = fight.create_match(actor=self.user_actor, match_number=f"E-{result}", structure_code="SINGLE", rounds=1, created_by=self.user_id)
+            slips = [
+                betting.encode_bet(actor=self.user_actor, encoded_by=self.user_id, device_id="TEST", match_id=match_id, side=side, amount=amount)
+                for side, amount in bets
+            ]
+            exposure = betting.get_exposure(match_id)
+            exposures[result] = exposure
+            fight.set_result(actor=self.user_actor, match_id=match_id, result_type=result, decided_by=self.user_id, notes=None)
+            paid = sum(betting.compute_payout_for_slip(int(s["id"])) for s in slips)
+            # Per-slip flooring may pay a little less than the side-total bound, never more.
+            self.assertLessEqual(paid, exposure.payouts[result])
+            self.assertGreater(paid, exposure.payouts[result] - len(slips))
+
+        self.assertEqual(exposures["WALA"].payouts, {"WALA": 320, "MERON": 320, "DRAW": 400, "CANCELLED": 320, "NO_CONTEST": 320})
+        self.assertEqual((exposures["WALA"].worst_result, exposures["WALA"].worst_case), ("DRAW", 400))
+        self.assertEqual(betting.get_exposure(10_000).worst_case, 0)
+
+    def test_rbac_cache_is_invalidated_by_role_changes(self) -> None:
+        rbac = RBACService(self.conn)
+        rbac.sync()
+        self.assertEqual(rbac.user_permissions(self.user_id), frozenset())
+        cashier_role = int(self.conn.execute("SELECT id FROM roles WHERE name = 'Cashier'").fetchone()["id"])
+        self.conn.execute("INSERT INTO user_roles(user_id, role_id) VALUES(?, ?)", (self.user_id, cashier_role))
+        # Still the cached set until the next sync.
+        self.assertFalse(rbac.has(self.user_id, "BET_ENCODE"))
+        self.assertTrue(rbac.sync())
+        self.assertTrue(rbac.has(self.user_id, "BET_ENCODE"))
+        self.assertFalse(rbac.sync())
+
+        payout = int(self.conn.execute("SELECT id FROM permissions WHERE code = 'BET_PAYOUT'").fetchone()["id"])
+        self.conn.execute("DELETE FROM role_permissions WHERE role_id = ? AND permission_id = ?", (cashier_role, payout))
+        self.assertTrue(rbac.sync())
+        self.assertNotIn("BET_PAYOUT", rbac.user_permissions(self.user_id))
+
 
 if __name__ == "__main__":
     unittest.main()
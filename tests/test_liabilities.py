@@ -0,0 +1,99 @@
+from datetime import datetime
+import unittest
+
+from cockpit.db.connection import transaction
+from cockpit.config import AppConfig
+from cockpit.db.migrate import initialize_database
+from cockpit.services.audit import Actor
+from cockpit.services.errors import ValidationError
+from cockpit.services.fight import FightService
+from cockpit.services.operations import OperationsService
+from cockpit.utils.clock import epoch_us
+from support import DatabaseTestCase
+
+
+_DAY_US = 86_400 * 1_000_000
+
+
+class LiabilityLedgerTests(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.cashier = self.add_user("c")
+        self.actor = Actor(user_id=self.cashier, device_id="TEST")
+        self.ops = OperationsService(self.conn)
+        self.fight = FightService(self.conn, self.ops.audit)
+        self.ledger = self.ops.betting.liabilities
+
+    def _match(self, number: str, bets: tuple[tuple[str, int], ...]) -> tuple[int, list[dict]]:
+        with transaction(self.conn):
+            match_id = self.fight.create_match(actor=self.actor, match_number=number, structure_code="SINGLE", rounds=1, created_by=self.cashier)
+        slips = []
+        for side, amount in bets:
+            slip = self.ops.encode_bet_with_cash(
+                actor=self.actor, cashier_user_id=self.cashier, device_id="TEST", match_id=match_id, side=side, amount=amount
+            )
+            with transaction(self.conn):
+                self.ops.betting.mark_printed(actor=self.actor, bet_id=int(slip["id"]))
+            slips.append(slip)
+        return match_id, slips
+
+    def _result(self, match_id: int, result_type: str) -> None:
+        with transaction(self.conn):
+            self.fight.set_result(actor=self.actor, match_id=match_id, result_type=result_type, decided_by=self.cashier)
+
+    def test_ledger_follows_settlement_payout_and_override(self) -> None:
+        m1, slips = self._match("L1", (("WALA", 100), ("MERON", 300), ("DRAW", 20)))
+        self._result(m1, "WALA")
+        drawer = self.conn.execute("SELECT id FROM cash_drawers").fetchone()[0]
+        self.assertEqual([(o.key, o.slips, o.amount) for o in self.ledger.outstanding_by_match()], [(m1, 1, 420)])
+        self.assertEqual([(o.key, o.amount) for o in self.ledger.outstanding_by_drawer()], [(drawer, 420)])
+
+        # An override re-prices what is still unpaid: DRAW pays 5x and refunds both sides.
+        with transaction(self.conn):
+            self.fight.set_result(actor=self.actor, match_id=m1, result_type="DRAW", decided_by=self.cashier, override=True)
+        self.assertEqual(self.ledger.outstanding_by_match()[0].amount, 100 + 300 + 100)
+
+        self.ops.payout_bet_with_cash(actor=self.actor, cashier_user_id=self.cashier, qr_payload=slips[2]["qr_payload"])
+        self.assertEqual(self.ledger.outstanding_by_match()[0].amount, 400)
+        self.assertEqual(self.conn.execute("SELECT status FROM liabilities WHERE bet_id = ?", (slips[2]["id"],)).fetchone()[0], "PAID")
+
+    def test_age_buckets_and_expiry(self) -> None:
+        m1, old = self._match("A1", (("WALA", 100),))
+        m2, _ = self._match("A2", (("MERON", 50),))
+        self._result(m1, "CANCELLED")
+        self._result(m2, "MERON")
+        now_us = int(self.conn.execute("SELECT MAX(settled_at_us) FROM liabilities").fetchone()[0])
+        self.conn.execute("UPDATE liabilities SET settled_at_us = ? WHERE match_id = ?", (now_us - 40 * _DAY_US, m1))
+
+        ages = self.ledger.outstanding_by_age(at_us=now_us)
+        self.assertEqual([(o.key, o.slips, o.amount) for o in ages], [("<1d", 1, 50), ("1-7d", 0, 0), ("7-30d", 0, 0), ("30d+", 1, 100)])
+
+        expired = self.ledger.expire_unclaimed(actor=self.actor, older_than_days=30, at_us=now_us)
+        self.assertEqual((expired.slips, expired.amount), (1, 100))
+        self.assertEqual(self.conn.execute("SELECT status FROM bet_slips WHERE id = ?", (old[0]["id"],)).fetchone()[0], "ARCHIVED")
+        self.assertEqual([(o.key, o.amount) for o in self.ledger.outstanding_by_match()], [(m2, 50)])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM audit_log WHERE action = 'BET_EXPIRE'").fetchone()[0], 1)
+        # The expired slip's QR no longer pays.
+        with self.assertRaises(ValidationError):
+            self.ops.payout_bet_with_cash(actor=self.actor, cashier_user_id=self.cashier, qr_payload=old[0]["qr_payload"])
+        self.assertEqual(self.ledger.expire_unclaimed(actor=self.actor, older_than_days=30, at_us=now_us).slips, 0)
+
+    def test_expiry_window_must_be_at_least_a_day(self) -> None:
+        m1, _ = self._match("E1", (("WALA", 100),))
+        self._result(m1, "WALA")
+        for days in (0, -5):
+            with self.assertRaises(ValidationError):
+                self.ledger.expire_unclaimed(actor=self.actor, older_than_days=days)
+        with self.assertRaises(ValueError):
+            AppConfig(unclaimed_expiry_days=0)
+        self.assertEqual(self.ledger.outstanding_by_match()[0].amount, 100)
+
+    def test_startup_settles_results_missing_from_the_ledger(self) -> None:
+        m1, _ = self._match("B1", (("WALA", 100), ("MERON", 100)))
+        self._result(m1, "MERON")
+        decided_at = self.conn.execute("SELECT decided_at FROM fight_results").fetchone()[0]
+        # As if the settling transaction never committed, on a file that already has the ledger table.
+        self.conn.execute("DELETE FROM liabilities")
+        initialize_database(self.conn)
+        self.assertEqual([(o.key, o.amount) for o in self.ledger.outstanding_by_match()], [(m1, 200)])
+        self.assertEqual(self.conn.execute("SELECT settled_at_us FROM liabilities").fetchone()[0], epoch_us(datetime.fromisoformat(decided_at)))
@@ -0,0 +1,76 @@
+import json
+import unittest
+
+from cockpit.db.connection import transaction
+from cockpit.services.audit import Actor
+from cockpit.services.errors import LimitExceededError, ValidationError
+from cockpit.services.fight import FightService
+from cockpit.services.operations import OperationsService
+from support import DatabaseTestCase
+
+
+class BetLimitTests(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.cashier = self.add_user("c")
+        self.actor = Actor(user_id=self.cashier, device_id="TEST")
+        self.ops = OperationsService(self.conn)
+        self.limits = self.ops.betting.limits
+        with transaction(self.conn):
+            self.match_id = FightService(self.conn, self.ops.audit).create_match(
+                actor=self.actor, match_number="L1", structure_code="SINGLE", rounds=1, created_by=self.cashier
+            )
+
+    def _bet(self, side: str, amount: int) -> dict:
+        return self.ops.encode_bet_with_cash(
+            actor=self.actor, cashier_user_id=self.cashier, device_id="TEST", match_id=self.match_id, side=side, amount=amount
+        )
+
+    def _rejections(self) -> list[dict]:
+        rows = self.conn.execute("SELECT new_state_json FROM audit_log WHERE action = 'BET_LIMIT_REJECT' ORDER BY id").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def test_caps_are_enforced_and_rejections_audited(self) -> None:
+        self.limits.set_limit(actor=self.actor, match_id=None, side=None, max_bet=500)
+        self.limits.set_limit(actor=self.actor, match_id=self.match_id, side="DRAW", max_payout=1_000)
+        self._bet("WALA", 300)
+        self._bet("DRAW", 100)
+
+        with self.assertRaises(LimitExceededError) as ctx:
+            self._bet("MERON", 600)
+        self.assertEqual((ctx.exception.rule, ctx.exception.limit, ctx.exception.attempted), ("max_bet", 500, 600))
+
+        # A DRAW result would pay 5 × 140 plus the 300 WALA refund: exactly the cap. Another 10 tips it over.
+        self._bet("DRAW", 40)
+        with self.assertRaises(LimitExceededError) as ctx:
+            self._bet("DRAW", 10)
+        self.assertEqual((ctx.exception.rule, ctx.exception.attempted), ("max_payout", 1_050))
+
+        # Rejected bets leave nothing behind except their audit rows.
+        self.assertEqual(tuple(self.conn.execute("SELECT COUNT(*), SUM(amount) FROM bet_slips").fetchone()), (3, 440))
+        self.assertEqual(self.conn.execute("SELECT total_all FROM match_pools WHERE match_id = ?", (self.match_id,)).fetchone()[0], 440)
+        self.assertEqual([(r["rule"], r["side"], r["amount"]) for r in self._rejections()], [("max_bet", "MERON", 600), ("max_payout", "DRAW", 10)])
+
+    def test_cashier_cap_and_nested_callers_record_once(self) -> None:
+        self.limits.set_limit(actor=self.actor, match_id=self.match_id, side=None, max_cashier_total=250)
+        self._bet("WALA", 200)
+        with self.assertRaises(LimitExceededError) as ctx:
+            with transaction(self.conn):
+                self._bet("MERON", 100)
+        # Inside the caller's transaction the service leaves the audit row to the caller.
+        self.assertEqual(self._rejections(), [])
+        self.assertTrue(self.limits.record_rejection(actor=self.actor, error=ctx.exception))
+        self.assertTrue(self.limits.record_rejection(actor=self.actor, error=ctx.exception))
+        self.assertEqual([(r["rule"], r["attempted"]) for r in self._rejections()], [("max_cashier_total", 300)])
+
+    def test_rules_are_validated_and_replaced_per_scope(self) -> None:
+        with self.assertRaises(ValidationError):
+            self.limits.set_limit(actor=self.actor, match_id=None, side="DRAW", max_cashier_total=100)
+        with self.assertRaises(ValidationError):
+            self.limits.set_limit(actor=self.actor, match_id=None, side=None)
+        first = self.limits.set_limit(actor=self.actor, match_id=None, side="DRAW", max_total=100)
+        second = self.limits.set_limit(actor=self.actor, match_id=None, side="DRAW", max_total=200)
+        self.assertEqual(first, second)
+        self.assertEqual([(l.side, l.max_total) for l in self.limits.list_limits(match_id=self.match_id)], [("DRAW", 200)])
+        self.limits.remove_limit(actor=self.actor, limit_id=first)
+        self.assertEqual(self.limits.list_limits(), [])
@@ -0,0 +1,68 @@
+import unittest
+
+from cockpit.db.connection import transaction
+from cockpit.services.odds_history import OddsRecorder, odds_series
+from cockpit.services.reports import ReportRun, get_report
+from support import DatabaseTestCase
+
+
+_SECOND = 1_000_000
+
+
+class OddsHistoryTests(DatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user_id = self.add_user()
+        with transaction(self.conn):
+            self.match_id = self.conn.execute(
+                "INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at, business_day) VALUES ('M1', 'S', 1, 'DRAFT', ?, '2025-03-01T12:00:00+00:00', 20250301)",
+                (self.user_id,),
+            ).lastrowid
+        self._slips = 0
+
+    def _bet(self, side: str, amount: int) -> None:
+        self._slips += 1
+        with transaction(self.conn):
+            self.conn.execute(
+                """
+                INSERT INTO bet_slips(slip_number, match_id, side, amount, status, encoded_by, encoded_at, qr_payload, device_id)
+                VALUES (?, ?, ?, ?, 'ENCODED', ?, '2025-03-01T12:00:00+00:00', ?, 'd')
+                """,
+                (f"S{self._slips}", self.match_id, side, amount, self.user_id, f"Q{self._slips}"),
+            )
+
+    def test_records_changes_only_and_downsamples_per_bucket(self) -> None:
+        recorder = OddsRecorder(self.conn, bucket_seconds=30, ring_size=3)
+        self.assertIsNone(recorder.sample(at_us=0))
+
+        self._bet("WALA", 100)
+        self.assertIsNotNone(recorder.sample(at_us=1 * _SECOND))
+        self.assertIsNone(recorder.sample(at_us=2 * _SECOND))
+        self._bet("MERON", 300)
+        point = recorder.sample(at_us=10 * _SECOND)
+        self.assertEqual(point.wala_share, 0.25)
+        for t in (40, 70, 100):
+            self._bet("WALA", 50)
+            recorder.sample(at_us=t * _SECOND)
+
+        self.assertEqual(len(recorder.points()), 3)
+        stored = odds_series(self.conn, self.match_id)
+        # Samples at 1 s and 10 s share the first 30 s bucket; the later one is kept.
+        self.assertEqual([p.at_us // _SECOND for p in stored], [10, 40, 70, 100])
+        self.assertEqual(stored[-1].total_all, 550)
+
+        # A restarted display picks the series back up instead of starting empty.
+        restarted = OddsRecorder(self.conn, bucket_seconds=30, ring_size=3)
+        self.assertIsNone(restarted.sample(at_us=101 * _SECOND))
+        self.assertEqual([p.at_us // _SECOND for p in restarted.points()], [40, 70, 100])
+
+    def test_history_is_queryable_as_a_report(self) -> None:
+        recorder = OddsRecorder(self.conn, bucket_seconds=30)
+        self._bet("WALA", 100)
+        recorder.sample(at_us=0)
+        self._bet("MERON", 100)
+        recorder.sample(at_us=60 * _SECOND)
+        run = ReportRun(get_report("odds_history"), db_path=self.db_path, params={"day_from": "2025-03-01", "day_to": "2025-03-01"}).start()
+        self.assertTrue(run.wait(10))
+        rows = run.drain()
+        self.assertEqual([(r[0], r[5], r[6], r[7]) for r in rows], [("M1", 100, 1.0, None), ("M1", 200, 2.0, 2.0)])
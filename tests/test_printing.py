@@ -0,0 +1,194 @@
+import re
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from cockpit.db.connection import connect, transaction
+from cockpit.db.migrate import initialize_database
+from cockpit.printing.backends import FileSinkBackend, PrintBackend
+from cockpit.printing.escpos import qr_native, qr_raster
+from cockpit.printing.render import qr_to_svg, render_job
+from cockpit.printing.spooler import PrintSpooler, PrintWorker
+from cockpit.services.audit import Actor
+from cockpit.services.errors import ValidationError
+from cockpit.services.fight import FightService
+from cockpit.services.operations import OperationsService
+from cockpit.services.rbac import RBACService
+from cockpit.utils.qrcodegen import QrCode
+
+
+class _BrokenBackend(PrintBackend):
+    def send(self, *, name: str, document: bytes) -> None:
+        raise OSError("printer offline")
+
+
+class PrintSpoolerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "test.sqlite3"
+        self.conn = connect(self.db_path)
+        initialize_database(self.conn)
+        with transaction(self.conn):
+            RBACService(self.conn).seed_defaults()
+        now = "2025-01-01T00:00:00+00:00"
+        self.conn.execute(
+            "INSERT INTO users(username, password_hash, full_name, is_active, is_frozen, created_at, updated_at) VALUES('cashier', 'x', NULL, 1, 0, ?, ?)",
+            (now, now),
+        )
+        self.user_id = int(self.conn.execute("SELECT id FROM users WHERE username = 'cashier'").fetchone()["id"])
+        self.actor = Actor(user_id=self.user_id, device_id="BOOTH-1")
+        self.ops = OperationsService(self.conn)
+        self.spooler = PrintSpooler(self.conn, self.ops.audit)
+        with transaction(self.conn):
+            self.match_id = FightService(self.conn, self.ops.audit).create_match(
+                actor=self.actor, match_number="M1", structure_code="SINGLE", rounds=1, created_by=self.user_id
+            )
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def _encode(self) -> tuple[dict, int]:
+        with transaction(self.conn):
+            slip = self.ops.encode_bet_with_cash(
+                actor=self.actor, cashier_user_id=self.user_id, device_id="BOOTH-1", match_id=self.match_id, side="WALA", amount=50
+            )
+            self.ops.betting.mark_printed(actor=self.actor, bet_id=int(slip["id"]))
+            job_id = self.spooler.enqueue_bet_slip(bet_id=int(slip["id"]), device_id="BOOTH-1", created_by=self.user_id)
+        return slip, job_id
+
+    def test_worker_dispatches_queued_slip_to_file_sink(self) -> None:
+        slip, job_id = self._encode()
+        out_dir = Path(self._tmp.name) / "out"
+        worker = PrintWorker(db_path=self.db_path, device_id="BOOTH-1", backend=FileSinkBackend(out_dir))
+        self.assertEqual(worker.run_once(), 1)
+        [status] = self.spooler.job_statuses([job_id])
+        self.assertEqual(status.status, "DONE")
+        html = (out_dir / f"bet_slip_{job_id}.html").read_text(encoding="utf-8")
+        self.assertIn(slip["slip_number"], html)
+        self.assertIn(slip["qr_payload"], html)
+
+    def test_jobs_of_other_terminals_are_not_claimed(self) -> None:
+        _slip, job_id = self._encode()
+        worker = PrintWorker(db_path=self.db_path, device_id="BOOTH-2", backend=FileSinkBackend(Path(self._tmp.name) / "out"))
+        self.assertEqual(worker.run_once(), 0)
+        self.assertEqual(self.spooler.job_statuses([job_id])[0].status, "QUEUED")
+
+    def test_failed_job_is_retried_then_marked_failed(self) -> None:
+        _slip, job_id = self._encode()
+        worker = PrintWorker(db_path=self.db_path, device_id="BOOTH-1", backend=_BrokenBackend(), max_attempts=2, retry_delay_seconds=0)
+        worker.run_once()
+        [status] = self.spooler.job_statuses([job_id])
+        self.assertEqual(status.status, "FAILED")
+        self.assertEqual(status.attempts, 2)
+        self.assertIn("printer offline", status.last_error or "")
+
+        with transaction(self.conn):
+            self.assertEqual(self.spooler.retry_failed(device_id="BOOTH-1"), 1)
+        self.assertEqual(self.spooler.job_statuses([job_id])[0].status, "QUEUED")
+
+    def test_outcome_that_cannot_be_recorded_is_written_on_the_next_pass(self) -> None:
+        _slip, job_id = self._encode()
+        out_dir = Path(self._tmp.name) / "out"
+        worker = PrintWorker(db_path=self.db_path, device_id="BOOTH-1", backend=FileSinkBackend(out_dir))
+        mark_done = PrintWorker._mark_done
+        calls = []
+
+        def locked_once(self_, conn, job_id_):
+            calls.append(job_id_)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            mark_done(self_, conn, job_id_)
+
+        conn = connect(self.db_path)
+        try:
+            with mock.patch.object(PrintWorker, "_mark_done", locked_once), self.assertLogs("cockpit.printing.spooler", "WARNING"):
+                self.assertEqual(worker._drain(conn), 1)
+                self.assertEqual(self.spooler.job_statuses([job_id])[0].status, "PRINTING")
+                self.assertEqual(worker._drain(conn), 0)
+        finally:
+            conn.close()
+        [status] = self.spooler.job_statuses([job_id])
+        self.assertEqual(status.status, "DONE")
+        self.assertEqual(status.attempts, 1)
+        self.assertEqual(calls, [job_id, job_id])
+
+    def test_reprint_is_audited_and_refused_after_payout(self) -> None:
+        slip, _job_id = self._encode()
+        with transaction(self.conn):
+            self.spooler.reprint_bet_slip(actor=self.actor, slip_number=slip["slip_number"], device_id="BOOTH-1", created_by=self.user_id)
+        audit = self.conn.execute("SELECT COUNT(*) AS c FROM audit_log WHERE action = 'BET_REPRINT'").fetchone()
+        self.assertEqual(int(audit["c"]), 1)
+
+        FightService(self.conn, self.ops.audit).set_result(
+            actor=self.actor, match_id=self.match_id, result_type="WALA", decided_by=self.user_id
+        )
+        self.ops.payout_bet_with_cash(actor=self.actor, cashier_user_id=self.user_id, qr_payload=slip["qr_payload"])
+        with self.assertRaises(ValidationError):
+            self.spooler.reprint_bet_slip(actor=self.actor, slip_number=slip["slip_number"], device_id="BOOTH-1", created_by=self.user_id)
+
+
+class SlipRenderTests(unittest.TestCase):
+    def test_run_merged_svg_covers_exactly_the_dark_modules(self) -> None:
+        qr = QrCode.encode_text("dGVzdC1wYXlsb2FkLTEyMzQ1", QrCode.Ecc.MEDIUM)
+        svg = qr_to_svg(qr, border=2)
+        painted = set()
+        for x, y, run in re.findall(r"M(\d+),(\d+)h(\d+)v1h-\d+z", svg):
+            for dx in range(int(run)):
+                painted.add((int(x) - 2 + dx, int(y) - 2))
+        expected = {(x, y) for y in range(qr.get_size()) for x in range(qr.get_size()) if qr.get_module(x, y)}
+        self.assertEqual(painted, expected)
+
+    def test_escpos_raster_matches_qr_modules(self) -> None:
+        qr = QrCode.encode_text("dGVzdC1wYXlsb2FkLTEyMzQ1", QrCode.Ecc.MEDIUM)
+        scale, border = 3, 2
+        image = qr_raster(qr, scale=scale, border=border)
+        self.assertEqual(image[:4], b"\x1dv0\x00")
+        width_bytes = image[4] | image[5] << 8
+        height = image[6] | image[7] << 8
+        size = qr.get_size()
+        self.assertEqual(height, (size + border * 2) * scale)
+        self.assertEqual(width_bytes, ((size + border * 2) * scale + 7) // 8)
+        data = image[8:]
+        self.assertEqual(len(data), width_bytes * height)
+        for y in range(size):
+            row = data[(y + border) * scale * width_bytes:][:width_bytes]
+            for x in range(size):
+                dot = (x + border) * scale
+                self.assertEqual(bool(row[dot // 8] & (0x80 >> (dot % 8))), qr.get_module(x, y))
+
+    def test_escpos_native_qr_stores_payload(self) -> None:
+        commands = qr_native("SLIP-1")
+        self.assertIn(b"\x1d(k\x09\x001P0SLIP-1", commands)
+        self.assertTrue(commands.endswith(b"\x1d(k\x03\x001Q0"))
+
+    def test_escpos_bet_slip_is_written_as_binary(self) -> None:
+        payload = {"slip_number": "S-1", "qr_payload": "abc", "match_number": "M1", "side": "WALA", "amount": 100}
+        document = render_job("BET_SLIP", payload, "escpos", {"paper_mm": 80, "native_qr": False})
+        self.assertTrue(document.startswith(b"\x1b@"))
+        self.assertIn(b"\x1dv0\x00", document)
+        with tempfile.TemporaryDirectory() as tmp:
+            FileSinkBackend(Path(tmp), content_type="escpos").send(name="bet_slip_1", document=document)
+            self.assertEqual((Path(tmp) / "bet_slip_1.bin").read_bytes(), document)
+
+    def test_escpos_canteen_receipt_ignores_qr_options(self) -> None:
+        payload = {
+            "receipt_number": "R-1",
+            "sold_at": "2025-01-01T00:00:00+00:00",
+            "lines": [{"qty": 2, "name": "Water", "unit_price": 20, "line_total": 40}],
+            "total_amount": 40,
+        }
+        document = render_job("CANTEEN_RECEIPT", payload, "escpos", {"paper_mm": 80, "native_qr": True})
+        self.assertIn(b"TOTAL: P40", document)
+        self.assertNotIn(b"\x1d(k", document)
+
+    def test_unknown_render_option_is_rejected(self) -> None:
+        payload = {"slip_number": "S-1", "qr_payload": "abc", "match_number": "M1", "side": "WALA", "amount": 100}
+        with self.assertRaisesRegex(ValueError, "paper_widht"):
+            render_job("BET_SLIP", payload, "escpos", {"paper_widht": 80})
+
+
+if __name__ == "__main__":
+    unittest.main()
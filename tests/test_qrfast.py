@@ -0,0 +1,42 @@
+import secrets
+import unittest
+
+from cockpit.utils import qrfast
+from cockpit.utils.qrcodegen import QrCode, QrSegment
+
+
+_ECCS = (QrCode.Ecc.LOW, QrCode.Ecc.MEDIUM, QrCode.Ecc.QUARTILE, QrCode.Ecc.HIGH)
+
+
+class QrFastPathTests(unittest.TestCase):
+    def _assert_same(self, ref: QrCode, fast: QrCode) -> None:
+        self.assertEqual(fast.get_version(), ref.get_version())
+        self.assertEqual(fast.get_error_correction_level(), ref.get_error_correction_level())
+        self.assertEqual(fast.get_mask(), ref.get_mask())
+        for y in range(ref.get_size()):
+            self.assertEqual(list(fast.get_row(y)), list(ref.get_row(y)))
+
+    def test_divisor_matches_reference(self) -> None:
+        for degree in range(1, 31):
+            self.assertEqual(qrfast.rs_divisor(degree), bytes(QrCode._reed_solomon_compute_divisor(degree)))
+
+    def test_slip_tokens_match_reference(self) -> None:
+        for _ in range(40):
+            token = secrets.token_urlsafe(16)
+            self._assert_same(QrCode.encode_text(token, QrCode.Ecc.MEDIUM), qrfast.encode_text(token, QrCode.Ecc.MEDIUM))
+
+    def test_all_modes_levels_and_versions_match_reference(self) -> None:
+        texts = ["", "0123456789" * 7, "HELLO WORLD $%*+-./:" * 4, "Sabong ₱ slip " * 30, secrets.token_hex(200)]
+        for text in texts:
+            for ecl in _ECCS:
+                self._assert_same(QrCode.encode_text(text, ecl), qrfast.encode_text(text, ecl))
+
+    def test_fixed_mask_matches_reference(self) -> None:
+        token = secrets.token_urlsafe(16)
+        segs = QrSegment.make_segments(token)
+        for mask in range(8):
+            self._assert_same(QrCode.encode_segments(segs, QrCode.Ecc.MEDIUM, mask=mask), qrfast.encode_text(token, QrCode.Ecc.MEDIUM, mask=mask))
+
+
+if __name__ == "__main__":
+    unittest.main()
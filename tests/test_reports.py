@@ -0,0 +1,102 @@
+import csv
+import json
+import unittest
+
+from cockpit.db.connection import transaction
+from cockpit.db.rollups import recompute_business_days
+from cockpit.services.errors import ValidationError
+from cockpit.services.reports import ReportDefinition, ReportParam, ReportRun, export_report, get_report
+from support import DatabaseTestCase
+
+
+class ReportEngineTests(DatabaseTestCase):
+    def _collect(self, run: ReportRun) -> list[tuple]:
+        self.assertTrue(run.wait(10))
+        return run.drain()
+
+    def _seed_matches(self) -> None:
+        user_id = self.add_user()
+        with transaction(self.conn):
+            # Matches 1-10 on the night of 1 March (venue time), 11-25 on 2 March.
+            self.conn.executemany(
+                "INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at) VALUES (?, 'S', 1, 'DRAFT', ?, ?)",
+                [
+                    (str(i), user_id, "2025-03-01T12:00:00+00:00" if i <= 10 else "2025-03-02T12:00:00+00:00")
+                    for i in range(1, 26)
+                ],
+            )
+            # As FightService does at insert: the venue business day of created_at.
+            recompute_business_days(self.conn)
+
+    def test_streams_rows_in_chunks_for_a_day_range(self) -> None:
+        self._seed_matches()
+        run = ReportRun(get_report("fight_history"), db_path=self.db_path, params={"day_from": "2025-03-01", "day_to": "2025-03-01"}, chunk_size=3).start()
+        rows = self._collect(run)
+        self.assertEqual(run.state, "DONE")
+        self.assertEqual(run.rows_fetched, 10)
+        self.assertEqual([r[0] for r in rows], [str(i) for i in range(10, 0, -1)])
+
+    def test_fight_history_filters_on_the_indexed_day_column(self) -> None:
+        self._seed_matches()
+        with transaction(self.conn):
+            self.conn.execute(
+                "INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at) VALUES ('bad', 'S', 1, 'DRAFT', 1, 'not a time')"
+            )
+            recompute_business_days(self.conn)
+        plan = " | ".join(
+            r[3] for r in self.conn.execute("EXPLAIN QUERY PLAN " + get_report("fight_history").sql, {"day_from": 20250301, "day_to": 20250301})
+        )
+        self.assertIn("idx_fight_matches_day", plan)
+        # A malformed created_at leaves that match out instead of failing the report.
+        run = ReportRun(get_report("fight_history"), db_path=self.db_path, params={"day_from": "2025-03-02"}).start()
+        self.assertEqual(len(self._collect(run)), 15)
+        self.assertEqual(run.state, "DONE")
+
+    def test_invalid_parameter_is_rejected(self) -> None:
+        with self.assertRaises(ValidationError):
+            ReportRun(get_report("daily_income"), db_path=self.db_path, params={"day_from": "March"})
+
+    def test_export_streams_to_csv_and_jsonl(self) -> None:
+        self._seed_matches()
+        definition = get_report("fight_history")
+        csv_path = self.db_path.parent / "fights.csv"
+        progress: list[int] = []
+        self.assertEqual(export_report(definition, db_path=self.db_path, path=csv_path, chunk_size=4, progress=progress.append), 25)
+        with csv_path.open(newline="", encoding="utf-8") as f:
+            lines = list(csv.reader(f))
+        self.assertEqual(lines[0], list(definition.headings))
+        self.assertEqual(len(lines), 26)
+        self.assertEqual(progress[-1], 25)
+
+        jsonl_path = self.db_path.parent / "fights.jsonl"
+        export_report(definition, db_path=self.db_path, path=jsonl_path, params={"day_from": "2025-03-02"})
+        records = [json.loads(line) for line in jsonl_path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(records), 15)
+        self.assertEqual(records[0]["match_number"], "25")
+        self.assertFalse(any(p.name.endswith(".part") for p in self.db_path.parent.iterdir()))
+
+    def test_cancel_stops_a_long_report(self) -> None:
+        definition = ReportDefinition(
+            key="count",
+            title="Count",
+            columns=("n",),
+            headings=("N",),
+            sql="WITH RECURSIVE c(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM c WHERE n < :upto) SELECT n FROM c",
+            params=(ReportParam("upto", "Up to", 50_000_000, int),),
+        )
+        run = ReportRun(definition, db_path=self.db_path, chunk_size=100).start()
+        while run.rows_fetched == 0 and not run.finished:
+            run.wait(0.01)
+        run.cancel()
+        self.assertTrue(run.wait(10))
+        self.assertEqual(run.state, "CANCELLED")
+        self.assertLess(run.rows_fetched, 50_000_000)
+
+
+    def test_definition_needs_a_heading_per_column(self) -> None:
+        with self.assertRaisesRegex(ValueError, "2 columns but 1 headings"):
+            ReportDefinition(key="bad", title="Bad", columns=("a", "b"), headings=("A",), sql="SELECT 1 AS a, 2 AS b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import sqlite3
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from cockpit.db.migrate import initialize_database
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.betting import BettingService
+from cockpit.services.fight import FightService
+from cockpit.services.rbac import RBACService
+from cockpit.services.slip_identity import SlipIdentityPool
+
+
+class SlipIdentityPoolTests(unittest.TestCase):
+    def test_fill_prerenders_and_hands_out_each_identity_once(self) -> None:
+        seen: list[str] = []
+        pool = SlipIdentityPool(batch_size=8, low_watermark=0, prerender=lambda payload: seen.append(payload) or payload.upper())
+        self.assertEqual(pool.fill(), 8)
+        taken = [pool.take() for _ in range(8)]
+        self.assertEqual(len({i.slip_number for i in taken}), 8)
+        self.assertEqual([i.qr_payload for i in taken], seen)
+
+    def test_concurrent_fills_do_not_overfill(self) -> None:
+        started = threading.Barrier(4)
+        pool = SlipIdentityPool(batch_size=32, low_watermark=0, prerender=lambda payload: time.sleep(0.001))
+        added: list[int] = []
+
+        def fill() -> None:
+            started.wait()
+            added.append(pool.fill())
+
+        threads = [threading.Thread(target=fill) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(pool), 32)
+        self.assertEqual(sum(added), 32)
+
+    def test_take_triggered_refills_and_warmup_share_reservations(self) -> None:
+        pool = SlipIdentityPool(batch_size=16, low_watermark=16, prerender=lambda payload: time.sleep(0.001))
+        warmup = threading.Thread(target=pool.fill, name="slip-identity-warmup")
+        warmup.start()
+        for _ in range(40):
+            pool.take()
+            self.assertLessEqual(len(pool), 16)
+        warmup.join()
+        for thread in threading.enumerate():
+            if thread.name == "slip-identity-refill":
+                thread.join()
+        self.assertEqual(pool._reserved, 0)
+        self.assertLessEqual(len(pool), 16)
+        pool.fill()
+        self.assertEqual(len(pool), 16)
+
+    def test_identities_from_a_previous_day_are_discarded(self) -> None:
+        pool = SlipIdentityPool(batch_size=4, low_watermark=0)
+        with mock.patch("cockpit.services.slip_identity.utc_now", return_value=datetime(2025, 1, 1, 23, 59, tzinfo=timezone.utc)):
+            pool.fill()
+        with mock.patch("cockpit.services.slip_identity.utc_now", return_value=datetime(2025, 1, 2, 0, 1, tzinfo=timezone.utc)):
+            identity = pool.take()
+        self.assertTrue(identity.slip_number.startswith("S20250102-"))
+        self.assertEqual(len(pool), 0)
+
+    def test_encode_bet_uses_pooled_identity_and_inserted_row_id(self) -> None:
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        initialize_database(conn)
+        RBACService(conn).seed_defaults()
+        now = "2025-01-01T00:00:00+00:00"
+        conn.execute(
+            "INSERT INTO users(username, password_hash, full_name, is_active, is_frozen, created_at, updated_at) VALUES('u', 'x', NULL, 1, 0, ?, ?)",
+            (now, now),
+        )
+        actor = Actor(user_id=1, device_id="TEST")
+        audit = AuditService(conn)
+        match_id = FightService(conn, audit).create_match(actor=actor, match_number="M1", structure_code="SINGLE", rounds=1, created_by=1)
+        pool = SlipIdentityPool(batch_size=4, low_watermark=0)
+        pool.fill()
+        expected = pool._ready[0]
+        betting = BettingService(conn, audit, identities=pool)
+        first = betting.encode_bet(actor=actor, encoded_by=1, device_id="TEST", match_id=match_id, side="WALA", amount=100)
+        second = betting.encode_bet(actor=actor, encoded_by=1, device_id="TEST", match_id=match_id, side="MERON", amount=100)
+        self.assertEqual(first["slip_number"], expected.slip_number)
+        self.assertEqual(first["qr_payload"], expected.qr_payload)
+        for slip in (first, second):
+            row = conn.execute("SELECT slip_number FROM bet_slips WHERE id = ?", (slip["id"],)).fetchone()
+            self.assertEqual(row["slip_number"], slip["slip_number"])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from cockpit.db.connection import MAIN_TIER, TELEMETRY_TIER, ChangeFeed, connect, telemetry_transaction, tier_path, transaction
+from cockpit.db.migrate import initialize_database
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.betting import BettingService
+from cockpit.utils.clock import business_day, configure_business_day, epoch_us, from_epoch_us, now
+
+
+class StorageTierTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "cockpit.sqlite3"
+        self.conn = connect(self.db_path)
+        initialize_database(self.conn)
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def test_tiers_use_separate_files_and_synchronous_levels(self) -> None:
+        files = {r[1]: r[2] for r in self.conn.execute("PRAGMA database_list").fetchall()}
+        self.assertEqual(Path(files["telemetry"]), tier_path(self.db_path, TELEMETRY_TIER))
+        levels = {"OFF": 0, "NORMAL": 1, "FULL": 2}
+        self.assertEqual(self.conn.execute("PRAGMA main.synchronous").fetchone()[0], levels[MAIN_TIER.synchronous])
+        self.assertEqual(self.conn.execute("PRAGMA telemetry.synchronous").fetchone()[0], levels[TELEMETRY_TIER.synchronous])
+        main_tables = {r[0] for r in self.conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+        self.assertIn("audit_log", main_tables)
+        self.assertNotIn("session_leases", main_tables)
+
+    def test_telemetry_transaction_does_not_lock_main(self) -> None:
+        other = connect(self.db_path)
+        try:
+            with telemetry_transaction(self.conn):
+                self.conn.execute(
+                    "INSERT INTO telemetry.session_leases(session_id, user_id, device_id, last_seen_at) VALUES (1, 1, 'd', 'x')"
+                )
+                # Another connection can still commit to the main file meanwhile.
+                other.execute("INSERT INTO audit_log(actor_user_id, actor_device_id, action, entity_type, entity_id, created_at) VALUES (NULL, 'd', 'X', 'x', '1', 'x')")
+        finally:
+            other.close()
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM telemetry.session_leases").fetchone()[0], 1)
+
+
+    def test_business_day_columns_are_backfilled_on_upgrade(self) -> None:
+        self.conn.execute(
+            "INSERT INTO users(id, username, password_hash, is_active, is_frozen, created_at, updated_at) VALUES (1, 'a', 'x', 1, 0, 'x', 'x')"
+        )
+        self.conn.execute(
+            "INSERT INTO cash_drawers(id, drawer_type, name, owner_user_id, opened_at) VALUES (1, 'CANTEEN', 'C', 1, 'x')"
+        )
+        self.conn.execute(
+            """
+            INSERT INTO canteen_sales(receipt_number, drawer_id, sold_by, sold_at, total_amount, status)
+            VALUES ('R1', 1, 1, '2025-03-01T17:30:00+00:00', 250, 'PAID')
+            """
+        )
+        # Simulate a file from before the column existed.
+        for name in ("trg_rollup_canteen_insert", "trg_rollup_canteen_update", "trg_rollup_canteen_delete"):
+            self.conn.execute(f"DROP TRIGGER {name}")
+        self.conn.execute("DROP INDEX idx_canteen_sales_day_seller")
+        self.conn.execute("ALTER TABLE canteen_sales DROP COLUMN business_day")
+        self.conn.execute("DELETE FROM rollup_canteen")
+        initialize_database(self.conn)
+        row = self.conn.execute("SELECT business_day FROM canteen_sales").fetchone()
+        # 01:30 venue time belongs to the previous business day.
+        self.assertEqual(row[0], 20250301)
+        self.assertEqual(tuple(self.conn.execute("SELECT business_day, sales_total FROM rollup_canteen").fetchone()), (20250301, 250))
+
+    def test_audit_epoch_column_is_backfilled_and_log_stays_append_only(self) -> None:
+        AuditService(self.conn).log(actor=Actor(user_id=None, device_id="T"), action="X", entity_type="x", entity_id="1")
+        created_at = self.conn.execute("SELECT created_at FROM audit_log").fetchone()[0]
+        self.conn.execute("DROP INDEX idx_audit_log_created_us")
+        self.conn.execute("DROP INDEX idx_audit_log_created_at_us_pending")
+        self.conn.execute("ALTER TABLE audit_log DROP COLUMN created_at_us")
+        initialize_database(self.conn)
+        us = self.conn.execute("SELECT created_at_us FROM audit_log").fetchone()[0]
+        self.assertEqual(us, epoch_us(datetime.fromisoformat(created_at)))
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("UPDATE audit_log SET action = 'Y'")
+
+    def test_rows_written_without_epoch_columns_are_backfilled_later(self) -> None:
+        # An older build on another terminal writes only the ISO text, after the columns exist.
+        AuditService(self.conn).log(actor=Actor(user_id=None, device_id="T"), action="X", entity_type="x", entity_id="1")
+        self.conn.execute(
+            "INSERT INTO audit_log(actor_user_id, actor_device_id, action, entity_type, entity_id, created_at) VALUES (NULL, 'old', 'Y', 'x', '2', '2025-03-01T12:00:00+00:00')"
+        )
+        initialize_database(self.conn)
+        us = self.conn.execute("SELECT created_at_us FROM audit_log WHERE actor_device_id = 'old'").fetchone()[0]
+        self.assertEqual(us, epoch_us(datetime.fromisoformat("2025-03-01T12:00:00+00:00")))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM audit_log WHERE created_at_us IS NULL").fetchone()[0], 0)
+
+    def test_per_slip_odds_json_is_converted_to_shared_snapshots(self) -> None:
+        with transaction(self.conn):
+            self.conn.execute(
+                "INSERT INTO users(id, username, password_hash, is_active, is_frozen, created_at, updated_at) VALUES (1, 'a', 'x', 1, 0, 'x', 'x')"
+            )
+            self.conn.execute(
+                "INSERT INTO fight_matches(id, match_number, structure_code, rounds, state, created_by, created_at) VALUES (1, 'M1', 'S', 1, 'DRAFT', 1, 'x')"
+            )
+        # Simulate a file from before odds_snapshots: every slip carries its own JSON.
+        self.conn.execute("ALTER TABLE bet_slips DROP COLUMN odds_snapshot_id")
+        self.conn.execute("ALTER TABLE bet_slips ADD COLUMN odds_snapshot_json TEXT")
+        legacy = [
+            '{"total_wala": 0, "total_meron": 0, "total_draw": 0, "total_all": 0, "wala_multiplier": null, "meron_multiplier": null}',
+            '{"total_wala": 100, "total_meron": 50, "total_draw": 0, "total_all": 150, "wala_multiplier": 1.5, "meron_multiplier": 3.0}',
+            '{"total_wala": 100, "total_meron": 50, "total_draw": 0, "total_all": 150, "wala_multiplier": 1.5, "meron_multiplier": 3.0}',
+        ]
+        with transaction(self.conn):
+            for i, blob in enumerate(legacy, start=1):
+                self.conn.execute(
+                    """
+                    INSERT INTO bet_slips(slip_number, match_id, side, amount, odds_snapshot_json, status, encoded_by, encoded_at, qr_payload, device_id)
+                    VALUES (?, 1, 'WALA', 10, ?, 'ENCODED', 1, '2025-03-01T12:00:00+00:00', ?, 'd')
+                    """,
+                    (f"S{i}", blob, f"Q{i}"),
+                )
+        initialize_database(self.conn)
+
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(bet_slips)").fetchall()}
+        self.assertNotIn("odds_snapshot_json", columns)
+        ids = [r[0] for r in self.conn.execute("SELECT odds_snapshot_id FROM bet_slips ORDER BY id")]
+        self.assertEqual(ids[1], ids[2])
+        self.assertEqual(tuple(self.conn.execute("SELECT COUNT(*), MAX(pool_version) FROM odds_snapshots").fetchone()), (2, -1))
+        betting = BettingService(self.conn, audit=None)
+        self.assertEqual([betting.odds_snapshot_json(i) for i in (1, 2, 3)], legacy)
+
+    def test_upgrade_makes_match_numbers_unique_per_pit(self) -> None:
+        with transaction(self.conn):
+            self.conn.execute(
+                "INSERT INTO users(id, username, password_hash, is_active, is_frozen, created_at, updated_at) VALUES (1, 'a', 'x', 1, 0, 'x', 'x')"
+            )
+        # Simulate a file from before pits: match_number unique venue-wide, no pit columns.
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        self.conn.execute("PRAGMA legacy_alter_table = ON")
+        self.conn.executescript(
+            """
+            DROP TRIGGER trg_fight_results_pit;
+            DROP INDEX idx_fight_results_pit_decided;
+            ALTER TABLE fight_results DROP COLUMN pit_id;
+            DROP TABLE fight_matches;
+            CREATE TABLE fight_matches (
+              id INTEGER PRIMARY KEY,
+              match_number TEXT NOT NULL UNIQUE,
+              fight_number INTEGER UNIQUE,
+              structure_code TEXT NOT NULL,
+              rounds INTEGER NOT NULL,
+              state TEXT NOT NULL CHECK (state IN ('DRAFT','LOCKED','ACTIVE','FINISHED','VOIDED')),
+              locked_at TEXT,
+              started_at TEXT,
+              stopped_at TEXT,
+              created_by INTEGER NOT NULL REFERENCES users(id),
+              created_at TEXT NOT NULL
+            );
+            INSERT INTO fight_matches(id, match_number, structure_code, rounds, state, created_by, created_at) VALUES (7, '1', 'S', 1, 'FINISHED', 1, 'x');
+            INSERT INTO fight_results(match_id, result_type, decided_by, decided_at) VALUES (7, 'WALA', 1, '2025-03-01T12:00:00+00:00');
+            """
+        )
+        self.conn.execute("PRAGMA legacy_alter_table = OFF")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        initialize_database(self.conn)
+
+        self.assertEqual(self.conn.execute("SELECT pit_id FROM fight_results WHERE match_id = 7").fetchone()[0], 1)
+        with transaction(self.conn):
+            self.conn.execute("INSERT INTO pits(id, code, name, is_active, created_at) VALUES (2, 'B', 'Pit B', 1, 'x')")
+            self.conn.execute(
+                "INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at, pit_id) VALUES ('1', 'S', 1, 'DRAFT', 1, 'x', 2)"
+            )
+        self.assertEqual(self.conn.execute("SELECT current_match_id FROM pit_state WHERE pit_id = 2").fetchone()[0], 8)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("INSERT INTO fight_matches(match_number, structure_code, rounds, state, created_by, created_at) VALUES ('1', 'S', 1, 'DRAFT', 1, 'x')")
+        # The bet trigger on another table still names the rebuilt table correctly.
+        self.conn.execute(
+            "INSERT INTO bet_slips(slip_number, match_id, side, amount, status, encoded_by, encoded_at, qr_payload, device_id) VALUES ('S1', 8, 'WALA', 10, 'ENCODED', 1, '2025-03-01T12:00:00+00:00', 'Q', 'd')"
+        )
+        self.assertEqual(self.conn.execute("SELECT state FROM fight_matches WHERE id = 8").fetchone()[0], "LOCKED")
+
+    def test_main_pit_created_at_is_iso_utc(self) -> None:
+        self.conn.execute("UPDATE pits SET created_at = '2025-03-01 04:05:06' WHERE id = 1")
+        initialize_database(self.conn)
+        created_at = self.conn.execute("SELECT created_at FROM pits WHERE id = 1").fetchone()["created_at"]
+        self.assertEqual(created_at, "2025-03-01T04:05:06+00:00")
+        self.assertIsNotNone(datetime.fromisoformat(created_at).tzinfo)
+
+    def test_malformed_legacy_odds_json_does_not_block_startup(self) -> None:
+        with transaction(self.conn):
+            self.conn.execute(
+                "INSERT INTO users(id, username, password_hash, is_active, is_frozen, created_at, updated_at) VALUES (1, 'a', 'x', 1, 0, 'x', 'x')"
+            )
+            self.conn.execute(
+                "INSERT INTO fight_matches(id, match_number, structure_code, rounds, state, created_by, created_at) VALUES (1, 'M1', 'S', 1, 'DRAFT', 1, 'x')"
+            )
+        self.conn.execute("ALTER TABLE bet_slips DROP COLUMN odds_snapshot_id")
+        self.conn.execute("ALTER TABLE bet_slips ADD COLUMN odds_snapshot_json TEXT")
+        self.conn.execute(
+            """
+            INSERT INTO bet_slips(slip_number, match_id, side, amount, odds_snapshot_json, status, encoded_by, encoded_at, qr_payload, device_id)
+            VALUES ('S1', 1, 'WALA', 10, '{"total_wala": 10,', 'ENCODED', 1, '2025-03-01T12:00:00+00:00', 'Q1', 'd')
+            """
+        )
+        initialize_database(self.conn)
+        self.assertEqual(BettingService(self.conn, audit=None).odds_snapshot(1)["total_all"], 0)
+
+    def test_change_feed_sees_commits_from_any_connection(self) -> None:
+        feed = ChangeFeed(self.conn)
+        self.assertTrue(feed.poll())
+        self.assertFalse(feed.poll())
+        other = connect(self.db_path)
+        try:
+            with transaction(other):
+                other.execute("INSERT INTO roles(name) VALUES ('FEED_OTHER')")
+        finally:
+            other.close()
+        self.assertTrue(feed.poll())
+        self.assertFalse(feed.poll())
+        with transaction(self.conn):
+            self.conn.execute("INSERT INTO roles(name) VALUES ('FEED_SELF')")
+        self.assertTrue(feed.poll())
+
+
+class ClockTests(unittest.TestCase):
+    def test_transaction_shares_one_timestamp(self) -> None:
+        conn = connect(Path(":memory:"))
+        try:
+            with transaction(conn):
+                first = now()
+                with transaction(conn):
+                    self.assertIs(now(), first)
+            self.assertIsNot(now(), first)
+        finally:
+            conn.close()
+
+    def test_epoch_round_trip(self) -> None:
+        moment = datetime.fromisoformat("2025-03-01T17:30:00.123456+00:00")
+        self.assertEqual(from_epoch_us(epoch_us(moment)), moment)
+
+
+class BusinessDayTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        configure_business_day(tz_name="+08:00", cutoff_hour=6)
+
+    def test_evening_event_stays_on_one_business_day(self) -> None:
+        configure_business_day(tz_name="+08:00", cutoff_hour=6)
+        # 18:00 and 01:30 local (UTC+8) on the same night.
+        self.assertEqual(business_day("2025-03-01T10:00:00+00:00"), 20250301)
+        self.assertEqual(business_day("2025-03-01T17:30:00+00:00"), 20250301)
+        self.assertEqual(business_day("2025-03-01T22:30:00+00:00"), 20250302)
+
+    def test_timezone_and_cutoff_are_configurable(self) -> None:
+        configure_business_day(tz_name="UTC", cutoff_hour=0)
+        self.assertEqual(business_day("2025-03-01T23:59:00+00:00"), 20250301)
+        with self.assertRaises(ValueError):
+            configure_business_day(tz_name="UTC", cutoff_hour=24)
+
+
+if __name__ == "__main__":
+    unittest.main()
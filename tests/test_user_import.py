@@ -0,0 +1,65 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from cockpit.db.connection import connect, transaction
+from cockpit.db.migrate import initialize_database
+from cockpit.services.audit import Actor, AuditService
+from cockpit.services.errors import ValidationError
+from cockpit.services.rbac import RBACService
+from cockpit.services.user_import import UserImportService, parse_users_file
+from cockpit.utils.security import verify_password
+
+
+class UserImportTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.conn = connect(self.dir / "test.sqlite3")
+        initialize_database(self.conn)
+        with transaction(self.conn):
+            RBACService(self.conn).seed_defaults()
+        self.service = UserImportService(self.conn, AuditService(self.conn))
+        self.actor = Actor(user_id=None, device_id="TEST")
+
+    def tearDown(self) -> None:
+        self.conn.close()
+        self._tmp.cleanup()
+
+    def test_csv_import_creates_users_roles_and_audit_rows(self) -> None:
+        path = self.dir / "users.csv"
+        lines = ["username,password,full_name,roles"]
+        lines += [f"cashier{i},pw{i},Cashier {i},Cashier" for i in range(6)]
+        lines.append("canteen1,pwc,,Canteen;Cashier")
+        path.write_text("\n".join(lines), encoding="utf-8")
+
+        rows = parse_users_file(path)
+        user_ids = self.service.import_users(actor=self.actor, rows=rows, iterations=1_000)
+
+        self.assertEqual(len(user_ids), 7)
+        stored = self.conn.execute("SELECT password_hash FROM users WHERE username = 'cashier3'").fetchone()["password_hash"]
+        self.assertTrue(verify_password("pw3", stored))
+        roles = self.conn.execute(
+            "SELECT r.name FROM user_roles ur JOIN roles r ON r.id = ur.role_id WHERE ur.user_id = ? ORDER BY r.name",
+            (user_ids["canteen1"],),
+        ).fetchall()
+        self.assertEqual([r["name"] for r in roles], ["Canteen", "Cashier"])
+        audit = self.conn.execute("SELECT COUNT(*) AS c FROM audit_log WHERE action = 'USER_CREATE'").fetchone()
+        self.assertEqual(int(audit["c"]), 7)
+
+    def test_json_import_rejects_unknown_roles_and_existing_usernames(self) -> None:
+        path = self.dir / "users.json"
+        path.write_text(json.dumps([{"username": "x", "password": "p", "roles": ["Nope"]}]), encoding="utf-8")
+        with self.assertRaises(ValidationError):
+            self.service.import_users(actor=self.actor, rows=parse_users_file(path), iterations=1_000)
+
+        path.write_text(json.dumps([{"username": "x", "password": "p", "roles": ["Cashier"]}]), encoding="utf-8")
+        self.service.import_users(actor=self.actor, rows=parse_users_file(path), iterations=1_000)
+        with self.assertRaises(ValidationError):
+            self.service.import_users(actor=self.actor, rows=parse_users_file(path), iterations=1_000)
+        self.assertEqual(int(self.conn.execute("SELECT COUNT(*) AS c FROM users").fetchone()["c"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
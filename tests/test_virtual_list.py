@@ -0,0 +1,40 @@
+import unittest
+
+from cockpit.ui.common import merge_refreshed_head
+
+
+def _page(keys: list[int]) -> list[tuple[int, tuple[str]]]:
+    return [(k, (f"row {k}",)) for k in keys]
+
+
+class MergeRefreshedHeadTests(unittest.TestCase):
+    # Loaded newest-first, as the registry and audit log page by keyset.
+    loaded_keys = [50, 49, 48, 47, 46, 45]
+    loaded_rows = [(f"row {k}",) for k in loaded_keys]
+
+    def _merge(self, fresh: list[int], *, want: int, top: int, exhausted: bool = False):
+        return merge_refreshed_head(self.loaded_keys, self.loaded_rows, _page(fresh), want=want, top=top, exhausted=exhausted)
+
+    def test_overlapping_head_keeps_the_loaded_tail_and_the_anchor(self) -> None:
+        # Two new rows arrived on top while the view was showing key 48.
+        merged = self._merge([52, 51, 50, 49], want=4, top=2)
+        self.assertEqual(merged.keys, [52, 51, 50, 49, 48, 47, 46, 45])
+        self.assertEqual(merged.rows[4], ("row 48",))
+        self.assertEqual(merged.top, 4)
+        self.assertFalse(merged.exhausted)
+
+    def test_view_at_the_top_stays_at_the_top(self) -> None:
+        self.assertEqual(self._merge([52, 51, 50, 49], want=4, top=0).top, 0)
+
+    def test_short_head_is_the_whole_result(self) -> None:
+        merged = self._merge([50, 48], want=4, top=1, exhausted=False)
+        self.assertEqual(merged.keys, [50, 48])
+        self.assertTrue(merged.exhausted)
+        # The anchor row (49) was deleted, so the view keeps its position.
+        self.assertEqual(merged.top, 1)
+
+    def test_head_without_overlap_replaces_everything_and_may_continue(self) -> None:
+        merged = self._merge([60, 59, 58, 57], want=4, top=3, exhausted=True)
+        self.assertEqual(merged.keys, [60, 59, 58, 57])
+        self.assertFalse(merged.exhausted)
+        self.assertEqual(merged.top, 3)